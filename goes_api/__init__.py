@@ -14,6 +14,8 @@
 # You should have received a copy of the GNU General Public License along with
 # goes_api. If not, see <http://www.gnu.org/licenses/>.
 
+from goes_api.assembler import TimestepAssembler, assemble_timesteps
+from goes_api.cache import rebuild_cache_index
 from goes_api.configs import define_goes_api_configs as define_configs
 from goes_api.configs import read_goes_api_configs as read_configs
 from goes_api.download import (
@@ -32,6 +34,7 @@ from goes_api.explore import (
     open_explorer_dir,
 )
 from goes_api.filter import filter_files
+from goes_api.follow import follow_files
 from goes_api.info import (
     available_channels,
     available_connection_types,
@@ -46,10 +49,13 @@ from goes_api.info import (
     get_available_online_product,
     group_files,
 )
+from goes_api.inventory import download_gaps, find_gaps, get_gaps
+from goes_api.kerchunk import combine_kerchunk_files, generate_kerchunk_files
 from goes_api.operations import (
     ensure_fixed_scan_mode,
     ensure_operational_data,
     ensure_time_period_is_covered,
+    validate_fpaths,
 )
 from goes_api.search import (
     find_closest_files,
@@ -59,7 +65,10 @@ from goes_api.search import (
     find_latest_start_time,
     find_next_files,
     find_previous_files,
+    iter_files,
 )
+from goes_api.table import FileTable
+from goes_api.utils.retry import RetryPolicy
 
 __all__ = [
     "define_configs",
@@ -82,7 +91,10 @@ __all__ = [
     "download_previous_files",
     "download_daily_files",
     "download_monthly_files",
+    "rebuild_cache_index",
     "find_files",
+    "iter_files",
+    "follow_files",
     "find_latest_files",
     "find_closest_files",
     "find_previous_files",
@@ -90,11 +102,20 @@ __all__ = [
     "find_closest_start_time",
     "find_latest_start_time",
     "group_files",
+    "FileTable",
+    "TimestepAssembler",
+    "assemble_timesteps",
+    "RetryPolicy",
     "ensure_operational_data",
     "ensure_data_availability",
     "ensure_regular_timesteps",
     "filter_files",
+    "validate_fpaths",
+    "get_gaps",
+    "find_gaps",
+    "download_gaps",
     "generate_kerchunk_files",
+    "combine_kerchunk_files",
     "open_explorer",
     "open_explorer_dir",
     "open_abi_channel_guide",
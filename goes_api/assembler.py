@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+
+# Copyright (c) 2022 Ghiggi Gionata
+
+# goes_api is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# goes_api is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# goes_api. If not, see <http://www.gnu.org/licenses/>.
+"""Assemble the files of each timestep and detect the incomplete timesteps."""
+
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from goes_api.checks import _check_channels
+from goes_api.info import available_channels
+from goes_api.table import FileTable
+
+# Products with a file for each ABI channel
+_PRODUCTS_WITH_CHANNELS = ["Rad", "CMIP"]
+
+AssembledTimestep = namedtuple(
+    "AssembledTimestep",
+    ["start_time", "scene_abbr", "fpaths", "is_complete", "missing"],
+)
+AssembledTimestep.__doc__ = """Files of a timestep (of a single scene).
+
+`missing` is the sorted list of the (product, channel) expected but not available.
+`channel` is None for products without channels.
+"""
+
+
+def get_expected_file_keys(product, channels=None):
+    """Return the set of (product, channel) files expected at each timestep (and scene).
+
+    Parameters
+    ----------
+    product : str or list
+        The name of the product(s).
+    channels : list, optional
+        The ABI channels expected for the products with a file per channel (Rad and CMIP).
+        If None, all ABI channels are expected.
+        The default is None.
+    """
+    products = [product] if isinstance(product, str) else product
+    channels = available_channels() if channels is None else _check_channels(channels)
+    expected_keys = set()
+    for product_name in products:
+        if product_name in _PRODUCTS_WITH_CHANNELS:
+            expected_keys.update((product_name, channel) for channel in channels)
+        else:
+            expected_keys.add((product_name, None))
+    return expected_keys
+
+
+def _get_file_keys(table):
+    """Return the list of (product, channel) of the files of a FileTable."""
+    channels = table._get_column("channel").tolist()
+    return list(zip(table._get_column("product").tolist(), channels))
+
+
+class TimestepAssembler:
+    """Collect the files of each timestep and release the timesteps once complete.
+
+    The files are grouped by (start_time, scene_abbr), so that the ABI mesoscale
+    scenes M1 and M2 are assembled separately.
+    A timestep is complete when all the expected (product, channel) files are
+    available (see `get_expected_file_keys`).
+    Incomplete timesteps are released as partial after `timeout` seconds from
+    the arrival of their first file, or when the assembler is flushed.
+    """
+
+    def __init__(self, product, channels=None, timeout=None):
+        """Define the timestep assembler.
+
+        Parameters
+        ----------
+        product : str or list
+            The name of the product(s) expected at each timestep.
+        channels : list, optional
+            The ABI channels expected for the Rad and CMIP products.
+            If None, all ABI channels are expected.
+            The default is None.
+        timeout : float, optional
+            Number of seconds after which an incomplete timestep is released as partial
+            by `pop_ready`. If None (the default), incomplete timesteps are
+            released only by `flush`.
+        """
+        self.expected_keys = get_expected_file_keys(product, channels=channels)
+        self.timeout = timeout
+        self._dict_tables = {}  # {(start_time, scene_abbr): [FileTable]}
+        self._dict_fpaths = {}  # {(start_time, scene_abbr): set of fpaths}
+        self._dict_first_time = {}  # {(start_time, scene_abbr): arrival time of the first file}
+
+    def __len__(self):
+        """Return the number of pending timesteps."""
+        return len(self._dict_tables)
+
+    def __repr__(self):
+        return f"<TimestepAssembler with {len(self)} pending timesteps>"
+
+    @property
+    def pending_start_times(self):
+        """Return the sorted list of start_time of the pending timesteps."""
+        return sorted({start_time for start_time, _ in self._dict_tables})
+
+    def add_files(self, fpaths):
+        """Add files (a list of filepaths or a FileTable).
+
+        Files already added to a pending timestep are ignored.
+        """
+        table = FileTable.from_fpaths(fpaths)
+        if len(table) == 0:
+            return
+        now = time.monotonic()
+        start_times = table["start_time"].tolist()
+        scenes = table._get_column("scene_abbr").tolist()
+        dict_indices = {}
+        for i, key in enumerate(zip(start_times, scenes)):
+            dict_indices.setdefault(key, []).append(i)
+        for key, indices in dict_indices.items():
+            seen_fpaths = self._dict_fpaths.setdefault(key, set())
+            indices = [i for i in indices if table.fpaths[i] not in seen_fpaths]
+            if len(indices) == 0:
+                continue
+            subset = table.subset(np.array(indices))
+            seen_fpaths.update(subset.to_list())
+            self._dict_tables.setdefault(key, []).append(subset)
+            self._dict_first_time.setdefault(key, now)
+
+    def _get_missing(self, key):
+        """Return the FileTable and the sorted list of (product, channel) missing of a pending timestep."""
+        table = FileTable.concat(self._dict_tables[key])
+        missing = self.expected_keys.difference(_get_file_keys(table))
+        return table, sorted(missing, key=lambda file_key: (file_key[0], file_key[1] or ""))
+
+    def _pop(self, key, table, missing):
+        """Remove a timestep from the pending ones and return it as AssembledTimestep."""
+        del self._dict_tables[key]
+        del self._dict_fpaths[key]
+        del self._dict_first_time[key]
+        start_time, scene_abbr = key
+        return AssembledTimestep(
+            start_time=start_time,
+            scene_abbr=scene_abbr,
+            fpaths=sorted(table.to_list()),
+            is_complete=len(missing) == 0,
+            missing=missing,
+        )
+
+    def pop_ready(self):
+        """Return the complete timesteps and the partial timesteps exceeding the timeout.
+
+        The list of AssembledTimestep is sorted by start_time.
+        """
+        now = time.monotonic()
+        list_ready = []
+        for key in sorted(self._dict_tables, key=lambda key: (key[0], key[1] or "")):
+            table, missing = self._get_missing(key)
+            is_expired = self.timeout is not None and now - self._dict_first_time[key] >= self.timeout
+            if len(missing) == 0 or is_expired:
+                list_ready.append(self._pop(key, table, missing))
+        return list_ready
+
+    def flush(self, before=None):
+        """Return the pending timesteps (complete or partial), sorted by start_time.
+
+        If `before` is specified, only the timesteps starting before such time are returned.
+        """
+        list_timesteps = []
+        for key in sorted(self._dict_tables, key=lambda key: (key[0], key[1] or "")):
+            if before is not None and key[0] >= before:
+                continue
+            table, missing = self._get_missing(key)
+            list_timesteps.append(self._pop(key, table, missing))
+        return list_timesteps
+
+
+def assemble_timesteps(fpaths, product=None, channels=None):
+    """Assemble the files of each timestep and separate the complete and partial timesteps.
+
+    Differently from `ensure_all_files`, it detects also the files missing at every timestep
+    (i.e. an ABI band missing over the entire period).
+
+    Parameters
+    ----------
+    fpaths : list or FileTable
+        List of filepaths.
+    product : str or list, optional
+        The name of the product(s) expected at each timestep.
+        If None, the products of the files are expected.
+        The default is None.
+    channels : list, optional
+        The ABI channels expected for the Rad and CMIP products.
+        If None, all ABI channels are expected.
+        The default is None.
+
+    Returns
+    -------
+    (list, list)
+        The lists of complete and partial AssembledTimestep, sorted by start_time.
+    """
+    table = FileTable.from_fpaths(fpaths)
+    if product is None:
+        product = sorted(set(table._get_column("product").tolist()) - {None})
+    assembler = TimestepAssembler(product=product, channels=channels)
+    assembler.add_files(table)
+    list_timesteps = assembler.flush()
+    list_complete = [timestep for timestep in list_timesteps if timestep.is_complete]
+    list_partial = [timestep for timestep in list_timesteps if not timestep.is_complete]
+    return list_complete, list_partial
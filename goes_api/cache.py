@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+
+# Copyright (c) 2022 Ghiggi Gionata
+
+# goes_api is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# goes_api is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# goes_api. If not, see <http://www.gnu.org/licenses/>.
+"""Define the managed local cache of GOES files with LRU eviction.
+
+When a byte budget (`cache_max_bytes`) is specified, the files stored under
+<base_dir>/<SATELLITE>/... are tracked in a SQLite index located at
+<base_dir>/.goes_api/cache.sqlite, which records the size and the last access
+time of each file.
+Before downloading new files, the least recently used files are evicted so that
+the total size of the cache does not exceed the budget.
+The files required by the running request are pinned and never evicted.
+"""
+
+import glob
+import os
+import sqlite3
+import time
+
+from goes_api.io import _get_metadata_dir
+
+_CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    fpath TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    access_time REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_access_time ON files (access_time);
+"""
+
+
+def _get_cache_index_fpath(base_dir):
+    """Return the filepath of the cache index (without creating its directory)."""
+    return os.path.join(base_dir, ".goes_api", "cache.sqlite")
+
+
+def has_cache_index(base_dir):
+    """Check if the local archive under base_dir is managed as a cache (i.e. it has a cache index)."""
+    return os.path.isfile(_get_cache_index_fpath(base_dir))
+
+
+def _connect_cache_index(base_dir):
+    """Open a connection to the cache index (creating it if it does not exist)."""
+    _ = _get_metadata_dir(base_dir)
+    conn = sqlite3.connect(_get_cache_index_fpath(base_dir), timeout=60)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(_CACHE_SCHEMA)
+    return conn
+
+
+def _get_relative_fpaths(base_dir, fpaths):
+    """Return the filepaths relative to base_dir (as stored in the cache index)."""
+    return [os.path.relpath(fpath, base_dir) for fpath in fpaths]
+
+
+def update_cache_index(base_dir, fpaths, sizes=None):
+    """Add (or refresh) files into the cache index and set their access time to now.
+
+    Parameters
+    ----------
+    base_dir : str
+        The GOES base directory.
+    fpaths : list
+        List of filepaths on local storage.
+    sizes : list, optional
+        List with the size of the files.
+        If None (or if a size is None), the size is retrieved from the local storage
+        and the files not existing on the local storage are not added.
+        The default is None.
+    """
+    if sizes is None:
+        sizes = [None] * len(fpaths)
+    now = time.time()
+    rows = []
+    for fpath, rel_fpath, size in zip(fpaths, _get_relative_fpaths(base_dir, fpaths), sizes):
+        if size is None:
+            if not os.path.isfile(fpath):
+                continue
+            size = os.path.getsize(fpath)
+        rows.append((rel_fpath, int(size), now))
+    conn = _connect_cache_index(base_dir)
+    try:
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?)", rows)
+    finally:
+        conn.close()
+
+
+def touch_cache_files(base_dir, fpaths):
+    """Set to now the access time of files on the local storage.
+
+    The files not yet tracked by the cache index (i.e. not downloaded with goes_api)
+    are added to the cache index with the size retrieved from the local storage.
+    """
+    now = time.time()
+    conn = _connect_cache_index(base_dir)
+    try:
+        with conn:
+            rows = []
+            for fpath, rel_fpath in zip(fpaths, _get_relative_fpaths(base_dir, fpaths)):
+                if rel_fpath.startswith(os.pardir):
+                    continue
+                cursor = conn.execute("UPDATE files SET access_time=? WHERE fpath=?", (now, rel_fpath))
+                if cursor.rowcount == 0 and os.path.isfile(fpath):
+                    rows.append((rel_fpath, os.path.getsize(fpath), now))
+            conn.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?)", rows)
+    finally:
+        conn.close()
+
+
+def remove_missing_cache_files(base_dir, fpaths):
+    """Remove from the cache index the files which do not exist on the local storage."""
+    rel_fpaths = [
+        rel_fpath
+        for fpath, rel_fpath in zip(fpaths, _get_relative_fpaths(base_dir, fpaths))
+        if not os.path.isfile(fpath)
+    ]
+    conn = _connect_cache_index(base_dir)
+    try:
+        with conn:
+            conn.executemany("DELETE FROM files WHERE fpath=?", [(rel_fpath,) for rel_fpath in rel_fpaths])
+    finally:
+        conn.close()
+
+
+def get_cache_size(base_dir):
+    """Return the total size (in bytes) of the files tracked by the cache index."""
+    conn = _connect_cache_index(base_dir)
+    try:
+        (size,) = conn.execute("SELECT COALESCE(SUM(size), 0) FROM files").fetchone()
+    finally:
+        conn.close()
+    return size
+
+
+def _remove_empty_dirs(fpath, n_levels=2):
+    """Remove the directories of a file (i.e. the hour and day directories) which are empty."""
+    dir_path = os.path.dirname(fpath)
+    for _ in range(n_levels):
+        try:
+            os.rmdir(dir_path)
+        except OSError:
+            return
+        dir_path = os.path.dirname(dir_path)
+
+
+def evict_cache_files(base_dir, max_bytes, required_bytes=0, pinned_fpaths=None):
+    """Remove the least recently used files until the cache fits into the byte budget.
+
+    The hour and day directories left empty are removed.
+
+    Parameters
+    ----------
+    base_dir : str
+        The GOES base directory.
+    max_bytes : int
+        The byte budget of the cache.
+    required_bytes : int, optional
+        Number of bytes which are going to be added to the cache.
+        The default is 0.
+    pinned_fpaths : list, optional
+        List of filepaths which must not be evicted (i.e. the files of the running request).
+        The default is None.
+
+    Returns
+    -------
+    list
+        List of the evicted filepaths.
+        If the unpinned files are not enough, the budget can still be exceeded.
+    """
+    pinned_rel_fpaths = set(_get_relative_fpaths(base_dir, pinned_fpaths or []))
+    conn = _connect_cache_index(base_dir)
+    evicted_fpaths = []
+    try:
+        (cache_size,) = conn.execute("SELECT COALESCE(SUM(size), 0) FROM files").fetchone()
+        bytes_to_free = cache_size + required_bytes - max_bytes
+        if bytes_to_free <= 0:
+            return evicted_fpaths
+        list_evicted = []
+        for rel_fpath, size in conn.execute("SELECT fpath, size FROM files ORDER BY access_time"):
+            if bytes_to_free <= 0:
+                break
+            if rel_fpath in pinned_rel_fpaths:
+                continue
+            fpath = os.path.join(base_dir, rel_fpath)
+            if os.path.isfile(fpath):
+                os.remove(fpath)
+                _remove_empty_dirs(fpath)
+            list_evicted.append(rel_fpath)
+            evicted_fpaths.append(fpath)
+            bytes_to_free -= size
+        with conn:
+            conn.executemany("DELETE FROM files WHERE fpath=?", [(rel_fpath,) for rel_fpath in list_evicted])
+    finally:
+        conn.close()
+    return evicted_fpaths
+
+
+def rebuild_cache_index(base_dir):
+    """Rebuild the cache index from the GOES files stored under <base_dir>/<SATELLITE>/...
+
+    Use it to track the files of an existing archive before managing it as a cache.
+    The last access time of each file is retrieved from the file system.
+
+    Parameters
+    ----------
+    base_dir : str
+        The GOES base directory.
+    """
+    fpaths = glob.glob(os.path.join(base_dir, "GOES-*", "**", "*.nc*"), recursive=True)
+    rows = []
+    for fpath in fpaths:
+        stat = os.stat(fpath)
+        rows.append((os.path.relpath(fpath, base_dir), stat.st_size, stat.st_atime))
+    conn = _connect_cache_index(base_dir)
+    try:
+        with conn:
+            conn.execute("DELETE FROM files")
+            conn.executemany("INSERT INTO files VALUES (?, ?, ?)", rows)
+    finally:
+        conn.close()
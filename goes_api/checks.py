@@ -404,7 +404,7 @@ def _check_connection_type(connection_type, protocol):
         # Set default connection type
         if connection_type is None:
             connection_type = "bucket"  # set default
-        valid_connection_type = ["bucket", "https", "nc_bytes"]
+        valid_connection_type = ["bucket", "https", "nc_bytes", "simplecache", "blockcache"]
         if connection_type not in valid_connection_type:
             raise ValueError(f"Valid `connection_type` are {valid_connection_type}.")
     return connection_type
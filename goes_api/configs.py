@@ -5,7 +5,7 @@ Created on Thu Mar  9 11:46:07 2023
 @author: ghiggi
 """
 import os
-from typing import Dict
+from typing import Dict, Optional
 
 import yaml
 
@@ -23,7 +23,13 @@ def _write_yaml_file(dictionary, fpath, sort_keys=False):
         yaml.dump(dictionary, f, sort_keys=sort_keys)
 
 
-def define_goes_api_configs(base_dir: str):
+def define_goes_api_configs(
+    base_dir: str,
+    use_manifest: bool = False,
+    max_bytes_per_second: Optional[float] = None,
+    max_requests_per_second: Optional[float] = None,
+    cache_max_bytes: Optional[int] = None,
+):
     """
     Defines the GOES-API configuration file with the given credentials and base directory.
 
@@ -31,6 +37,21 @@ def define_goes_api_configs(base_dir: str):
     ----------
     base_dir : str
         The base directpry where GOES data are stored.
+    use_manifest : bool, optional
+        Whether to store the cloud bucket listings of past hours into a manifest
+        located at <base_dir>/.goes_api/manifest.sqlite and reuse them in later searches.
+        The default is False.
+    max_bytes_per_second : float, optional
+        Default maximum bandwidth (in bytes per second) of the download and kerchunk jobs.
+        The default is None (no limit).
+    max_requests_per_second : float, optional
+        Default maximum number of requests per second of the download and kerchunk jobs.
+        The default is None (no limit).
+    cache_max_bytes : int, optional
+        Byte budget of the local archive under base_dir.
+        If specified, the local archive is managed as a cache: the least recently used
+        files are evicted when a download would exceed the budget.
+        The default is None (the local archive is not managed).
 
     Notes
     -----
@@ -45,6 +66,10 @@ def define_goes_api_configs(base_dir: str):
 
     config_dict = {}
     config_dict["base_dir"] = base_dir
+    config_dict["use_manifest"] = use_manifest
+    config_dict["max_bytes_per_second"] = max_bytes_per_second
+    config_dict["max_requests_per_second"] = max_requests_per_second
+    config_dict["cache_max_bytes"] = cache_max_bytes
 
     # Retrieve user home directory
     home_directory = os.path.expanduser("~")
@@ -99,6 +124,37 @@ def _get_config_key(key, value=None):
     return value
 
 
+def _get_optional_config_key(key, value=None, default=None):
+    """Return the config key if `value` is None, or `default` if the key is not specified."""
+    if value is not None:
+        return value
+    try:
+        config_dict = read_goes_api_configs()
+    except ValueError:
+        return default
+    return config_dict.get(key, default)
+
+
 def get_goes_base_dir(base_dir=None):
     """Return the GOES base directory."""
     return _get_config_key(key="base_dir", value=base_dir)
+
+
+def get_goes_use_manifest(use_manifest=None):
+    """Return whether to use the cloud bucket listing manifest."""
+    return bool(_get_optional_config_key(key="use_manifest", value=use_manifest, default=False))
+
+
+def get_goes_max_bytes_per_second(max_bytes_per_second=None):
+    """Return the maximum bandwidth (in bytes per second) of the download and kerchunk jobs."""
+    return _get_optional_config_key(key="max_bytes_per_second", value=max_bytes_per_second, default=None)
+
+
+def get_goes_max_requests_per_second(max_requests_per_second=None):
+    """Return the maximum number of requests per second of the download and kerchunk jobs."""
+    return _get_optional_config_key(key="max_requests_per_second", value=max_requests_per_second, default=None)
+
+
+def get_goes_cache_max_bytes(cache_max_bytes=None):
+    """Return the byte budget of the local archive (None if the archive is not managed as a cache)."""
+    return _get_optional_config_key(key="cache_max_bytes", value=cache_max_bytes, default=None)
@@ -15,16 +15,21 @@
 # goes_api. If not, see <http://www.gnu.org/licenses/>.
 """Define download functions."""
 
+import asyncio
 import concurrent.futures
 import datetime
+import functools
+import json
 import os
 import time
+from collections import namedtuple
 from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
 import pandas as pd
 from tqdm import tqdm
 
+from goes_api.cache import evict_cache_files, remove_missing_cache_files, update_cache_index
 from goes_api.checks import (
     _check_base_dir,
     _check_download_protocol,
@@ -33,18 +38,29 @@ from goes_api.checks import (
     _check_year_month,
     check_date,
 )
-from goes_api.configs import get_goes_base_dir
+from goes_api.configs import (
+    get_goes_base_dir,
+    get_goes_cache_max_bytes,
+    get_goes_max_bytes_per_second,
+    get_goes_max_requests_per_second,
+)
 from goes_api.info import group_files
-from goes_api.io import get_filesystem
+from goes_api.io import _get_metadata_dir, get_filesystem
 from goes_api.search import (
+    _find_files,
     find_closest_start_time,
-    find_files,
     find_latest_start_time,
     find_next_files,
     find_previous_files,
 )
+from goes_api.table import FileTable
+from goes_api.utils.ratelimit import RateLimiter
+from goes_api.utils.retry import RetryPolicy, classify_error, submit_with_retry
 from goes_api.utils.timing import print_elapsed_time
 
+# Structured description of a failed download
+DownloadFailure = namedtuple("DownloadFailure", ["bucket_fpath", "reason", "exception", "n_attempts"])
+
 ####--------------------------------------------------------------------------.
 
 
@@ -53,7 +69,7 @@ def create_local_directories(fpaths, exist_ok=True):
     _ = [os.makedirs(os.path.dirname(fpath), exist_ok=True) for fpath in fpaths]
 
 
-def remove_corrupted_files(local_fpaths, bucket_fpaths, fs, return_corrupted_fpaths=True):
+def remove_corrupted_files(local_fpaths, bucket_fpaths, fs, return_corrupted_fpaths=True, bucket_sizes=None):
     """
     Check and remove files from local disk which are corrupted.
 
@@ -73,6 +89,10 @@ def remove_corrupted_files(local_fpaths, bucket_fpaths, fs, return_corrupted_fpa
         If True, it returns the list of corrupted files.
         If False, it returns the list of valid files.
         The default is True.
+    bucket_sizes : list, optional
+        List with the size of the files on the cloud bucket (i.e. retrieved when listing the files).
+        If provided, the cloud bucket is queried with fs.info only for the files with unknown (None) size.
+        The default is None.
 
     Returns
     -------
@@ -83,10 +103,13 @@ def remove_corrupted_files(local_fpaths, bucket_fpaths, fs, return_corrupted_fpa
     l_corrupted_bucket = []
     l_valid_local = []
     l_valid_bucket = []
-    for local_fpath, bucket_fpath in zip(local_fpaths, bucket_fpaths):
+    if bucket_sizes is None:
+        bucket_sizes = [None] * len(bucket_fpaths)
+    for local_fpath, bucket_fpath, bucket_size in zip(local_fpaths, bucket_fpaths, bucket_sizes):
         local_exists = os.path.isfile(local_fpath)
         if local_exists:
-            bucket_size = fs.info(bucket_fpath)["size"]
+            if bucket_size is None:
+                bucket_size = fs.info(bucket_fpath)["size"]
             local_size = os.path.getsize(local_fpath)
             if bucket_size != local_size:
                 os.remove(local_fpath)
@@ -100,13 +123,9 @@ def remove_corrupted_files(local_fpaths, bucket_fpaths, fs, return_corrupted_fpa
     return l_valid_local, l_valid_bucket
 
 
-def _select_missing_fpaths(local_fpaths, bucket_fpaths):
-    """Return local and bucket filepaths of files not present on the local storage."""
-    # Keep only non-existing local files
-    idx_not_exist = [not os.path.exists(filepath) for filepath in local_fpaths]
-    local_fpaths = list(np.array(local_fpaths)[idx_not_exist])
-    bucket_fpaths = list(np.array(bucket_fpaths)[idx_not_exist])
-    return local_fpaths, bucket_fpaths
+def _get_missing_fpaths_mask(local_fpaths):
+    """Return the boolean mask of the local filepaths not present on the local storage."""
+    return np.array([not os.path.exists(filepath) for filepath in local_fpaths], dtype=bool)
 
 
 def _remove_bucket_address(fpath):
@@ -123,52 +142,487 @@ def _get_local_from_bucket_fpaths(base_dir, satellite, bucket_fpaths):
     return fpaths
 
 
-def _fs_get_parallel(bucket_fpaths, local_fpaths, fs, n_threads=10, progress_bar=True):
+####--------------------------------------------------------------------------.
+#### Resumable downloads
+# Size of the byte ranges requested when resuming a partial download
+RESUMABLE_CHUNK_SIZE = 16 * 1024 * 1024
+
+
+def _get_part_fpaths(local_fpaths, base_dir):
+    """Return the filepaths of the partial downloads.
+
+    Partial downloads are stored in <base_dir>/.goes_api/partial so that
+    they are not found when searching files on local storage.
     """
-    Run fs.get() asynchronously in parallel using multithreading.
+    partial_dir = os.path.join(_get_metadata_dir(base_dir), "partial")
+    return [os.path.join(partial_dir, os.path.relpath(fpath, base_dir)) + ".part" for fpath in local_fpaths]
 
-    Parameters
-    ----------
-    bucket_fpaths : list
-        List of bucket filepaths to download.
-    local_fpath : list
-        List of filepaths where to save data on local storage.
-    n_threads : int, optional
-        Number of files to be downloaded concurrently.
-        The default is 10. The max value is set automatically to 50.
+
+def _get_part_offset(part_fpath, bucket_fpath, size=None, etag=None):
+    """Return the offset from which to resume a partial download.
+
+    The journal <part_fpath>.json records the cloud bucket filepath, size and etag
+    of the partial download. If they do not match, the download restarts from scratch.
+    """
+    journal_fpath = part_fpath + ".json"
+    journal = {"bucket_fpath": bucket_fpath, "size": size, "etag": etag}
+    if os.path.isfile(part_fpath) and os.path.isfile(journal_fpath):
+        try:
+            with open(journal_fpath) as f:
+                is_same_file = json.load(f) == journal
+        except ValueError:
+            is_same_file = False
+        if is_same_file:
+            offset = os.path.getsize(part_fpath)
+            if size is None or offset <= size:
+                return offset
+    # Start a new partial download
+    os.makedirs(os.path.dirname(part_fpath), exist_ok=True)
+    with open(journal_fpath, "w") as f:
+        json.dump(journal, f)
+    open(part_fpath, "wb").close()
+    return 0
+
+
+def _finalize_part_file(part_fpath, local_fpath, size=None):
+    """Move a completed partial download to its final location (and remove its journal)."""
+    if size is not None and os.path.getsize(part_fpath) != size:
+        os.remove(part_fpath)
+        raise OSError(f"The partial download of {local_fpath} has an unexpected size.")
+    os.replace(part_fpath, local_fpath)
+    journal_fpath = part_fpath + ".json"
+    if os.path.exists(journal_fpath):
+        os.remove(journal_fpath)
+
+
+def _copy_file_chunks(f_src, f_dst, offset=0, size=None, chunk_size=RESUMABLE_CHUNK_SIZE, rate_limiter=None):
+    """Copy a remote file from offset by chunks of chunk_size bytes.
+
+    If a RateLimiter is provided, it waits for the rate limiter before reading each chunk,
+    so that the bandwidth is limited while the file is transferred.
+    """
+    f_src.seek(offset)
+    while size is None or offset < size:
+        n_bytes = chunk_size if size is None else min(chunk_size, size - offset)
+        if rate_limiter is not None:
+            rate_limiter.acquire(n_requests=1, n_bytes=n_bytes)
+        chunk = f_src.read(n_bytes)
+        if not chunk:
+            break
+        f_dst.write(chunk)
+        offset += len(chunk)
+
+
+def _get_file_resumable(
+    fs,
+    bucket_fpath,
+    local_fpath,
+    part_fpath,
+    size=None,
+    etag=None,
+    chunk_size=RESUMABLE_CHUNK_SIZE,
+    rate_limiter=None,
+):
+    """Download a file into a partial file, resuming a previous partial download if present.
+
+    The file is read by chunks of chunk_size bytes.
+    If a RateLimiter is provided, only the remaining bytes are accounted when resuming.
+    """
+    offset = _get_part_offset(part_fpath, bucket_fpath, size=size, etag=etag)
+    if size is None or offset < size:
+        with fs.open(bucket_fpath, "rb", block_size=chunk_size) as f_src, open(part_fpath, "ab") as f_dst:
+            _copy_file_chunks(f_src, f_dst, offset=offset, size=size, chunk_size=chunk_size, rate_limiter=rate_limiter)
+    _finalize_part_file(part_fpath, local_fpath, size=size)
+
+
+def _get_file_throttled(fs, bucket_fpath, local_fpath, size=None, chunk_size=RESUMABLE_CHUNK_SIZE, rate_limiter=None):
+    """Download a file by chunks of chunk_size bytes, waiting for the rate limiter before each chunk."""
+    with fs.open(bucket_fpath, "rb", block_size=chunk_size) as f_src, open(local_fpath, "wb") as f_dst:
+        _copy_file_chunks(f_src, f_dst, size=size, chunk_size=chunk_size, rate_limiter=rate_limiter)
+
+
+async def _run_blocking(func, *args, **kwargs):
+    """Run a blocking function (i.e. local file I/O) in the default executor of the running event loop.
+
+    It avoids to block the concurrent downloads running on the fsspec event loop.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+
+
+async def _copy_file_chunks_async(
+    fs,
+    bucket_fpath,
+    f_dst,
+    offset=0,
+    size=None,
+    chunk_size=RESUMABLE_CHUNK_SIZE,
+    rate_limiter=None,
+):
+    """Async version of _copy_file_chunks using byte range requests."""
+    if size is None:
+        size = (await fs._info(bucket_fpath))["size"]
+    while offset < size:
+        end = min(offset + chunk_size, size)
+        if rate_limiter is not None:
+            await rate_limiter.acquire_async(n_requests=1, n_bytes=end - offset)
+        chunk = await fs._cat_file(bucket_fpath, start=offset, end=end)
+        await _run_blocking(f_dst.write, chunk)
+        offset += len(chunk)
+    return size
+
+
+async def _get_file_resumable_async(
+    fs,
+    bucket_fpath,
+    local_fpath,
+    part_fpath,
+    size=None,
+    etag=None,
+    chunk_size=RESUMABLE_CHUNK_SIZE,
+    rate_limiter=None,
+):
+    """Async version of _get_file_resumable using byte range requests.
+
+    The local file I/O is run outside of the event loop.
+    """
+    offset = await _run_blocking(_get_part_offset, part_fpath, bucket_fpath, size=size, etag=etag)
+    f_dst = await _run_blocking(open, part_fpath, "ab")
+    try:
+        size = await _copy_file_chunks_async(
+            fs,
+            bucket_fpath,
+            f_dst,
+            offset=offset,
+            size=size,
+            chunk_size=chunk_size,
+            rate_limiter=rate_limiter,
+        )
+    finally:
+        await _run_blocking(f_dst.close)
+    await _run_blocking(_finalize_part_file, part_fpath, local_fpath, size=size)
+
+
+async def _get_file_throttled_async(
+    fs,
+    bucket_fpath,
+    local_fpath,
+    size=None,
+    chunk_size=RESUMABLE_CHUNK_SIZE,
+    rate_limiter=None,
+):
+    """Async version of _get_file_throttled using byte range requests."""
+    f_dst = await _run_blocking(open, local_fpath, "wb")
+    try:
+        await _copy_file_chunks_async(
+            fs,
+            bucket_fpath,
+            f_dst,
+            size=size,
+            chunk_size=chunk_size,
+            rate_limiter=rate_limiter,
+        )
+    finally:
+        await _run_blocking(f_dst.close)
+
+
+####--------------------------------------------------------------------------.
+#### Multi byte range downloads
+
+
+def _get_byte_ranges(size, range_chunk_size):
+    """Return the list of (start, end) byte ranges covering a file of the given size."""
+    return [(start, min(start + range_chunk_size, size)) for start in range(0, size, range_chunk_size)]
+
+
+def _allocate_part_file(part_fpath, size):
+    """Create a partial file of the given size."""
+    os.makedirs(os.path.dirname(part_fpath), exist_ok=True)
+    with open(part_fpath, "wb") as f:
+        f.truncate(size)
+
+
+def _write_byte_range(part_fpath, data, start):
+    """Write data at the specified position of the partial file."""
+    with open(part_fpath, "r+b") as f:
+        f.seek(start)
+        f.write(data)
+
+
+def _get_file_ranges(
+    fs,
+    bucket_fpath,
+    local_fpath,
+    part_fpath,
+    size,
+    range_chunk_size,
+    max_ranges_per_file=8,
+    rate_limiter=None,
+):
+    """Download a file with concurrent byte range requests.
+
+    If a RateLimiter is provided, each byte range request waits for the rate limiter.
+    """
+    byte_ranges = _get_byte_ranges(size, range_chunk_size)
+    _allocate_part_file(part_fpath, size)
+
+    def _get_byte_range(byte_range):
+        start, end = byte_range
+        if rate_limiter is not None:
+            rate_limiter.acquire(n_requests=1, n_bytes=end - start)
+        _write_byte_range(part_fpath, fs.cat_file(bucket_fpath, start=start, end=end), start=start)
+
+    with ThreadPoolExecutor(max_workers=min(max_ranges_per_file, len(byte_ranges))) as executor:
+        _ = list(executor.map(_get_byte_range, byte_ranges))
+    _finalize_part_file(part_fpath, local_fpath, size=size)
+
+
+async def _get_file_ranges_async(
+    fs,
+    bucket_fpath,
+    local_fpath,
+    part_fpath,
+    size,
+    range_chunk_size,
+    max_ranges_per_file=8,
+    rate_limiter=None,
+):
+    """Async version of _get_file_ranges.
+
+    The local file I/O is run outside of the event loop.
+    """
+    byte_ranges = _get_byte_ranges(size, range_chunk_size)
+    await _run_blocking(_allocate_part_file, part_fpath, size)
+    semaphore = asyncio.Semaphore(max_ranges_per_file)
+
+    async def _get_byte_range(start, end):
+        async with semaphore:
+            if rate_limiter is not None:
+                await rate_limiter.acquire_async(n_requests=1, n_bytes=end - start)
+            data = await fs._cat_file(bucket_fpath, start=start, end=end)
+        await _run_blocking(_write_byte_range, part_fpath, data, start=start)
+
+    await asyncio.gather(*[_get_byte_range(start, end) for start, end in byte_ranges])
+    await _run_blocking(_finalize_part_file, part_fpath, local_fpath, size=size)
+
+
+####--------------------------------------------------------------------------.
+#### Parallel downloads
+
+
+def _check_n_threads(n_threads, download_engine="threads"):
+    """Check the number of concurrent downloads.
+
+    The max value is 50 for the 'threads' engine and 500 for the 'async' engine.
+    """
+    max_n_threads = 500 if download_engine == "async" else 50
+    n_threads = max(n_threads, 1)
+    n_threads = min(n_threads, max_n_threads)
+    return n_threads
+
+
+def _get_rate_limiter(max_bytes_per_second=None, max_requests_per_second=None):
+    """Return the RateLimiter of a job (or None if no limits are specified).
+
+    If not specified, the limits are retrieved from the GOES-API config file.
+    """
+    max_bytes_per_second = get_goes_max_bytes_per_second(max_bytes_per_second)
+    max_requests_per_second = get_goes_max_requests_per_second(max_requests_per_second)
+    if max_bytes_per_second is None and max_requests_per_second is None:
+        return None
+    return RateLimiter(
+        max_bytes_per_second=max_bytes_per_second,
+        max_requests_per_second=max_requests_per_second,
+    )
+
+
+def _check_download_engine(download_engine):
+    """Check download_engine validity."""
+    if download_engine not in ["threads", "async"]:
+        raise ValueError("Valid `download_engine` values are 'threads' and 'async'.")
+    return download_engine
+
+
+class _AsyncExecutor:
+    """Executor running coroutine functions on the event loop of an fsspec async filesystem.
+
+    The number of coroutines running concurrently is limited by a semaphore.
+    The submit method returns a concurrent.futures.Future, as ThreadPoolExecutor.submit.
+    """
+
+    def __init__(self, fs, max_workers=100):
+        if not getattr(fs, "async_impl", False):
+            raise ValueError("The 'async' download engine requires an fsspec async filesystem (i.e. s3fs, gcsfs).")
+        self.fs = fs
+        self.max_workers = max_workers
+        self._semaphore = None
+        self._futures = []
+
+    async def _run(self, coroutine_function, *args):
+        # The semaphore must be created within the filesystem event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_workers)
+        async with self._semaphore:
+            return await coroutine_function(*args)
+
+    def submit(self, coroutine_function, *args):
+        future = asyncio.run_coroutine_threadsafe(self._run(coroutine_function, *args), self.fs.loop)
+        self._futures.append(future)
+        return future
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        concurrent.futures.wait(self._futures)
+        self._futures = []
+
+
+def _get_download_executor(fs, download_engine="threads", n_threads=10):
+    """Return the executor performing the downloads."""
+    if download_engine == "async":
+        return _AsyncExecutor(fs, max_workers=n_threads)
+    return ThreadPoolExecutor(max_workers=n_threads)
+
+
+def _limit_rate(get_func, rate_limiter):
+    """Wrap a download function so that it waits for the request rate limiter before downloading.
+
+    It is used for the downloads performed with a single request when the bandwidth is not limited.
+    """
+    if asyncio.iscoroutinefunction(get_func):
+
+        async def _get_async(*args):
+            await rate_limiter.acquire_async(n_requests=1)
+            await get_func(*args)
+
+        return _get_async
+
+    def _get(*args):
+        rate_limiter.acquire(n_requests=1)
+        get_func(*args)
+
+    return _get
+
+
+def _submit_fs_get(
+    executor,
+    bucket_fpaths,
+    local_fpaths,
+    fs,
+    pbar=None,
+    part_fpaths=None,
+    bucket_sizes=None,
+    bucket_etags=None,
+    resumable=False,
+    range_chunk_size=None,
+    max_ranges_per_file=8,
+    retry_policy=None,
+    rate_limiter=None,
+):
+    """Submit fs.get() tasks to an executor.
+
+    With an _AsyncExecutor, the fsspec async fs._get_file() coroutine is used instead of fs.get().
+    If resumable=True, the files are downloaded into (and resumed from) the partial
+    files and moved to local_fpaths once completed.
+    If range_chunk_size is specified, the files larger than range_chunk_size are downloaded
+    with concurrent byte range requests into the partial files.
+    part_fpaths must be specified if resumable=True or range_chunk_size is specified.
+    If a RetryPolicy is provided, the failed downloads are retried according to it.
+    If a RateLimiter is provided, each request waits for the rate limiter.
+    If the bandwidth is limited, the files are streamed by chunks of range_chunk_size
+    bytes (RESUMABLE_CHUNK_SIZE if not specified), waiting for the rate limiter before each chunk.
+    If a tqdm progress bar is provided, it is updated each time a download is completed.
 
     Returns
     -------
-    List of cloud bucket filepaths which were not downloaded.
+    Dictionary with structure {<future>: <bucket_fpath>}.
     """
-    # Check n_threads
-    n_threads = max(n_threads, 1)
-    n_threads = min(n_threads, 50)
-
-    ##------------------------------------------------------------------------.
-    # Initialize progress bar
-    if progress_bar:
-        n_files = len(local_fpaths)
-        pbar = tqdm(total=n_files)
-    with ThreadPoolExecutor(max_workers=n_threads) as executor:
-        dict_futures = {
-            executor.submit(fs.get, bucket_path, local_fpath): bucket_path
-            for bucket_path, local_fpath in zip(bucket_fpaths, local_fpaths)
-        }
-        # List files that didn't work
-        l_file_error = []
-        for future in concurrent.futures.as_completed(dict_futures.keys()):
-            # Update the progress bar
-            if progress_bar:
-                pbar.update(1)
-            # Collect all commands that caused problems
-            if future.exception() is not None:
-                l_file_error.append(dict_futures[future])
-    if progress_bar:
-        pbar.close()
-    ##------------------------------------------------------------------------.
-    # Return list of bucket fpaths raising errors
-    return l_file_error
+    is_async = isinstance(executor, _AsyncExecutor)
+    is_throttled = rate_limiter is not None and rate_limiter.max_bytes_per_second is not None
+    chunk_size = RESUMABLE_CHUNK_SIZE if range_chunk_size is None else range_chunk_size
+
+    def _submit(func, *args):
+        if retry_policy is None:
+            return executor.submit(func, *args)
+        return submit_with_retry(executor, retry_policy, func, *args)
+
+    n_files = len(bucket_fpaths)
+    part_fpaths = [None] * n_files if part_fpaths is None else part_fpaths
+    bucket_sizes = [None] * n_files if bucket_sizes is None else bucket_sizes
+    bucket_etags = [None] * n_files if bucket_etags is None else bucket_etags
+    dict_futures = {}
+    for bucket_path, local_fpath, part_fpath, size, etag in zip(
+        bucket_fpaths,
+        local_fpaths,
+        part_fpaths,
+        bucket_sizes,
+        bucket_etags,
+    ):
+        if range_chunk_size is not None and size is not None and size > range_chunk_size:
+            get_func = functools.partial(
+                _get_file_ranges_async if is_async else _get_file_ranges,
+                fs,
+                size=size,
+                range_chunk_size=range_chunk_size,
+                max_ranges_per_file=max_ranges_per_file,
+                rate_limiter=rate_limiter,
+            )
+            future = _submit(get_func, bucket_path, local_fpath, part_fpath)
+        elif resumable:
+            get_func = functools.partial(
+                _get_file_resumable_async if is_async else _get_file_resumable,
+                fs,
+                size=size,
+                etag=etag,
+                chunk_size=chunk_size,
+                rate_limiter=rate_limiter,
+            )
+            future = _submit(get_func, bucket_path, local_fpath, part_fpath)
+        elif is_throttled:
+            get_func = functools.partial(
+                _get_file_throttled_async if is_async else _get_file_throttled,
+                fs,
+                size=size,
+                chunk_size=chunk_size,
+                rate_limiter=rate_limiter,
+            )
+            future = _submit(get_func, bucket_path, local_fpath)
+        else:
+            get_func = fs._get_file if is_async else fs.get
+            if rate_limiter is not None:
+                get_func = _limit_rate(get_func, rate_limiter=rate_limiter)
+            future = _submit(get_func, bucket_path, local_fpath)
+        dict_futures[future] = bucket_path
+    if pbar is not None:
+        for future in dict_futures:
+            future.add_done_callback(lambda _: pbar.update(1))
+    return dict_futures
+
+
+def _get_download_failures(dict_futures):
+    """Wait for the completion of the fs.get() tasks and return the list of DownloadFailure."""
+    # Collect all commands that caused problems
+    return [
+        DownloadFailure(
+            bucket_fpath=dict_futures[future],
+            reason=classify_error(future.exception()),
+            exception=future.exception(),
+            n_attempts=getattr(future, "n_attempts", 1),
+        )
+        for future in concurrent.futures.as_completed(dict_futures.keys())
+        if future.exception() is not None
+    ]
+
+
+def _print_download_failures(failures):
+    """Print the files which could not be downloaded (and the reason)."""
+    if len(failures) == 0:
+        return
+    print(f" - Unable to download the following {len(failures)} files:")
+    for failure in failures:
+        reason = f"{failure.reason} after {failure.n_attempts} attempts: {failure.exception!r}"
+        print(f"   {failure.bucket_fpath} ({reason})")
 
 
 def _get_end_of_day(time):
@@ -204,35 +658,151 @@ def _get_list_daily_time_blocks(start_time, end_time):
     return l_daily_blocks
 
 
-def _enable_multiple_products(func):
-    """Decorator to retrieve filepaths for multiple products."""
-
-    def decorator(*args, **kwargs):
-        # Single product case
-        if isinstance(kwargs["product"], str):
-            fpaths = func(*args, **kwargs)
-            return fpaths
-
-        # Multiproduct case
-        if isinstance(kwargs["product"], list):
-            products = kwargs["product"]
-            list_fpaths = []
-            for product in products:
-                new_kwargs = kwargs.copy()
-                new_kwargs["product"] = product
-                fpaths = func(*args, **new_kwargs)
-                list_fpaths.append(fpaths)
-            # Flat the list
-            fpaths = [item for sublist in list_fpaths for item in sublist]
-            return fpaths
+def _prepare_time_block_download(
+    start_time,
+    end_time,
+    fs,
+    base_dir,
+    force_download=False,
+    **search_kwargs,
+):
+    """Search the files of a time block and define the ones to be downloaded.
+
+    Corrupted files on local storage are removed.
+    The integrity check uses the file sizes retrieved when listing the cloud bucket.
+
+    Returns
+    -------
+    (table, table_to_download)
+        FileTable of the files of the time block and of the files to be downloaded.
+        The `local_fpath` column reports the filepath on local storage.
+    """
+    # Retrieve bucket fpaths (and their sizes)
+    table = _find_files(
+        start_time=start_time,
+        end_time=end_time,
+        operational_checks=False,
+        base_dir=None,
+        verbose=False,
+        **search_kwargs,
+    )
+    # Check there are files to retrieve
+    if len(table) == 0:
+        return table, table
+    bucket_fpaths = table.to_list()
+    bucket_sizes = table.get_key("size")
+
+    # Define local destination fpaths
+    local_fpaths = _get_local_from_bucket_fpaths(
+        base_dir=base_dir,
+        satellite=search_kwargs["satellite"],
+        bucket_fpaths=bucket_fpaths,
+    )
+    table.columns["local_fpath"] = np.array(local_fpaths, dtype=object)
+
+    # Remove corrupted data
+    _ = remove_corrupted_files(
+        local_fpaths=local_fpaths,
+        bucket_fpaths=bucket_fpaths,
+        fs=fs,
+        bucket_sizes=bucket_sizes,
+    )
+
+    # Optionally exclude files that already exist on disk
+    table_to_download = table
+    if not force_download:
+        table_to_download = table.subset(_get_missing_fpaths_mask(local_fpaths))
+
+    # Create local directories
+    create_local_directories(table_to_download.get_key("local_fpath"))
+    return table, table_to_download
+
+
+def _iter_time_blocks(func, time_blocks, prefetch=False):
+    """Yield (start_time, end_time, func(start_time, end_time)) for each time block.
+
+    If prefetch=True, func is called on the next time block in a background
+    thread while the current time block is being processed.
+    """
+    if not prefetch:
+        for start_time, end_time in time_blocks:
+            yield start_time, end_time, func(start_time, end_time)
+        return
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        previous = None
+        for start_time, end_time in time_blocks:
+            future = executor.submit(func, start_time, end_time)
+            if previous is not None:
+                yield previous[0], previous[1], previous[2].result()
+            previous = (start_time, end_time, future)
+        if previous is not None:
+            yield previous[0], previous[1], previous[2].result()
+
+
+def _get_list_requests(satellite, product):
+    """Return the list of (satellite, product) to download."""
+    satellites = [satellite] if isinstance(satellite, str) else satellite
+    products = [product] if isinstance(product, str) else product
+    if not isinstance(satellites, list):
+        raise ValueError("Expecting 'satellite' to be a string or a list.")
+    if not isinstance(products, list):
         raise ValueError("Expecting 'product' to be a string or a list.")
+    satellites = [_check_satellite(satellite) for satellite in satellites]
+    return [(satellite, product) for satellite in satellites for product in products]
+
+
+def _interleave_tables(tables):
+    """Concatenate FileTable interleaving their files (first file of each table, then second, ...)."""
+    if len(tables) <= 1:
+        return FileTable.concat(tables)
+    ranks = np.concatenate([np.arange(len(table)) for table in tables])
+    table_ids = np.concatenate([np.full(len(table), i) for i, table in enumerate(tables)])
+    return FileTable.concat(tables).subset(np.lexsort((table_ids, ranks)))
+
+
+def _prepare_time_block_downloads(start_time, end_time, list_requests, **kwargs):
+    """Search the files of all (satellite, product) requests of a time block.
+
+    The requests are searched concurrently.
+    The files to be downloaded of the different requests are interleaved, so that
+    all requests are downloaded at the same pace by the shared executor.
+
+    Returns
+    -------
+    (table, table_to_download)
+        See _prepare_time_block_download.
+    """
 
-    return decorator
+    def _prepare(request):
+        satellite, product = request
+        return _prepare_time_block_download(start_time, end_time, satellite=satellite, product=product, **kwargs)
+
+    with ThreadPoolExecutor(max_workers=min(len(list_requests), 10)) as executor:
+        results = list(executor.map(_prepare, list_requests))
+    table = FileTable.concat([table for table, _ in results if len(table) > 0])
+    table_to_download = _interleave_tables([table for _, table in results if len(table) > 0])
+    return table, table_to_download
+
+
+def _update_cache(table, table_to_download, base_dir, cache_max_bytes, pinned_fpaths):
+    """Evict the least recently used files of the cache to fit the files to be downloaded.
+
+    The files of the time block are then added to the cache index (with the
+    size listed in the bucket) and marked as recently used.
+    """
+    required_bytes = sum(size for size in table_to_download.get_key("size") if size is not None)
+    evicted_fpaths = evict_cache_files(
+        base_dir,
+        max_bytes=cache_max_bytes,
+        required_bytes=required_bytes,
+        pinned_fpaths=pinned_fpaths,
+    )
+    update_cache_index(base_dir, table.get_key("local_fpath"), sizes=table.get_key("size"))
+    return evicted_fpaths
 
 
 ####---------------------------------------------------------------------------.
 @print_elapsed_time
-@_enable_multiple_products
 def download_files(
     protocol,
     satellite,
@@ -250,6 +820,16 @@ def download_files(
     filter_parameters={},
     base_dir=None,
     fs_args={},
+    use_manifest=None,
+    pipeline=False,
+    download_engine="threads",
+    resumable=False,
+    range_chunk_size=None,
+    max_ranges_per_file=8,
+    retry_policy=None,
+    max_bytes_per_second=None,
+    max_requests_per_second=None,
+    cache_max_bytes=None,
 ):
     """
     Download files from a cloud bucket storage.
@@ -260,8 +840,8 @@ def download_files(
         String specifying the cloud bucket storage from which to retrieve
         the data.
         Use `goes_api.available_protocols()` to retrieve available protocols.
-    satellite : str
-        The name of the satellite.
+    satellite : str or list
+        The name of the satellite(s).
         Use `goes_api.available_satellites()` to retrieve the available satellites.
     sensor : str
         Satellite sensor.
@@ -269,9 +849,12 @@ def download_files(
     product_level : str
         Product level.
         See `goes_api.available_product_levels()` for available product levels.
-    product : str
-        The name of the product to retrieve.
+    product : str or list
+        The name of the product(s) to retrieve.
         See `goes_api.available_products()` for a list of available products.
+        If multiple satellites or products are specified, the files of all
+        of them are searched first and then downloaded by a single pool of
+        workers, interleaving the files of the different products.
     start_time : datetime.datetime
         The start (inclusive) time of the interval period for retrieving the filepaths.
     end_time : datetime.datetime
@@ -292,7 +875,8 @@ def download_files(
         The default is an empty dictionary. Anonymous connection is set by default.
     n_threads: int
         Number of files to be downloaded concurrently.
-        The default is 20. The max value is set automatically to 50.
+        The default is 20. The max value is set automatically to 50
+        (500 with download_engine="async").
     force_download: bool
         If True, it downloads and overwrites the files already existing on local storage.
         If False, it does not downloads files already existing on local storage.
@@ -307,6 +891,69 @@ def download_files(
     verbose : bool, optional
         If True, it print some information concerning the download process.
         The default is False.
+    use_manifest : bool, optional
+        If True, the cloud bucket listings of past hours are stored into (and retrieved from)
+        the manifest located at <base_dir>/.goes_api/manifest.sqlite.
+        If None, it uses the `use_manifest` value specified in the GOES-API config file.
+        The default is None.
+    pipeline : bool, optional
+        If True, the files of the next daily time block are searched while the
+        files of the current daily time block are downloaded, and all downloads
+        are performed by a single thread pool with a single progress bar.
+        At most two daily time blocks are downloaded at the same time: the files
+        of a time block are submitted once the downloads of the time block
+        before the previous one are completed.
+        If False, each daily time block is searched and then downloaded in turn.
+        The default is False.
+    download_engine : str, optional
+        Either "threads" or "async".
+        With "threads", fs.get() calls are run in a thread pool.
+        With "async", the s3fs/gcsfs coroutines are run concurrently on the
+        fsspec event loop, sharing the filesystem connection pool.
+        This allows hundreds of concurrent downloads of small files.
+        The default is "threads".
+    resumable : bool, optional
+        If True, each file is downloaded into a partial file stored in
+        <base_dir>/.goes_api/partial, which is moved to its final location
+        only once completed.
+        An interrupted download is resumed (with byte range requests) from the
+        end of the partial file when download_files is called again.
+        The default is False.
+    range_chunk_size : int, optional
+        Size (in bytes) of the byte ranges used to download large files.
+        Files larger than range_chunk_size are downloaded with concurrent
+        byte range requests into a preallocated partial file, which is moved to
+        its final location once completed. Such downloads are not resumed.
+        If None (the default), each file is downloaded with a single request.
+    max_ranges_per_file : int, optional
+        Maximum number of byte ranges of a file downloaded concurrently.
+        Used only if range_chunk_size is specified.
+        The default is 8.
+    retry_policy : RetryPolicy, optional
+        Policy to retry the failed downloads (i.e. because of throttling or connection resets).
+        The retries are scheduled without blocking the other downloads.
+        Use `goes_api.RetryPolicy()` to retry up to 3 attempts with exponential backoff.
+        The default is None (no retries).
+    max_bytes_per_second : float, optional
+        Maximum download bandwidth in bytes per second.
+        If specified, the files are streamed by chunks of range_chunk_size bytes
+        (16 MiB if range_chunk_size is None), waiting for the bandwidth limiter before
+        each chunk. When resuming a partial download, only the remaining bytes are accounted.
+        If None, it uses the `max_bytes_per_second` value specified in the GOES-API
+        config file (if any). By default, the bandwidth is not limited.
+    max_requests_per_second : float, optional
+        Maximum average number of download requests per second.
+        If None, it uses the `max_requests_per_second` value specified in the GOES-API
+        config file (if any). By default, the request rate is not limited.
+    cache_max_bytes : int, optional
+        Byte budget of the local archive under base_dir.
+        If specified, the local archive is managed as a cache: the size and last
+        access time of the files are tracked in <base_dir>/.goes_api/cache.sqlite
+        and, before downloading new files, the least recently used files are
+        evicted so that the archive does not exceed the budget.
+        The files of the running request are never evicted.
+        If None, it uses the `cache_max_bytes` value specified in the GOES-API
+        config file (if any). By default, the local archive is not managed.
 
     """
     # -------------------------------------------------------------------------.
@@ -315,99 +962,151 @@ def download_files(
     # Checks
     _check_download_protocol(protocol)
     base_dir = _check_base_dir(base_dir)
-    satellite = _check_satellite(satellite)
+    list_requests = _get_list_requests(satellite=satellite, product=product)
     start_time = _check_time(start_time)
     end_time = _check_time(end_time)
+    download_engine = _check_download_engine(download_engine)
+    n_threads = _check_n_threads(n_threads, download_engine=download_engine)
+    if range_chunk_size is not None and range_chunk_size <= 0:
+        raise ValueError("`range_chunk_size` must be a positive integer.")
+    max_ranges_per_file = max(max_ranges_per_file, 1)
+    if retry_policy is not None and not isinstance(retry_policy, RetryPolicy):
+        raise TypeError("`retry_policy` must be a RetryPolicy.")
+    rate_limiter = _get_rate_limiter(
+        max_bytes_per_second=max_bytes_per_second,
+        max_requests_per_second=max_requests_per_second,
+    )
+    cache_max_bytes = get_goes_cache_max_bytes(cache_max_bytes)
 
     # Initialize timing
     t_i = time.time()
 
     # -------------------------------------------------------------------------.
     # Get filesystem
-    fs = get_filesystem(protocol=protocol, fs_args=fs_args)
+    # - With the async engine, enlarge the s3 connection pool to the number of concurrent downloads
+    download_fs_args = fs_args.copy()
+    if download_engine == "async" and protocol == "s3":
+        _ = download_fs_args.setdefault("config_kwargs", {"max_pool_connections": n_threads})
+    fs = get_filesystem(protocol=protocol, fs_args=download_fs_args)
 
     # Define list of daily time blocks (start_time, end_time)
     time_blocks = _get_list_daily_time_blocks(start_time, end_time)
 
     if verbose:
         print("-------------------------------------------------------------------- ")
-        print(f"Starting downloading {product} data between {start_time} and {end_time}.")
+        products = [product] if isinstance(product, str) else product
+        print(f"Starting downloading {', '.join(products)} data between {start_time} and {end_time}.")
+
+    # Define the function searching the files of all products of each daily time block
+    prepare_func = functools.partial(
+        _prepare_time_block_downloads,
+        list_requests=list_requests,
+        fs=fs,
+        base_dir=base_dir,
+        force_download=force_download,
+        protocol=protocol,
+        fs_args=fs_args,
+        sensor=sensor,
+        product_level=product_level,
+        sector=sector,
+        filter_parameters=filter_parameters,
+        use_manifest=use_manifest,
+    )
 
     # Loop over daily time blocks (to search for data)
+    # - If pipeline=True, the next time block is searched while the current one is downloaded
     list_all_local_fpaths = []
     list_all_bucket_fpaths = []
+    list_all_bucket_sizes = []
     n_downloaded_files = 0
-    for start_time, end_time in time_blocks:
-        # Retrieve bucket fpaths
-        bucket_fpaths = find_files(
-            protocol=protocol,
-            fs_args=fs_args,
-            satellite=satellite,
-            sensor=sensor,
-            product_level=product_level,
-            product=product,
-            sector=sector,
-            start_time=start_time,
-            end_time=end_time,
-            filter_parameters=filter_parameters,
-            connection_type="bucket",
-            operational_checks=False,
-            base_dir=None,
-            group_by_key=None,
-            verbose=False,
-        )
-        # Check there are files to retrieve
-        n_files = len(bucket_fpaths)
-        if n_files == 0:
-            continue
-
-        # Define local destination fpaths
-        local_fpaths = _get_local_from_bucket_fpaths(
-            base_dir=base_dir,
-            satellite=satellite,
-            bucket_fpaths=bucket_fpaths,
-        )
-
-        # Record the local and bucket fpath queried
-        list_all_local_fpaths = list_all_local_fpaths + local_fpaths
-        list_all_bucket_fpaths = list_all_bucket_fpaths + bucket_fpaths
-
-        # Remove corrupted data
-        _ = remove_corrupted_files(local_fpaths=local_fpaths, bucket_fpaths=bucket_fpaths, fs=fs)
-
-        # Optionally exclude files that already exist on disk
-        if not force_download:
-            local_fpaths, bucket_fpaths = _select_missing_fpaths(
-                local_fpaths=local_fpaths,
-                bucket_fpaths=bucket_fpaths,
+    list_block_futures = []  # [{<future>: <bucket_fpath>}] of the time blocks being downloaded
+    pipeline_failures = []
+    pbar = None
+    with _get_download_executor(fs, download_engine=download_engine, n_threads=n_threads) as executor:
+        iterator = _iter_time_blocks(prepare_func, time_blocks, prefetch=pipeline)
+        for start_time, end_time, results in iterator:
+            table, table_to_download = results
+            if len(table) == 0:
+                continue
+
+            # Record the local and bucket fpath queried
+            list_all_local_fpaths = list_all_local_fpaths + table.get_key("local_fpath")
+            list_all_bucket_fpaths = list_all_bucket_fpaths + table.to_list()
+            list_all_bucket_sizes = list_all_bucket_sizes + table.get_key("size")
+
+            # Wait for the downloads of the time block before the previous one
+            # - At most two time blocks are downloaded at the same time, so that the
+            #   search does not run ahead of the downloads
+            if len(list_block_futures) == 2:
+                pipeline_failures += _get_download_failures(list_block_futures.pop(0))
+
+            # Evict the least recently used files to fit the new files into the cache
+            # - The files of the running request are pinned
+            if cache_max_bytes is not None:
+                _update_cache(
+                    table,
+                    table_to_download,
+                    base_dir=base_dir,
+                    cache_max_bytes=cache_max_bytes,
+                    pinned_fpaths=list_all_local_fpaths,
+                )
+
+            # Check there are still files to retrieve
+            n_files = len(table_to_download)
+            n_downloaded_files += n_files
+            if n_files == 0:
+                continue
+            local_fpaths = table_to_download.get_key("local_fpath")
+            # - The partial files are used only by the resumable and byte range downloads
+            part_fpaths = None
+            if resumable or range_chunk_size is not None:
+                part_fpaths = _get_part_fpaths(local_fpaths, base_dir=base_dir)
+            download_kwargs = {
+                "bucket_fpaths": table_to_download.to_list(),
+                "local_fpaths": local_fpaths,
+                "bucket_sizes": table_to_download.get_key("size"),
+                "bucket_etags": table_to_download.get_key("etag"),
+                "part_fpaths": part_fpaths,
+                "resumable": resumable,
+                "range_chunk_size": range_chunk_size,
+                "max_ranges_per_file": max_ranges_per_file,
+                "retry_policy": retry_policy,
+                "rate_limiter": rate_limiter,
+            }
+
+            # Print # files to download
+            if verbose:
+                print(f" - Downloading {n_files} files from {start_time} to {end_time}")
+
+            # Download data asynchronously with multithreading
+            if pipeline:
+                # - Add the files to the single progress bar
+                if progress_bar:
+                    pbar = tqdm(total=0) if pbar is None else pbar
+                    pbar.total += n_files
+                    pbar.refresh()
+                list_block_futures.append(_submit_fs_get(executor, fs=fs, pbar=pbar, **download_kwargs))
+                continue
+            block_pbar = tqdm(total=n_files) if progress_bar else None
+            failures = _get_download_failures(
+                _submit_fs_get(executor, fs=fs, pbar=block_pbar, **download_kwargs),
             )
-
-        # Check there are still files to retrieve
-        n_files = len(local_fpaths)
-        n_downloaded_files += n_files
-        if n_files == 0:
-            continue
-
-        # Create local directories
-        create_local_directories(local_fpaths)
-
-        # Print # files to download
-        if verbose:
-            print(f" - Downloading {n_files} files from {start_time} to {end_time}")
-
-        # Download data asynchronously with multithreading
-        l_bucket_errors = _fs_get_parallel(
-            bucket_fpaths=bucket_fpaths,
-            local_fpaths=local_fpaths,
-            fs=fs,
-            n_threads=n_threads,
-            progress_bar=progress_bar,
-        )
-        # Report errors if occured
-        if verbose:
-            n_errors = len(l_bucket_errors)
-            if n_errors > 0:
-                print(f" - Unable to download the following files: {l_bucket_errors}")
+            if progress_bar:
+                block_pbar.close()
+            # Report errors if occured
+            if verbose:
+                _print_download_failures(failures)
+
+        # Wait for the completion of the pipelined downloads
+        if pipeline:
+            for block_futures in list_block_futures:
+                pipeline_failures += _get_download_failures(block_futures)
+            failures = pipeline_failures
+            if pbar is not None:
+                pbar.close()
+            # Report errors if occured
+            if verbose:
+                _print_download_failures(failures)
 
     # Report the total number of file downloaded
     if verbose:
@@ -416,6 +1115,9 @@ def download_files(
         print(f"--> {n_downloaded_files} files have been downloaded in {t_elapsed} seconds !")
         print("-------------------------------------------------------------------- ")
 
+    # Keep track of the requested files (the corrupted ones are dropped below)
+    list_requested_local_fpaths = list_all_local_fpaths
+
     # Check for data corruption
     if check_data_integrity:
         if verbose:
@@ -425,12 +1127,17 @@ def download_files(
             list_all_bucket_fpaths,
             fs=fs,
             return_corrupted_fpaths=False,
+            bucket_sizes=list_all_bucket_sizes,
         )
         if verbose:
             n_corrupted = len(list_all_bucket_fpaths) - len(list_all_local_fpaths)
             print(f" - {n_corrupted} corrupted files were identified and removed.")
             print("--------------------------------------------------------------------")
 
+    # Remove the files failed to download (or corrupted) from the cache index
+    if cache_max_bytes is not None and len(list_requested_local_fpaths) > 0:
+        remove_missing_cache_files(base_dir, list_requested_local_fpaths)
+
     # Return list of local fpaths
     return list_all_local_fpaths
 
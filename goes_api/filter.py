@@ -15,6 +15,8 @@
 # goes_api. If not, see <http://www.gnu.org/licenses/>.
 """Define filtering filepaths functions."""
 
+import numpy as np
+
 from goes_api.checks import (
     _check_channels,
     _check_product_level,
@@ -23,7 +25,7 @@ from goes_api.checks import (
     _check_sensor,
     _check_start_end_time,
 )
-from goes_api.info import _get_info_from_filepath
+from goes_api.table import FileTable
 
 # TODO: enable also filtering by product !
 
@@ -38,8 +40,16 @@ def _ensure_list_if_str(x):
     raise TypeError("Not expected.")
 
 
-def _filter_file(
-    fpath,
+def _get_isin_mask(values, selection):
+    """Return the boolean mask of the values included in selection.
+
+    Files for which the key is not defined (None) are selected.
+    """
+    return np.isin(values, selection) | np.equal(values, None)
+
+
+def _get_selection_mask(
+    table,
     sensor=None,
     product_level=None,
     start_time=None,
@@ -48,74 +58,33 @@ def _filter_file(
     channels=None,
     scene_abbr=None,
 ):
-    """Utility function to filter a filepath based on optional filter_parameters."""
-    # start_time and end_time must be a datetime object
-    sensor = _ensure_list_if_str(sensor)
-    product_level = _ensure_list_if_str(product_level)
-    scan_modes = _ensure_list_if_str(scan_modes)
-    channels = _ensure_list_if_str(channels)
-    scene_abbr = _ensure_list_if_str(scene_abbr)
-
-    # Get info from filepath
-    info_dict = _get_info_from_filepath(fpath)
-
-    # Filter by sensor
-    if sensor is not None:
-
-        file_sensor = info_dict.get("sensor")
-        if file_sensor is not None:
-            if file_sensor not in sensor:
-                return None
-
-    # Filter by product level
-    if product_level is not None:
-        file_product_level = info_dict.get("product_level")
-        if file_product_level is not None:
-            if file_product_level not in product_level:
-                return None
-
-    # Filter by channels
-    if channels is not None:
-        file_channel = info_dict.get("channel")
-        if file_channel is not None:
-            if file_channel not in channels:
-                return None
-
-    # Filter by scan mode
-    if scan_modes is not None:
-        file_scan_mode = info_dict.get("scan_mode")
-        if file_scan_mode is not None:
-            if file_scan_mode not in scan_modes:
-                return None
-
-    # Filter by scene_abbr
-    if scene_abbr is not None:
-        file_scene_abbr = info_dict.get("scene_abbr")
-        if file_scene_abbr is not None:
-            if file_scene_abbr not in scene_abbr:
-                return None
+    """Return the boolean mask of the FileTable files matching optional filter_parameters.
+
+    The filter_parameters must have been already converted to list with _ensure_list_if_str.
+    """
+    mask = np.ones(len(table), dtype=bool)
+    dict_selection = {
+        "sensor": sensor,
+        "product_level": product_level,
+        "channel": channels,
+        "scan_mode": scan_modes,
+        "scene_abbr": scene_abbr,
+    }
+    for key, selection in dict_selection.items():
+        if selection is not None and key in table.columns:
+            mask &= _get_isin_mask(table[key], selection)
 
     # Filter by start_time
+    # - If the file ends before start_time, do not select
+    # - Do not use <= because mesoscale data can have start_time=end_time at min resolution
     if start_time is not None:
-        # If the file ends before start_time, do not select
-        # - Do not use <= because mesoscale data can have start_time=end_time at min resolution
-        file_end_time = info_dict.get("end_time")
-        if file_end_time < start_time:
-            return None
-        # This would exclude a file with start_time within the file
-        # if file_start_time < start_time:
-        #     return None
+        mask &= table["end_time"] >= np.datetime64(start_time, "us")
 
     # Filter by end_time
+    # - If the file starts after end_time, do not select
     if end_time is not None:
-        file_start_time = info_dict.get("start_time")
-        # If the file starts after end_time, do not select
-        if file_start_time >= end_time:
-            return None
-        # This would exclude a file with end_time within the file
-        # if file_end_time > end_time:
-        #     return None
-    return fpath
+        mask &= table["start_time"] < np.datetime64(end_time, "us")
+    return mask
 
 
 def _filter_files(
@@ -128,24 +97,31 @@ def _filter_files(
     channels=None,
     scene_abbr=None,
 ):
-    """Utility function to select filepaths matching optional filter_parameters."""
+    """Utility function to select filepaths matching optional filter_parameters.
+
+    If `fpaths` is a FileTable, it returns the FileTable of the selected files.
+    Otherwise it returns the list of selected filepaths.
+    """
     if isinstance(fpaths, str):
         fpaths = [fpaths]
-    fpaths = [
-        _filter_file(
-            fpath,
-            sensor=sensor,
-            product_level=product_level,
-            start_time=start_time,
-            end_time=end_time,
-            scan_modes=scan_modes,
-            channels=channels,
-            scene_abbr=scene_abbr,
-        )
-        for fpath in fpaths
-    ]
-    fpaths = [fpath for fpath in fpaths if fpath is not None]
-    return fpaths
+    is_table = isinstance(fpaths, FileTable)
+    table = FileTable.from_fpaths(fpaths)
+    # start_time and end_time must be a datetime object
+    filter_parameters = {
+        "sensor": _ensure_list_if_str(sensor),
+        "product_level": _ensure_list_if_str(product_level),
+        "start_time": start_time,
+        "end_time": end_time,
+        "scan_modes": _ensure_list_if_str(scan_modes),
+        "channels": _ensure_list_if_str(channels),
+        "scene_abbr": _ensure_list_if_str(scene_abbr),
+    }
+    # Select the files
+    mask = _get_selection_mask(table, **filter_parameters)
+    table = table.subset(mask)
+    if is_table:
+        return table
+    return table.to_list()
 
 
 def filter_files(
@@ -166,8 +142,9 @@ def filter_files(
 
     Parameters
     ----------
-    fpaths : list
+    fpaths : list or FileTable
         List of filepaths.
+        If a FileTable is provided, the FileTable of the selected files is returned.
     sensor : str or list, optional
         Satellite sensor(s).
         See `goes_api.available_sensors()` for available sensors.
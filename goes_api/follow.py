@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+
+# Copyright (c) 2022 Ghiggi Gionata
+
+# goes_api is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# goes_api is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# goes_api. If not, see <http://www.gnu.org/licenses/>.
+"""Functions to follow the files published in real-time on local disk and cloud buckets."""
+
+import datetime
+import os
+import time
+
+from goes_api.assembler import TimestepAssembler
+from goes_api.checks import (
+    _check_base_dir,
+    _check_connection_type,
+    _check_filter_parameters,
+    _check_product,
+    _check_product_level,
+    _check_protocol,
+    _check_satellite,
+    _check_sector,
+    _check_sensor,
+    _check_time,
+)
+from goes_api.configs import get_goes_base_dir
+from goes_api.filter import _filter_files
+from goes_api.io import (
+    _CACHED_CONNECTION_TYPES,
+    _get_bucket_prefix,
+    _get_connection_filesystem,
+    _get_product_dir,
+    _get_time_dir_tree,
+    _iter_glob_directories,
+    _set_connection_type,
+    get_filesystem,
+)
+from goes_api.table import FileTable
+
+# Time after the start of a timestep during which its files are expected to be published
+_PUBLICATION_LATENCY = datetime.timedelta(minutes=15)
+
+
+def follow_files(
+    satellite,
+    sensor,
+    product_level,
+    product,
+    sector=None,
+    filter_parameters={},
+    start_time=None,
+    end_time=None,
+    connection_type=None,
+    base_dir=None,
+    protocol="file",
+    fs_args={},
+    poll_interval=30,
+    timeout=None,
+    return_partial=False,
+    verbose=False,
+):
+    """
+    Follow the files published in real-time and yield each timestep once complete.
+
+    At each poll, only the hourly (YYYY/DOY/HH) directories which can still receive
+    new files (the current and next hour, and the previous hour shortly after the hour
+    change) are listed. The filenames already seen are skipped, so that only the new
+    files are parsed and filtered.
+    A timestep (of each mesoscale scene) is yielded once all the requested channels
+    are available (see `filter_parameters` and `goes_api.assembler.TimestepAssembler`).
+    Timesteps are yielded only once.
+
+    Parameters
+    ----------
+    satellite : str
+        The name of the satellite.
+        Use `goes_api.available_satellites()` to retrieve the available satellites.
+    sensor : str
+        Satellite sensor.
+        See `goes_api.available_sensors()` for available sensors.
+    product_level : str
+        Product level.
+        See `goes_api.available_product_levels()` for available product levels.
+    product : str
+        The name of the product to retrieve.
+        See `goes_api.available_products()` for a list of available products.
+    sector : str
+        The acronym of the ABI sector for which to retrieve the files.
+        See `goes_api.available_sectors()` for a list of available sectors.
+    filter_parameters : dict, optional
+        Dictionary specifying option filtering parameters.
+        Valid keys includes: `channels`, `scan_modes`, `scene_abbr`.
+        If `channels` is not specified, a timestep of a product with channels
+        (i.e. ABI Rad and CMIP) is complete when all 16 ABI channels are available.
+        The default is a empty dictionary (no filtering).
+    start_time : datetime.datetime, optional
+        Timesteps ending before start_time are not yielded.
+        If start_time is in the past, the first poll catches up the timesteps
+        already published since start_time.
+        If None, it follows the files published from now on.
+        The default is None.
+    end_time : datetime.datetime, optional
+        Timesteps starting after end_time are not yielded.
+        The generator stops once end_time is passed and the last timesteps
+        had the time to be published.
+        If None (the default), the files are followed indefinitely.
+    connection_type : str, optional
+        The type of connection to a cloud bucket.
+        See `goes_api.available_connection_types` for implemented solutions.
+    base_dir : str, optional
+        This argument must be specified only if following files on the local storage
+        when protocol="file", or with the "simplecache" and "blockcache" connection types.
+        If protocol="file" and base_dir is None, base_dir is retrieved from
+        the GOES-API config file.
+        With the "simplecache" and "blockcache" connection types, base_dir is
+        the local directory where the files are cached.
+        The default is None.
+    protocol : str (optional)
+        String specifying the location where to search for the data.
+        If protocol="file", it searches on local storage (indicated by base_dir).
+        Otherwise, protocol refers to a specific cloud bucket storage.
+        The default is "file".
+    fs_args : dict, optional
+        Dictionary specifying optional settings to initiate the fsspec.filesystem.
+        The default is an empty dictionary. Anonymous connection is set by default.
+    poll_interval : float, optional
+        Number of seconds between two successive listings.
+        The default is 30.
+    timeout : float, optional
+        Number of seconds after the arrival of the first file of a timestep
+        after which an incomplete timestep is given up as partial.
+        If None (the default), incomplete timesteps are given up only when
+        they are too old to receive new files, or when end_time is passed.
+    return_partial : bool, optional
+        If False (the default), only the complete timesteps are yielded and
+        the partial timesteps are discarded (and printed if verbose=True).
+        If True, `goes_api.assembler.AssembledTimestep` are yielded for both
+        complete and partial timesteps.
+    verbose : bool, optional
+        If True, it print the number of new files found at each poll.
+        The default is False.
+
+    Yields
+    ------
+    tuple or AssembledTimestep
+        (<start_time>, <list of filepaths>) of each complete timestep.
+        If return_partial=True, the AssembledTimestep of each timestep.
+    """
+    # Check inputs
+    if protocol not in ["file", "local"] and base_dir is not None and connection_type not in _CACHED_CONNECTION_TYPES:
+        raise ValueError(
+            "If protocol is not 'file' or 'local', base_dir must be specified only with the "
+            "'simplecache' and 'blockcache' connection types !",
+        )
+    if not isinstance(product, str):
+        raise ValueError("Expecting 'product' to be a string.")
+    if protocol in ["file", "local"]:
+        base_dir = get_goes_base_dir(base_dir)
+        protocol = "file"
+        fs_args = {}
+    protocol = _check_protocol(protocol)
+    connection_type = _check_connection_type(connection_type, protocol)
+
+    # Separate the local cache directory of the 'simplecache' and 'blockcache' connection types
+    # - With cloud buckets, base_dir is not the directory where to search for the files
+    connection_base_dir = base_dir
+    if protocol != "file":
+        base_dir = None
+
+    base_dir = _check_base_dir(base_dir)
+    satellite = _check_satellite(satellite)
+    sensor = _check_sensor(sensor)
+    product_level = _check_product_level(product_level, product=None)
+    product = _check_product(product, sensor=sensor, product_level=product_level)
+    sector = _check_sector(sector, product=product, sensor=sensor)
+    filter_parameters = _check_filter_parameters(filter_parameters.copy(), sensor, sector=sector)
+    start_time = _check_time(start_time) if start_time is not None else datetime.datetime.utcnow()
+    end_time = _check_time(end_time) if end_time is not None else None
+    if end_time is not None and end_time <= start_time:
+        raise ValueError("`end_time` must be larger than `start_time`.")
+    filter_parameters["start_time"] = start_time
+    filter_parameters["end_time"] = end_time
+
+    # Get filesystem and product directory
+    fs = get_filesystem(protocol=protocol, fs_args=fs_args)
+    connection_fs = _get_connection_filesystem(protocol, connection_type, fs_args=fs_args, base_dir=connection_base_dir)
+    bucket_prefix = _get_bucket_prefix(protocol)
+    product_dir = _get_product_dir(
+        protocol=protocol,
+        base_dir=base_dir,
+        satellite=satellite,
+        sensor=sensor,
+        product_level=product_level,
+        product=product,
+        sector=sector,
+    )
+
+    # Initialize the follower state
+    # - listing_cursor: time before which the directories have been listed after their publication latency
+    # - dict_seen: {<YYYY/DOY/HH>: set of filepaths already listed}
+    # - assembler: files of the pending timesteps
+    listing_cursor = start_time
+    dict_seen = {}
+    assembler = TimestepAssembler(product=product, channels=filter_parameters.get("channels"), timeout=timeout)
+    while True:
+        now = datetime.datetime.utcnow()
+        is_last_poll = end_time is not None and now >= end_time + _PUBLICATION_LATENCY
+
+        # Define the directories which can still receive files
+        # - Files are stored in the directory of their start_time hour
+        # - The first polls catch up from start_time, then the last _PUBLICATION_LATENCY is listed
+        listing_start_time = max(start_time, min([listing_cursor, *assembler.pending_start_times]))
+        listing_end_time = now if end_time is None else max(min(now, end_time), listing_start_time)
+        list_dir_tree = _get_time_dir_tree(listing_start_time, listing_end_time)
+        list_glob_pattern = [os.path.join(product_dir, dir_tree, "*.nc*") for dir_tree in list_dir_tree]
+        dict_seen = {dir_tree: dict_seen.get(dir_tree, set()) for dir_tree in list_dir_tree}
+
+        # List the directories and retrieve the new files
+        # - Invalidate the fsspec listing cache to see the new files
+        fs.invalidate_cache()
+        n_new_files = 0
+        iterator = _iter_glob_directories(fs, list_glob_pattern, bucket_prefix=bucket_prefix)
+        for dir_tree, dict_files in zip(list_dir_tree, iterator):
+            seen_fpaths = dict_seen[dir_tree]
+            dict_new_files = {fpath: info for fpath, info in dict_files.items() if fpath not in seen_fpaths}
+            if len(dict_new_files) == 0:
+                continue
+            seen_fpaths.update(dict_new_files)
+            n_new_files += len(dict_new_files)
+            table = _filter_files(FileTable.from_listing(dict_new_files), sensor, product_level, **filter_parameters)
+            assembler.add_files(table)
+        if verbose:
+            print(f"{now}: {n_new_files} new files found.")
+
+        # Advance the cursor up to the directories which can still receive files
+        listing_cursor = max(listing_cursor, min(listing_end_time, now - _PUBLICATION_LATENCY))
+
+        # Retrieve the complete timesteps (and the expired partial timesteps)
+        # - Partial timesteps too old to receive new files are given up
+        if is_last_poll:
+            list_timesteps = assembler.flush()
+        else:
+            list_timesteps = assembler.flush(before=now - 2 * _PUBLICATION_LATENCY) + assembler.pop_ready()
+
+        # Yield the timesteps in chronological order
+        for timestep in list_timesteps:
+            timestep = timestep._replace(
+                fpaths=_set_connection_type(
+                    timestep.fpaths,
+                    satellite=satellite,
+                    protocol=protocol,
+                    connection_type=connection_type,
+                    fs=connection_fs,
+                ),
+            )
+            if return_partial:
+                yield timestep
+            elif timestep.is_complete:
+                yield timestep.start_time, timestep.fpaths
+            elif verbose:
+                print(f"Timestep {timestep.start_time} is incomplete. Missing files: {timestep.missing}")
+
+        # Stop once end_time is passed
+        if is_last_poll:
+            return
+        time.sleep(poll_interval)
@@ -15,10 +15,12 @@
 # goes_api. If not, see <http://www.gnu.org/licenses/>.
 
 import datetime
+import functools
 import os
+import re
 
 import numpy as np
-from trollsift import Parser
+from trollsift.parser import regex_format
 
 from goes_api.alias import (
     BUCKET_PROTOCOLS,
@@ -289,7 +291,7 @@ def available_group_keys():
 
 def available_connection_types():
     """Return a list of available connect_type to connect to cloud buckets."""
-    return ["bucket", "https", "nc_bytes"]
+    return ["bucket", "https", "nc_bytes", "simplecache", "blockcache"]
 
 
 ####---------------------------------------------------------------------------.
@@ -376,28 +378,111 @@ def _round_datetime_to_nearest_minute(time):
     return rounded
 
 
-def _get_info_from_filename(fname):
-    """Retrieve file information dictionary from filename."""
+_TIME_KEYS = ["start_time", "end_time", "creation_time"]
+
+
+@functools.lru_cache(maxsize=None)
+def _get_fname_regex(sensor, product_level):
+    """Return the compiled regular expression of the filename pattern of a sensor product level.
+
+    The regular expression is derived from the trollsift patterns defined in `listing.GLOB_FNAME_PATTERN`.
+    """
     from goes_api.listing import GLOB_FNAME_PATTERN
 
+    fpattern = GLOB_FNAME_PATTERN[sensor][product_level]
+    return re.compile("^" + regex_format(fpattern) + "$")
+
+
+def _parse_time_string(time_str):
+    """Convert a YYYYDOYhhmmss<fraction of seconds> string to a datetime object."""
+    microsecond = int(time_str[13:19].ljust(6, "0")) if len(time_str) > 13 else 0
+    time = datetime.datetime(
+        int(time_str[0:4]),
+        1,
+        1,
+        int(time_str[7:9]),
+        int(time_str[9:11]),
+        int(time_str[11:13]),
+        microsecond,
+    )
+    return time + datetime.timedelta(days=int(time_str[4:7]) - 1)
+
+
+def _is_valid_time_string(time_str):
+    """Check if a string has the YYYYDOYhhmmss<fraction of seconds> format.
+
+    As required by the filename patterns, the fraction of seconds has at least one digit.
+    """
+    return time_str.isdigit() and 14 <= len(time_str) <= 19
+
+
+def _get_invalid_time_string_index(list_time_str):
+    """Return the index of the first invalid YYYYDOYhhmmss<fraction of seconds> string."""
+    return [_is_valid_time_string(time_str) for time_str in list_time_str].index(False)
+
+
+def _parse_time_strings(list_time_str):
+    """Convert a list of YYYYDOYhhmmss<fraction of seconds> strings to a datetime64[us] array.
+
+    The conversion is vectorized by decoding the unicode code points of the strings.
+    The strings are validated as in `_is_valid_time_string`.
+    """
+    if len(list_time_str) == 0:
+        return np.array([], dtype="M8[us]")
+    arr = np.asarray(list_time_str, dtype="U20")
+    codes = arr.view(np.uint32).reshape(arr.size, 20).astype(np.int64)
+    digits = codes - ord("0")
+    # Check format validity
+    is_digit = (digits >= 0) & (digits <= 9)
+    is_empty = codes == 0
+    if not np.all(is_digit[:, :14]) or not np.all(is_digit[:, 14:19] | is_empty[:, 14:19]) or np.any(~is_empty[:, 19]):
+        raise ValueError("Invalid time string.")
+
+    def _to_int(start, end):
+        values = np.zeros(arr.size, dtype=np.int64)
+        for i in range(start, end):
+            values = values * 10 + digits[:, i]
+        return values
+
+    year = _to_int(0, 4)
+    day_of_year = _to_int(4, 7)
+    hour = _to_int(7, 9)
+    minute = _to_int(9, 11)
+    second = _to_int(11, 13)
+    # Fraction of seconds (padded with zeros like strptime %f)
+    microsecond = np.zeros(arr.size, dtype=np.int64)
+    for i in range(13, 19):
+        microsecond = microsecond + np.where(is_empty[:, i], 0, digits[:, i]) * 10 ** (18 - i)
+    times = (year - 1970).astype("M8[Y]").astype("M8[us]")
+    times = times + (day_of_year - 1).astype("m8[D]")
+    times = times + hour.astype("m8[h]") + minute.astype("m8[m]")
+    times = times + second.astype("m8[s]") + microsecond.astype("m8[us]")
+    return times
+
+
+def _match_filename(fname):
+    """Return the raw string fields of a GOES filename."""
     # Infer sensor and product_level
     sensor = _infer_sensor(fname)
     product_level = _infer_product_level(fname)
 
-    # Retrieve file pattern
-    fpattern = GLOB_FNAME_PATTERN[sensor][product_level]
-
     # Retrieve information from filename
-    p = Parser(fpattern)
-    info_dict = p.parse(fname)
-
-    # For sensor other than ABI, add scan_mode = ""
-    if "scan_mode" not in info_dict:
-        info_dict["scan_mode"] = ""
+    match = _get_fname_regex(sensor, product_level).match(fname)
+    if match is None:
+        raise ValueError(f"{fname} does not match the expected {sensor} {product_level} filename pattern.")
+    info_dict = match.groupdict()
 
     # Assert sensor and product_level are correct
     assert sensor == info_dict["sensor"]
     assert product_level == info_dict["product_level"]
+    return info_dict
+
+
+def _finalize_info(info_dict):
+    """Derive the file information which are not directly encoded as a field of the filename pattern."""
+    # For sensor other than ABI, add scan_mode = ""
+    if "scan_mode" not in info_dict:
+        info_dict["scan_mode"] = ""
 
     # Special treatment for ABI L2 products
     if info_dict.get("product_scene_abbr") is not None:
@@ -414,15 +499,8 @@ def _get_info_from_filename(fname):
             info_dict["scan_mode"] = scan_mode
             info_dict["channel"] = channel
 
-    # Round start time
-    # - ABI to minutes ? (TODO: how to deal with 30s mesoscale !)
-    # - GLM to seconds
-    if info_dict["product"] == "ABI":
-        info_dict["start_time"] = _round_datetime_to_nearest_minute(info_dict["start_time"])
-        info_dict["end_time"] = _round_datetime_to_nearest_minute(info_dict["end_time"])
-
     # Special treatment for ABI products to retrieve sector
-    if sensor == "ABI":
+    if info_dict["sensor"] == "ABI":
         if "M" in info_dict["scene_abbr"]:
             sector = "M"
         else:
@@ -442,11 +520,135 @@ def _get_info_from_filename(fname):
     else:
         raise ValueError(f"Processing of satellite {platform_shortname} not yet implemented.")
     info_dict["satellite"] = satellite
+    return info_dict
+
+
+@functools.lru_cache(maxsize=100_000)
+def _get_cached_info_from_filename(fname):
+    """Retrieve file information dictionary from filename (cached)."""
+    info_dict = _match_filename(fname)
 
-    # Return info dictionary
+    # Convert time strings to datetime objects
+    for key in _TIME_KEYS:
+        if not _is_valid_time_string(info_dict[key]):
+            raise ValueError(f"Unexpected {key} format in {fname}.")
+        info_dict[key] = _parse_time_string(info_dict[key])
+
+    # Derive other information
+    info_dict = _finalize_info(info_dict)
+
+    # Round start time
+    # - ABI to minutes ? (TODO: how to deal with 30s mesoscale !)
+    # - GLM to seconds
+    if info_dict["product"] == "ABI":
+        info_dict["start_time"] = _round_datetime_to_nearest_minute(info_dict["start_time"])
+        info_dict["end_time"] = _round_datetime_to_nearest_minute(info_dict["end_time"])
     return info_dict
 
 
+def _get_info_from_filename(fname):
+    """Retrieve file information dictionary from filename."""
+    # Return a copy to not alter the cached dictionary
+    return _get_cached_info_from_filename(fname).copy()
+
+
+def _get_fnames(fpaths):
+    """Return the filenames of a list of filepaths."""
+    if os.sep == "/":
+        return [fpath[fpath.rfind("/") + 1 :] for fpath in fpaths]
+    return [os.path.basename(fpath) for fpath in fpaths]
+
+
+def _get_info_arrays_from_filepaths(fpaths):
+    """Retrieve file information from a list of filepaths in a single pass.
+
+    The filenames are split into the time fields and the static part (i.e. product, channel).
+    The filename pattern is then matched only once for each unique static part,
+    while the times are validated and converted with vectorized operations.
+
+    It returns a dictionary with structure {<key>: np.ndarray}, where the
+    time keys are datetime64[us] arrays and the other keys are object arrays.
+    Keys not defined for a file (i.e. `channel` for GLM) are set to None.
+    """
+    fnames = _get_fnames(fpaths)
+    n_files = len(fnames)
+    # Split <prefix>_s<start_time>_e<end_time>_c<creation_time>.nc<suffix>
+    list_parts = list(zip(*[fname.rsplit("_", 3) for fname in fnames]))
+    if n_files > 0 and (len(list_parts) != 4 or len(list_parts[3]) != n_files):
+        idx = [fname.count("_") < 3 for fname in fnames].index(True)
+        _ = _match_filename(fnames[idx])
+        raise ValueError(f"Unexpected filename {fnames[idx]}.")
+    if n_files == 0:
+        list_parts = [(), (), (), ()]
+    prefixes, start_parts, end_parts, creation_parts = list_parts
+    dict_time_str = {
+        "start_time": [part[1:] for part in start_parts],
+        "end_time": [part[1:] for part in end_parts],
+        "creation_time": [part[1:].split(".", 1)[0] for part in creation_parts],
+    }
+    # The static key includes everything but the time digits
+    # - Invalid filenames are catched by the pattern matching and the time conversion
+    static_keys = [
+        f"{prefix}{start_part[:1]}{end_part[:1]}{creation_part.lstrip('c0123456789')}"
+        for prefix, start_part, end_part, creation_part in zip(prefixes, start_parts, end_parts, creation_parts)
+    ]
+    dict_static_idx = {}
+    static_indices = np.array([dict_static_idx.setdefault(key, len(dict_static_idx)) for key in static_keys])
+    first_indices = np.unique(static_indices, return_index=True)[1] if n_files > 0 else []
+
+    # Parse the static information of each unique static part
+    # - The whole filename pattern is validated on a file having such static part
+    list_static_info = []
+    for idx in first_indices:
+        info_dict = _match_filename(fnames[idx])
+        for key in _TIME_KEYS:
+            del info_dict[key]
+        list_static_info.append(_finalize_info(info_dict))
+
+    # Define columnar arrays
+    keys = list(dict.fromkeys(key for info_dict in list_static_info for key in info_dict))
+    info_arrays = {}
+    for key in keys:
+        arr = np.empty(len(list_static_info), dtype=object)
+        arr[:] = [info_dict.get(key) for info_dict in list_static_info]
+        info_arrays[key] = arr[static_indices]
+    for key in _TIME_KEYS:
+        try:
+            info_arrays[key] = _parse_time_strings(dict_time_str[key])
+        except ValueError:
+            idx = _get_invalid_time_string_index(dict_time_str[key])
+            raise ValueError(f"Unexpected {key} format in {fnames[idx]}.")
+
+    # Round start time (see _get_cached_info_from_filename)
+    if n_files > 0:
+        is_rounded = info_arrays["product"] == "ABI"
+        for key in ["start_time", "end_time"]:
+            rounded = (info_arrays[key] + np.timedelta64(30, "s")).astype("M8[m]").astype("M8[us]")
+            info_arrays[key] = np.where(is_rounded, rounded, info_arrays[key])
+    return info_arrays
+
+
+def get_info_from_filepaths(fpaths):
+    """Retrieve file information from a list of filepaths in a single pass.
+
+    Parameters
+    ----------
+    fpaths : list
+        List of filepaths.
+
+    Returns
+    -------
+    info_arrays : dict
+        Dictionary with structure {<key>: np.ndarray}.
+        The time keys (`start_time`, `end_time`, `creation_time`) are datetime64[us] arrays.
+        Keys not defined for a file (i.e. `channel` for GLM) are set to None.
+
+    """
+    if isinstance(fpaths, str):
+        fpaths = [fpaths]
+    return _get_info_arrays_from_filepaths(list(fpaths))
+
+
 def _get_info_from_filepath(fpath):
     """Retrieve file information dictionary from filepath."""
     if not isinstance(fpath, str):
@@ -457,13 +659,17 @@ def _get_info_from_filepath(fpath):
 
 def _get_key_from_filepaths(fpaths, key):
     """Extract specific key information from a list of filepaths."""
+    from goes_api.table import FileTable
+
+    if isinstance(fpaths, FileTable):
+        return fpaths.get_key(key)
     if isinstance(fpaths, str):
         fpaths = [fpaths]
     return [_get_info_from_filepath(fpath)[key] for fpath in fpaths]
 
 
 def get_key_from_filepaths(fpaths, key):
-    """Extract specific key information from a list of filepaths."""
+    """Extract specific key information from a list of filepaths (or a FileTable)."""
     if isinstance(fpaths, dict):
         fpaths = {k: _get_key_from_filepaths(v, key=key) for k, v in fpaths.items()}
     else:
@@ -476,9 +682,18 @@ def get_key_from_filepaths(fpaths, key):
 
 
 def _group_fpaths_by_key(fpaths, key="start_time"):
-    """Utils function to group filepaths by key contained into filename."""
+    """Utils function to group filepaths by key contained into filename.
+
+    `fpaths` can be a list of filepaths or a FileTable.
+    """
+    from goes_api.table import FileTable
+
     # - Retrieve key sorting index
-    list_key_values = [_get_info_from_filepath(fpath)[key] for fpath in fpaths]
+    if isinstance(fpaths, FileTable):
+        list_key_values = fpaths.get_key(key)
+        fpaths = fpaths.to_list()
+    else:
+        list_key_values = [_get_info_from_filepath(fpath)[key] for fpath in fpaths]
     idx_key_sorting = np.array(list_key_values).argsort()
     # - Sort fpaths and key_values by key values
     fpaths = np.array(fpaths)[idx_key_sorting]
@@ -500,7 +715,7 @@ def group_files(fpaths, key="start_time"):
 
     Parameters
     ----------
-    fpaths : list
+    fpaths : list or FileTable
         List of filepaths.
     key : str
         Key by which to group the list of filepaths.
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+
+# Copyright (c) 2022 Ghiggi Gionata
+
+# goes_api is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# goes_api is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# goes_api. If not, see <http://www.gnu.org/licenses/>.
+"""Functions to report the gaps of local and cloud bucket archives."""
+
+import numpy as np
+import pandas as pd
+
+from goes_api.assembler import _PRODUCTS_WITH_CHANNELS
+from goes_api.checks import _check_channels, _check_start_end_time, _check_time
+from goes_api.info import available_channels
+from goes_api.operations import _get_expected_intervals
+from goes_api.table import FileTable
+
+_GAPS_COLUMNS = ["type", "start_time", "end_time", "scene_abbr", "scan_mode", "n_timesteps", "channels"]
+
+
+def _get_runs(values):
+    """Return the start and end (exclusive) indices of the runs of equal consecutive values."""
+    if len(values) == 0:
+        return np.array([], dtype=int), np.array([], dtype=int)
+    is_change = np.ones(len(values), dtype=bool)
+    is_change[1:] = values[1:] != values[:-1]
+    starts = np.where(is_change)[0]
+    ends = np.append(starts[1:], len(values))
+    return starts, ends
+
+
+def _get_scene_gaps(table, start_time=None, end_time=None, channels=None):
+    """Return the list of gaps (as dictionaries) of the files of a single scene."""
+    list_gaps = []
+    timesteps, first_idx, inverse = np.unique(table["start_time"], return_index=True, return_inverse=True)
+    inverse = inverse.ravel()
+    timestep_end_times = np.full(len(timesteps), np.iinfo(np.int64).min, dtype=np.int64)
+    np.maximum.at(timestep_end_times, inverse, table["end_time"].astype(np.int64))
+    timestep_end_times = timestep_end_times.astype(table["end_time"].dtype)
+    timestep_scan_modes = table._get_column("scan_mode")[first_idx]
+    sensor = table._get_column("sensor")[0]
+    sector = table._get_column("sector")[0]
+    scene_abbr = table._get_column("scene_abbr")[0]
+    product = table._get_column("product")[0]
+    expected_intervals = _get_expected_intervals(timestep_scan_modes, sensor, sector, timesteps)
+
+    def _add_gap(gap_type, gap_start_time, gap_end_time, scan_mode=None, n_timesteps=None, gap_channels=None):
+        list_gaps.append(
+            {
+                "type": gap_type,
+                "start_time": gap_start_time,
+                "end_time": gap_end_time,
+                "scene_abbr": scene_abbr,
+                "scan_mode": scan_mode,
+                "n_timesteps": n_timesteps,
+                "channels": gap_channels,
+            },
+        )
+
+    # Missing acquisitions at the extremities of the period
+    # - The expected interval is unknown (0) if a non-ABI product has a single timestep
+    has_interval = expected_intervals > np.timedelta64(0, "us")
+    if start_time is not None and has_interval[0] and timesteps[0] - start_time > expected_intervals[0]:
+        n_missing = int((timesteps[0] - start_time) // expected_intervals[0])
+        _add_gap("missing_acquisitions", start_time, timesteps[0], timestep_scan_modes[0], n_missing)
+
+    # Missing acquisitions between consecutive timesteps
+    # - The expected interval is defined by the scan mode of the previous timestep
+    intervals = np.diff(timesteps)
+    gap_idx = np.where(intervals > expected_intervals[:-1])[0]
+    n_missing = np.round(intervals[gap_idx] / expected_intervals[gap_idx]).astype(int) - 1
+    for i, n in zip(gap_idx.tolist(), n_missing.tolist()):
+        _add_gap("missing_acquisitions", timestep_end_times[i], timesteps[i + 1], timestep_scan_modes[i], max(n, 1))
+
+    if end_time is not None and has_interval[-1] and end_time - timestep_end_times[-1] > expected_intervals[-1]:
+        n_missing = int((end_time - timestep_end_times[-1]) // expected_intervals[-1])
+        _add_gap("missing_acquisitions", timestep_end_times[-1], end_time, timestep_scan_modes[-1], n_missing)
+
+    # Scan mode switches
+    if sensor == "ABI":
+        starts, _ = _get_runs(timestep_scan_modes.astype(str))
+        for i in starts[1:].tolist():
+            scan_mode = f"{timestep_scan_modes[i - 1]}->{timestep_scan_modes[i]}"
+            _add_gap("scan_mode_switch", timesteps[i - 1], timesteps[i], scan_mode)
+
+    # Missing channels
+    # - Consecutive timesteps missing the same channels are reported as a single interval
+    if product in _PRODUCTS_WITH_CHANNELS:
+        expected_channels = np.sort(np.array(available_channels() if channels is None else channels, dtype=object))
+        file_channels = table._get_column("channel").astype(str)
+        channel_idx = np.minimum(np.searchsorted(expected_channels, file_channels), len(expected_channels) - 1)
+        is_expected = expected_channels[channel_idx] == file_channels
+        is_available = np.zeros((len(timesteps), len(expected_channels)), dtype=bool)
+        is_available[inverse[is_expected], channel_idx[is_expected]] = True
+        # Encode the missing channels of each timestep as an integer bitmask
+        missing_codes = (~is_available).astype(np.int64) @ (1 << np.arange(len(expected_channels), dtype=np.int64))
+        starts, ends = _get_runs(missing_codes)
+        for i_start, i_end in zip(starts.tolist(), ends.tolist()):
+            if missing_codes[i_start] == 0:
+                continue
+            _add_gap(
+                "missing_channels",
+                timesteps[i_start],
+                timestep_end_times[i_end - 1],
+                timestep_scan_modes[i_start],
+                i_end - i_start,
+                ",".join(expected_channels[~is_available[i_start]]),
+            )
+    return list_gaps
+
+
+def get_gaps(fpaths, start_time=None, end_time=None, channels=None):
+    """Return a table with all the gaps of a list of files of a single product.
+
+    The following gaps are reported:
+    - missing_acquisitions: the time between consecutive timesteps is larger than
+      the ABI scan mode interval (see `listing.ABI_INTERVAL`), or than the smallest
+      interval for the other sensors. If start_time and end_time are specified,
+      the missing acquisitions at the extremities of the period are reported too.
+    - missing_channels: timesteps of the Rad and CMIP products without all the expected channels.
+      Consecutive timesteps missing the same channels are reported as a single interval.
+    - scan_mode_switch: the ABI scan mode changes between two consecutive timesteps.
+    The mesoscale scenes (M1 and M2) are analyzed separately.
+
+    Parameters
+    ----------
+    fpaths : list or FileTable
+        List of filepaths of a single product.
+    start_time : datetime.datetime, optional
+        The start time of the period which should be covered.
+        The default is None.
+    end_time : datetime.datetime, optional
+        The end time of the period which should be covered.
+        The default is None.
+    channels : list, optional
+        The expected ABI channels of the Rad and CMIP products.
+        If None, all ABI channels are expected.
+        The default is None.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Table with columns `type`, `start_time`, `end_time`, `scene_abbr`, `scan_mode`,
+        `n_timesteps` (number of missing acquisitions or of timesteps with missing channels)
+        and `channels` (the comma-separated missing channels), sorted by start_time.
+    """
+    table = FileTable.from_fpaths(fpaths)
+    start_time = np.datetime64(_check_time(start_time), "us") if start_time is not None else None
+    end_time = np.datetime64(_check_time(end_time), "us") if end_time is not None else None
+    channels = _check_channels(channels)
+    if len(table) == 0:
+        if start_time is None or end_time is None:
+            return pd.DataFrame(columns=_GAPS_COLUMNS)
+        gap = ["missing_acquisitions", start_time, end_time, None, None, None, None]
+        return pd.DataFrame([gap], columns=_GAPS_COLUMNS)
+    list_gaps = []
+    scenes = table._get_column("scene_abbr")
+    for scene in sorted(set(scenes.tolist()), key=lambda scene: scene or ""):
+        scene_table = table.subset(np.equal(scenes, scene))
+        list_gaps += _get_scene_gaps(scene_table, start_time=start_time, end_time=end_time, channels=channels)
+    df = pd.DataFrame(list_gaps, columns=_GAPS_COLUMNS)
+    df["start_time"] = pd.to_datetime(df["start_time"])
+    df["end_time"] = pd.to_datetime(df["end_time"])
+    df["n_timesteps"] = df["n_timesteps"].astype("Int64")
+    return df.sort_values(["start_time", "type"], kind="stable").reset_index(drop=True)
+
+
+def find_gaps(
+    satellite,
+    sensor,
+    product_level,
+    product,
+    start_time,
+    end_time,
+    sector=None,
+    filter_parameters={},
+    base_dir=None,
+    protocol="file",
+    fs_args={},
+    use_manifest=None,
+    max_concurrent_listings=10,
+    verbose=False,
+):
+    """Return a table with all the gaps of a product over a time period.
+
+    The files are searched on local storage or on a cloud bucket (see `find_files`).
+    For cloud buckets, use `use_manifest=True` to retrieve the listings of past hours
+    from the listing manifest, so that multi-year inventories are summarized without
+    listing the bucket again.
+    See `get_gaps` for the description of the gaps reported and of the returned table.
+    The `channels` filter parameter defines the expected channels of the Rad and CMIP products.
+
+    The returned table can be used to download the missing files with `download_gaps`.
+    """
+    from goes_api.search import _find_files
+
+    start_time, end_time = _check_start_end_time(start_time, end_time)
+    table = _find_files(
+        satellite=satellite,
+        sensor=sensor,
+        product_level=product_level,
+        product=product,
+        start_time=start_time,
+        end_time=end_time,
+        sector=sector,
+        filter_parameters=filter_parameters,
+        base_dir=base_dir,
+        protocol=protocol,
+        fs_args=fs_args,
+        verbose=verbose,
+        operational_checks=False,
+        max_concurrent_listings=max_concurrent_listings,
+        use_manifest=use_manifest,
+    )
+    return get_gaps(
+        table,
+        start_time=start_time,
+        end_time=end_time,
+        channels=filter_parameters.get("channels"),
+    )
+
+
+def download_gaps(
+    gaps,
+    protocol,
+    satellite,
+    sensor,
+    product_level,
+    product,
+    sector=None,
+    filter_parameters={},
+    **download_kwargs,
+):
+    """Download the files of the missing acquisitions and missing channels of a gaps table.
+
+    The scan mode switches are ignored.
+    The gaps are grouped by day, and the files of each day are searched only once,
+    between the start of the first gap and the end of the last gap of the day.
+    If all the gaps of a day are missing channels, only the missing channels are downloaded.
+    The files of this period which already exist on local storage are not downloaded again
+    (unless force_download=True).
+    See `goes_api.download_files` for the description of the other arguments.
+
+    Returns
+    -------
+    list
+        List of the local filepaths of the downloaded files.
+    """
+    from goes_api.download import download_files
+
+    gaps = gaps[gaps["type"] != "scan_mode_switch"]
+    list_local_fpaths = []
+    for _, day_gaps in gaps.groupby(gaps["start_time"].dt.floor("D"), sort=True):
+        day_filter_parameters = filter_parameters.copy()
+        if (day_gaps["type"] == "missing_channels").all():
+            channels = {channel for gap_channels in day_gaps["channels"] for channel in gap_channels.split(",")}
+            day_filter_parameters["channels"] = sorted(channels)
+        scenes = sorted(set(day_gaps["scene_abbr"].dropna()) & {"M1", "M2"})
+        if len(scenes) > 0:
+            day_filter_parameters["scene_abbr"] = scenes
+        list_local_fpaths += download_files(
+            protocol=protocol,
+            satellite=satellite,
+            sensor=sensor,
+            product_level=product_level,
+            product=product,
+            sector=sector,
+            start_time=day_gaps["start_time"].min().to_pydatetime(),
+            end_time=day_gaps["end_time"].max().to_pydatetime(),
+            filter_parameters=day_filter_parameters,
+            **download_kwargs,
+        )
+    return list_local_fpaths
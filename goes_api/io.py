@@ -17,9 +17,12 @@
 
 import datetime
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 import fsspec
 import pandas as pd
+from fsspec.implementations.cache_mapper import AbstractCacheMapper
+from fsspec.implementations.cached import SimpleCacheFileSystem
 
 
 def get_filesystem(protocol, fs_args={}):
@@ -55,6 +58,95 @@ def get_filesystem(protocol, fs_args={}):
     raise NotImplementedError("Current available protocols are 'gcs', 's3', 'local'.")
 
 
+# Connection types reading the files of the cloud buckets through a local cache
+_CACHED_CONNECTION_TYPES = ["simplecache", "blockcache"]
+
+
+class _LocalArchiveCacheMapper(AbstractCacheMapper):
+    """Map cloud bucket paths to the <SATELLITE>/<product>/... layout used by `download_files`."""
+
+    def __call__(self, path):
+        from goes_api.info import infer_satellite_from_path
+
+        # path is the bucket path without protocol (i.e. noaa-goes16/ABI-L1b-RadF/...)
+        satellite = infer_satellite_from_path(path).upper()
+        return os.path.join(satellite, path.lstrip("/").split("/", 1)[1])
+
+
+class _LocalArchiveCacheFileSystem(SimpleCacheFileSystem):
+    """Simplecache filesystem moving the files into the local archive only once entirely copied.
+
+    The files are first copied into <base_dir>/.goes_api/partial (like the resumable
+    downloads of `download_files`), and moved into the local archive with an atomic
+    rename once their size has been checked.
+    Interrupted or truncated copies are therefore never found when searching files
+    on local storage.
+    """
+
+    def _get_cached_file_before_open(self, path, **kwargs):  # noqa: ARG002
+        # Note: CachingFileSystem delegates the undefined methods to the target filesystem
+        # --> All the logic must be defined here
+        base_dir = self.storage[-1]
+        fname = self._mapper(path)
+        local_fpath = os.path.join(base_dir, fname)
+        part_fpath = os.path.join(_get_metadata_dir(base_dir), "partial", fname) + ".part"
+        os.makedirs(os.path.dirname(part_fpath), exist_ok=True)
+        self._cache_size = None
+        size = self.fs.info(path).get("size")
+        self.fs.get_file(path, part_fpath)
+        if size is not None and os.path.getsize(part_fpath) != size:
+            os.remove(part_fpath)
+            raise OSError(f"The cached copy of {path} has an unexpected size.")
+        os.makedirs(os.path.dirname(local_fpath), exist_ok=True)
+        os.replace(part_fpath, local_fpath)
+
+
+def get_cached_filesystem(protocol, fs_args={}, cache_type="simplecache", base_dir=None):
+    """
+    Define a ffspec filesystem caching locally the files read from a cloud bucket.
+
+    protocol : str
+       String specifying the cloud bucket storage from which to retrieve the data.
+       Use `goes_api.available_protocols()` to retrieve available protocols.
+    fs_args : dict, optional
+       Dictionary specifying optional settings to initiate the fsspec.filesystem.
+       The default is an empty dictionary. Anonymous connection is set by default.
+    cache_type : str, optional
+       Either "simplecache" or "blockcache".
+       With "simplecache", a file is entirely copied on first access into
+       <base_dir>/<SATELLITE>/<product>/..., the same location used by `download_files`.
+       The file is copied into <base_dir>/.goes_api/partial and moved into the
+       local archive only once its size has been checked.
+       Files already downloaded with `download_files` are therefore read from local disk.
+       With "blockcache", only the accessed blocks of the files are cached,
+       into <base_dir>/.goes_api/blockcache.
+       The default is "simplecache".
+    base_dir : str, optional
+       The GOES base directory.
+       If None, it use the one specified in the GOES-API config file.
+       The default is None.
+    """
+    from goes_api.configs import get_goes_base_dir
+
+    base_dir = get_goes_base_dir(base_dir)
+    fs = get_filesystem(protocol=protocol, fs_args=fs_args.copy())
+    if cache_type == "simplecache":
+        return _LocalArchiveCacheFileSystem(
+            fs=fs,
+            cache_storage=base_dir,
+            cache_mapper=_LocalArchiveCacheMapper(),
+        )
+    if cache_type == "blockcache":
+        return fsspec.filesystem(
+            "blockcache",
+            fs=fs,
+            cache_storage=os.path.join(_get_metadata_dir(base_dir), "blockcache"),
+            check_files=False,
+            expiry_time=False,
+        )
+    raise ValueError("Valid `cache_type` are 'simplecache' and 'blockcache'.")
+
+
 def get_bucket(protocol, satellite):
     """
     Get the cloud bucket address for a specific satellite.
@@ -190,14 +282,95 @@ def _get_time_dir_tree(start_time, end_time):
     return list_dir_tree
 
 
+def _get_metadata_dir(base_dir):
+    """Return the directory where GOES-API stores its internal metadata (i.e. listing manifest).
+
+    Pattern: <base_dir>/.goes_api
+    """
+    metadata_dir = os.path.join(base_dir, ".goes_api")
+    os.makedirs(metadata_dir, exist_ok=True)
+    return metadata_dir
+
+
+def _get_file_info(info):
+    """Return the size and etag of a file from the fsspec info dictionary."""
+    etag = info.get("ETag", info.get("etag"))
+    if etag is not None:
+        etag = str(etag).strip('"')
+    return {"size": info.get("size"), "etag": etag}
+
+
+def _glob_directory(fs, glob_pattern, bucket_prefix=""):
+    """List the files matching the glob pattern of a single directory.
+
+    It returns a dictionary with structure {<fpath>: {"size": <size>, "etag": <etag>}}.
+    """
+    dict_info = fs.glob(glob_pattern, detail=True)
+    dict_files = {bucket_prefix + fpath: _get_file_info(info) for fpath, info in dict_info.items()}
+    return dict_files
+
+
+def _iter_glob_directories(fs, list_glob_pattern, bucket_prefix="", max_concurrent_listings=10):
+    """Yield the files matching each glob pattern.
+
+    The directories are listed concurrently using multithreading, but the
+    results are yielded in the same order of `list_glob_pattern`.
+    For each directory, a dictionary with structure {<fpath>: {"size": <size>, "etag": <etag>}}
+    is yielded.
+
+    Parameters
+    ----------
+    fs : fsspec.FileSystem
+        ffspec filesystem instance.
+    list_glob_pattern : list
+        List of glob patterns (i.e. one per YYYY/DOY/HH directory).
+    bucket_prefix : str, optional
+        Prefix to add to the listed filepaths (i.e. s3://).
+        The default is "".
+    max_concurrent_listings : int, optional
+        Maximum number of directories to be listed concurrently.
+        If 1, the directories are listed sequentially.
+        The default is 10.
+    """
+    max_concurrent_listings = max(int(max_concurrent_listings), 1)
+    if max_concurrent_listings == 1 or len(list_glob_pattern) <= 1:
+        for glob_pattern in list_glob_pattern:
+            yield _glob_directory(fs, glob_pattern, bucket_prefix=bucket_prefix)
+        return
+    n_workers = min(max_concurrent_listings, len(list_glob_pattern))
+    with ThreadPoolExecutor(max_workers=n_workers) as executor:
+        # executor.map returns the results in the order of the inputs
+        yield from executor.map(
+            lambda glob_pattern: _glob_directory(fs, glob_pattern, bucket_prefix=bucket_prefix),
+            list_glob_pattern,
+        )
+
+
 def _add_nc_bytes(fpaths):
     """Add `#mode=bytes` to the HTTP netCDF4 url."""
     fpaths = [fpath + "#mode=bytes" for fpath in fpaths]
     return fpaths
 
 
-def _set_connection_type(fpaths, satellite, protocol=None, connection_type=None):
-    """Switch from bucket to https connection for protocol 'gcs' and 's3'."""
+def _open_cached_files(fpaths, fs):
+    """Return the fsspec.core.OpenFile of the bucket filepaths read through a caching filesystem."""
+    return [fsspec.core.OpenFile(fs, fpath, mode="rb") for fpath in fpaths]
+
+
+def _get_connection_filesystem(protocol, connection_type, fs_args={}, base_dir=None):
+    """Return the caching filesystem of the 'simplecache' and 'blockcache' connection types (else None)."""
+    if protocol in [None, "file"] or connection_type not in _CACHED_CONNECTION_TYPES:
+        return None
+    return get_cached_filesystem(protocol=protocol, fs_args=fs_args, cache_type=connection_type, base_dir=base_dir)
+
+
+def _set_connection_type(fpaths, satellite, protocol=None, connection_type=None, fs_args={}, base_dir=None, fs=None):
+    """Switch from bucket to https (or cached) connection for protocol 'gcs' and 's3'.
+
+    With the 'simplecache' and 'blockcache' connection types, the files are cached into base_dir.
+    The caching filesystem `fs` can be provided to avoid creating it at each call
+    (see `_get_connection_filesystem`).
+    """
     if protocol is None:
         return fpaths
     if protocol == "file":
@@ -205,6 +378,12 @@ def _set_connection_type(fpaths, satellite, protocol=None, connection_type=None)
     # here protocol gcs or s3
     if connection_type == "bucket":
         return fpaths
+    if connection_type in _CACHED_CONNECTION_TYPES:
+        if fs is None:
+            fs = _get_connection_filesystem(protocol, connection_type, fs_args=fs_args, base_dir=base_dir)
+        if isinstance(fpaths, dict):
+            return {tt: _open_cached_files(l_fpaths, fs=fs) for tt, l_fpaths in fpaths.items()}
+        return _open_cached_files(fpaths, fs=fs)
     if connection_type in ["https", "nc_bytes"]:
         if isinstance(fpaths, list):
             fpaths = _switch_to_https_fpaths(fpaths, protocol=protocol)
@@ -216,5 +395,5 @@ def _set_connection_type(fpaths, satellite, protocol=None, connection_type=None)
                 fpaths = {tt: _add_nc_bytes(l_fpaths) for tt, l_fpaths in fpaths.items()}
         return fpaths
     raise NotImplementedError(
-        "'bucket','https', 'nc_bytes' are the only `connection_type` available.",
+        "'bucket','https', 'nc_bytes', 'simplecache', 'blockcache' are the only `connection_type` available.",
     )
@@ -13,29 +13,429 @@
 #
 # You should have received a copy of the GNU General Public License along with
 # goes_api. If not, see <http://www.gnu.org/licenses/>.
-"""Define functions generating kerchunk reference JSON files."""
+"""Define functions generating and combining kerchunk reference JSON files."""
 
+import base64
 import concurrent.futures
+import glob
 import os
+import shutil
+import sys
 import time
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 import fsspec
+import numpy as np
 from tqdm import tqdm
 
-from .download import _get_list_daily_time_blocks, _remove_bucket_address
-from .info import infer_satellite_from_path
-from .search import find_files
+from .checks import (
+    _check_filter_parameters,
+    _check_product,
+    _check_product_level,
+    _check_satellite,
+    _check_sector,
+    _check_sensor,
+    _check_start_end_time,
+)
+from .download import _get_list_daily_time_blocks, _get_rate_limiter, _remove_bucket_address
+from .filter import _filter_files
+from .info import _get_info_from_filename, infer_satellite_from_path
+from .io import _get_product_dir, _get_product_name, _get_time_dir_tree
+from .search import _find_files
+from .table import FileTable
 
+# Suffix of the combined reference files of each reference format
+_REFERENCE_SUFFIX = {"json": ".json", "parquet": ".parq"}
 
-def _generate_reference_json(url, reference_dir, fs_args={}):
+# Size (in bytes) of the chunks inlined in the reference files
+_INLINE_THRESHOLD = 200
+
+# Block size of the range requests reading the HDF5 metadata with a reference template
+_TEMPLATE_BLOCK_SIZE = 2**16
+
+# HDF5 attributes not transferred by kerchunk
+_HIDDEN_ATTRS = {
+    "REFERENCE_LIST",
+    "CLASS",
+    "DIMENSION_LIST",
+    "NAME",
+    "_Netcdf4Dimid",
+    "_Netcdf4Coordinates",
+    "_nc3_strict",
+    "_NCProperties",
+}
+
+# Reference templates of each process: {<template_key>: <template> or None}
+_REFERENCE_TEMPLATES = {}
+
+
+def _get_reference_fpath(url, reference_dir):
+    """Return the filepath of the kerchunk reference JSON file of a cloud bucket file.
+
+    The filepath is <reference_dir>/<satellite>/.../*.nc.json
+    """
+    satellite = infer_satellite_from_path(url)
+    satellite = satellite.upper()  # GOES-16/GOES-17
+    standard_path = _remove_bucket_address(url)
+    return os.path.join(reference_dir, satellite, standard_path + ".json")
+
+
+def _check_source_check(check_source):
+    """Check the `check_source` argument of generate_kerchunk_files."""
+    valid_check_source = ["size", "etag"]
+    if check_source is not None and check_source not in valid_check_source:
+        raise ValueError(f"Valid `check_source` values are {valid_check_source} or None.")
+    return check_source
+
+
+def _is_valid_reference_file(reference_fpath, size=None, etag=None, check_source=None):
+    """Check if an existing kerchunk reference JSON file is valid and up to date.
+
+    A reference file is valid if it can be decoded and it references a zarr group.
+    If check_source is "size" or "etag", the size (or etag) of the source file recorded
+    when the reference file was created must match the current one.
+    If the current size (or etag) is unknown, the source file is assumed unchanged.
+    """
+    import ujson
+
+    if not os.path.isfile(reference_fpath):
+        return False
+    try:
+        with open(reference_fpath) as f:
+            reference_dict = ujson.load(f)
+    except ValueError:
+        return False
+    if not isinstance(reference_dict, dict) or ".zgroup" not in reference_dict.get("refs", {}):
+        return False
+    if check_source is None:
+        return True
+    current_value = {"size": size, "etag": etag}[check_source]
+    if current_value is None:
+        return True
+    source_info = reference_dict.get("goes_api", {})
+    return source_info.get(check_source) == current_value
+
+
+def _write_reference_json(reference_dict, reference_fpath):
+    """Write a reference dictionary to a JSON file (through a temporary file)."""
+    import ujson
+
+    os.makedirs(os.path.dirname(reference_fpath), exist_ok=True)
+    tmp_fpath = reference_fpath + ".tmp"
+    with open(tmp_fpath, "wb") as output_f:
+        output_f.write(ujson.dumps(reference_dict).encode())
+    os.replace(tmp_fpath, reference_fpath)
+
+
+####--------------------------------------------------------------------------.
+#### Reference templates
+
+
+def _get_reference_template_key(url):
+    """Return the key of the reference template of a file.
+
+    The files of the same satellite, product, scene, scan mode and channel share the same HDF5 layout.
+    Returns None if the filename is not recognized.
+    """
+    try:
+        info_dict = _get_info_from_filename(os.path.basename(url))
+    except ValueError:
+        return None
+    keys = ["satellite", "sensor", "product_level", "product", "scene_abbr", "scan_mode", "channel"]
+    return tuple(info_dict.get(key) for key in keys)
+
+
+def _get_zarr_key(name, key):
+    """Return the reference key of a zarr metadata file of an HDF5 object."""
+    name = name.lstrip("/")
+    return f"{name}/{key}" if name else key
+
+
+def _get_h5_objects(h5f):
+    """Return a dictionary {<name>: <h5py object>} with the root group and all groups and datasets."""
+    dict_objects = {"": h5f}
+
+    def _add_object(name, h5obj):
+        dict_objects[name] = h5obj
+
+    h5f.visititems(_add_object)
+    return dict_objects
+
+
+def _get_h5_attrs(h5obj):
+    """Return the attributes of an HDF5 object converted as done by kerchunk.
+
+    As in kerchunk `SingleHdf5ToZarr`, the lists of scalars are kept as lists,
+    while the other values (i.e. nested lists) are converted to strings.
+    """
+    import h5py
+
+    attrs = {}
+    for name, value in h5obj.attrs.items():
+        if name in _HIDDEN_ATTRS:
+            continue
+        if isinstance(value, bytes):
+            value = value.decode("utf-8", errors="replace") or " "
+        elif isinstance(value, (np.ndarray, np.number, np.bool_)):
+            if name == "_FillValue":
+                continue
+            if value.dtype.kind == "S":
+                value = value.astype(str)
+            value = value.flatten()[0] if value.size == 1 else value.tolist()
+            if isinstance(value, (np.ndarray, np.number, np.bool_)):
+                value = value.tolist()
+        elif isinstance(value, h5py.Empty):
+            value = ""
+        if isinstance(value, str) and value == "DIMENSION_SCALE":
+            continue
+        if isinstance(value, (str, int, float)):
+            attrs[name] = value
+        elif isinstance(value, (tuple, set, list)) and all(isinstance(v, (str, int, float)) for v in value):
+            attrs[name] = list(value)
+        else:
+            attrs[name] = str(value)
+    return attrs
+
+
+def _get_h5_signature(h5obj):
+    """Return the properties of an HDF5 object defining its zarr metadata.
+
+    Besides the attribute values, two files with the same signatures have the same zarr metadata.
+    """
+    import h5py
+
+    attr_names = tuple(sorted(h5obj.attrs))
+    if isinstance(h5obj, h5py.Group):
+        return ("group", attr_names)
+    fillvalue = None if h5obj.fillvalue is None else np.asarray(h5obj.fillvalue).tobytes()
+    return (
+        h5obj.shape,
+        h5obj.chunks,
+        h5obj.dtype.str,
+        h5obj.compression,
+        h5obj.compression_opts,
+        h5obj.shuffle,
+        h5obj.fletcher32,
+        h5obj.scaleoffset,
+        h5obj.id.get_create_plist().get_layout(),
+        fillvalue,
+        attr_names,
+    )
+
+
+def _has_storage(dset):
+    """Check if some data of an HDF5 dataset have been written."""
+    if dset.chunks is None:
+        return dset.id.get_offset() is not None
+    return dset.id.get_num_chunks() > 0
+
+
+def _is_skipped_dataset(dset):
+    """Check if an HDF5 dataset is skipped by kerchunk (i.e. a netCDF dimension without data)."""
+    import h5py
+
+    return h5py.h5ds.is_scale(dset.id) and not _has_storage(dset)
+
+
+def _is_templatable_dataset(dset, refs):
+    """Check if the references of an HDF5 dataset can be derived from its chunk index.
+
+    The string datasets, the compact datasets and the datasets with filters
+    not supported by kerchunk are inlined (or skipped) by kerchunk.
+    The netCDF dimensions without data are skipped by kerchunk.
+    """
+    import h5py
+
+    if _get_zarr_key(dset.name, ".zarray") not in refs:
+        return _is_skipped_dataset(dset)
+    return (
+        dset.shape is not None
+        and dset.dtype.kind in "biuf"
+        and dset.compression in [None, "gzip"]
+        and not dset.scaleoffset
+        and dset.id.get_create_plist().get_layout() != h5py.h5d.COMPACT
+    )
+
+
+def _get_reference_template(input_f, refs):
+    """Return the reference template of an HDF5 file from its kerchunk references.
+
+    The template contains the signature of each HDF5 object and the zarr metadata.
+    Returns None if the references of some datasets can not be derived from their chunk index.
+    """
+    import h5py
+
+    with h5py.File(input_f, "r") as h5f:
+        dict_objects = _get_h5_objects(h5f)
+        for h5obj in dict_objects.values():
+            if isinstance(h5obj, h5py.Dataset) and not _is_templatable_dataset(h5obj, refs):
+                return None
+        dict_signatures = {name: _get_h5_signature(h5obj) for name, h5obj in dict_objects.items()}
+    metadata_keys = [".zgroup", ".zarray", ".zattrs"]
+    metadata = {key: value for key, value in refs.items() if key.rsplit("/", 1)[-1] in metadata_keys}
+    return {"signatures": dict_signatures, "metadata": metadata}
+
+
+def _encode_inline_chunk(data):
+    """Encode the bytes of an inlined chunk as done by kerchunk."""
+    import ujson
+
+    try:
+        return ujson.dumps(ujson.loads(data))
+    except (ValueError, TypeError):
+        pass
+    try:
+        return data.decode()
+    except UnicodeDecodeError:
+        return "base64:" + base64.b64encode(data).decode()
+
+
+def _get_chunk_references(input_f, url, dset):
+    """Return the references of the chunks of an HDF5 dataset.
+
+    The chunks smaller than _INLINE_THRESHOLD bytes are inlined.
+    Returns None if some chunks skip some filters (i.e. the zarr filters differ from the template).
+    """
+    dsid = dset.id
+    dict_chunks = {}
+    if dset.chunks is None:
+        if dsid.get_offset() is not None:
+            dict_chunks[(0,) * (dset.ndim or 1)] = (dsid.get_offset(), dsid.get_storage_size())
+    else:
+        list_chunk_info = []
+        if callable(getattr(dsid, "chunk_iter", None)):
+            dsid.chunk_iter(list_chunk_info.append)
+        else:
+            list_chunk_info = [dsid.get_chunk_info(i) for i in range(dsid.get_num_chunks())]
+        for chunk_info in list_chunk_info:
+            if chunk_info.filter_mask != 0:
+                return None
+            index = tuple(offset // size for offset, size in zip(chunk_info.chunk_offset, dset.chunks))
+            dict_chunks[index] = (chunk_info.byte_offset, chunk_info.size - 4 * dset.fletcher32)
+
+    chunk_refs = {}
+    for index, (offset, size) in dict_chunks.items():
+        key = _get_zarr_key(dset.name, ".".join(map(str, index)))
+        if size < _INLINE_THRESHOLD:
+            input_f.seek(offset)
+            chunk_refs[key] = _encode_inline_chunk(input_f.read(size))
+        else:
+            chunk_refs[key] = [url, offset, size]
+    return chunk_refs
+
+
+def _translate_with_template(input_f, url, template):
+    """Derive the kerchunk references of an HDF5 file from the reference template of its files.
+
+    Only the HDF5 metadata (object headers and chunk indices) and the inlined chunks are read.
+    The zarr metadata are taken from the template, and the attributes are updated.
+    Returns None if the HDF5 layout of the file differs from the template.
+    """
+    import h5py
+    import ujson
+
+    refs = {}
+    metadata = template["metadata"]
+    with h5py.File(input_f, "r") as h5f:
+        dict_objects = _get_h5_objects(h5f)
+        if dict_objects.keys() != template["signatures"].keys():
+            return None
+        for name, h5obj in dict_objects.items():
+            if _get_h5_signature(h5obj) != template["signatures"][name]:
+                return None
+            # Copy the zarr metadata
+            for key in [".zgroup", ".zarray"]:
+                zarr_key = _get_zarr_key(name, key)
+                if zarr_key in metadata:
+                    refs[zarr_key] = metadata[zarr_key]
+            # Update the attributes
+            # - The _ARRAY_DIMENSIONS attribute is derived by kerchunk
+            # - The attributes are ordered as in the template (i.e. as written by kerchunk)
+            attrs_key = _get_zarr_key(name, ".zattrs")
+            if attrs_key in metadata:
+                template_attrs = ujson.loads(metadata[attrs_key])
+                h5_attrs = _get_h5_attrs(h5obj)
+                h5_attrs["_ARRAY_DIMENSIONS"] = template_attrs.get("_ARRAY_DIMENSIONS")
+                if h5_attrs.keys() - {"_ARRAY_DIMENSIONS"} != template_attrs.keys() - {"_ARRAY_DIMENSIONS"}:
+                    return None
+                attrs = {key: h5_attrs[key] for key in template_attrs}
+                refs[attrs_key] = ujson.dumps(attrs)
+            # Retrieve the chunk references
+            # - The datasets skipped by kerchunk must be still skipped
+            if not isinstance(h5obj, h5py.Dataset):
+                continue
+            if _get_zarr_key(name, ".zarray") not in metadata:
+                chunk_refs = {} if _is_skipped_dataset(h5obj) else None
+            else:
+                chunk_refs = _get_chunk_references(input_f, url, h5obj)
+            if chunk_refs is None:
+                return None
+            refs.update(chunk_refs)
+    return {"version": 1, "refs": refs}
+
+
+def _translate_with_template_or_none(input_f, url, template):
+    """Run `_translate_with_template`, returning None (i.e. translate with kerchunk) if it fails.
+
+    Old ujson versions, for example, can not encode NaN and infinite attribute values.
+    """
+    try:
+        return _translate_with_template(input_f, url, template)
+    except Exception:
+        return None
+
+
+def _learn_reference_template(input_f, url, file_metadata):
+    """Return the reference template of a file translated with kerchunk.
+
+    The template is kept only if it reproduces the kerchunk references of the file.
+    Returns None if the files can not be templated.
+    """
+    template = _get_reference_template(input_f, file_metadata["refs"])
+    if template is None or _translate_with_template_or_none(input_f, url, template) != file_metadata:
+        return None
+    return template
+
+
+def _generate_reference_json(
+    url,
+    reference_dir,
+    fs_args={},
+    rate_limiter=None,
+    size=None,
+    etag=None,
+    incremental=False,
+    check_source=None,
+    use_template=False,
+):
     """Derive the kerchunk reference JSON file.
 
     The file is saved at <reference_dir>/<satellite>/.../*.nc.json
+    The size and etag of the source file are recorded in the "goes_api" entry
+    of the reference JSON file.
+    The file is first written to a temporary file and then renamed, so that an interrupted
+    run never leaves a truncated reference file.
+    If incremental=True, an existing valid reference file is not recreated
+    (see `_is_valid_reference_file`).
+    If a RateLimiter is provided, it waits for the rate limiter before reading the
+    remote file and accounts the bytes read once the reference is derived.
+    If use_template=True, the references are derived from the reference template of
+    the files with the same product, scene, scan mode and channel (if already learned
+    by the process), reading only the HDF5 metadata with small range requests.
+    The file is translated with kerchunk (and the template learned) if no template
+    is available, if the HDF5 layout of the file differs from the template or if
+    the template translation fails.
+    A template is learned only if it reproduces the kerchunk references of the file.
+
+    Returns
+    -------
+    int or None
+        The number of bytes read from the remote file,
+        or None if the reference file was already up to date.
     """
     # Test require packages are available
     try:
-        import ujson
+        import ujson  # noqa
     except ModuleNotFoundError:
         raise ModuleNotFoundError("Install ujson to exploit kerchunk functionalities !")
     try:
@@ -43,29 +443,102 @@ def _generate_reference_json(url, reference_dir, fs_args={}):
     except ModuleNotFoundError:
         raise ModuleNotFoundError("Install kerchunk to exploit goes_api functionalities !")
 
-    # Retrieve satellite
-    satellite = infer_satellite_from_path(url)
-    satellite = satellite.upper()  # GOES-16/GOES-17
-
     # Define output json fpath
-    standard_path = _remove_bucket_address(url)
-    reference_fpath = os.path.join(reference_dir, satellite, standard_path + ".json")
+    reference_fpath = _get_reference_fpath(url, reference_dir=reference_dir)
 
-    # Create directory
-    os.makedirs(os.path.dirname(reference_fpath), exist_ok=True)
+    # Skip existing valid reference files
+    if incremental and _is_valid_reference_file(reference_fpath, size=size, etag=etag, check_source=check_source):
+        return None
+
+    # Retrieve the reference template of the file
+    template_key = _get_reference_template_key(url) if use_template else None
+    template = _REFERENCE_TEMPLATES.get(template_key)
 
     # Read remote file and retrieve kerchunk reference dictionary
-    with fsspec.open(url, **fs_args) as input_f:
-        h5chunks = SingleHdf5ToZarr(input_f, url, inline_threshold=200)
-        file_metadata = h5chunks.translate()
-        # Write kerchunk reference dictionary to JSON file
-        with open(reference_fpath, "wb") as output_f:
-            output_f.write(ujson.dumps(file_metadata).encode())
+    # - With a template, only the blocks including the HDF5 metadata are read
+    if rate_limiter is not None:
+        rate_limiter.acquire(n_requests=1)
+    if template is None:
+        input_file = fsspec.open(url, **fs_args)
+    else:
+        fs, path = fsspec.core.url_to_fs(url, **fs_args)
+        input_file = fs.open(path, "rb", block_size=_TEMPLATE_BLOCK_SIZE, cache_type="blockcache")
+    with input_file as input_f:
+        file_metadata = None
+        if template is not None:
+            file_metadata = _translate_with_template_or_none(input_f, url, template)
+        if file_metadata is None:
+            input_f.seek(0)
+            h5chunks = SingleHdf5ToZarr(input_f, url, inline_threshold=_INLINE_THRESHOLD)
+            file_metadata = h5chunks.translate()
+            # Learn the template (once if the files can not be templated)
+            if template_key is not None and (template is not None or template_key not in _REFERENCE_TEMPLATES):
+                _REFERENCE_TEMPLATES[template_key] = _learn_reference_template(input_f, url, file_metadata)
+        n_bytes = getattr(getattr(input_f, "cache", None), "total_requested_bytes", 0)
+        if rate_limiter is not None:
+            rate_limiter.acquire(n_bytes=n_bytes)
+
+    # Record the source file information
+    file_metadata["goes_api"] = {"url": url, "size": None if size is None else int(size), "etag": etag}
 
+    # Write kerchunk reference dictionary to JSON file
+    _write_reference_json(file_metadata, reference_fpath)
+    return n_bytes
 
-def _get_parallel_ref(bucket_fpaths, fs_args, reference_dir, n_processes=20, progress_bar=True):
+
+def _check_kerchunk_engine(kerchunk_engine):
+    """Check kerchunk_engine validity."""
+    if kerchunk_engine not in ["processes", "threads", "dask"]:
+        raise ValueError("Valid `kerchunk_engine` values are 'processes', 'threads' and 'dask'.")
+    return kerchunk_engine
+
+
+def _check_max_tasks_per_child(max_tasks_per_child):
+    """Check max_tasks_per_child validity (it requires Python >= 3.11)."""
+    if max_tasks_per_child is None:
+        return max_tasks_per_child
+    if sys.version_info < (3, 11):
+        raise ValueError("`max_tasks_per_child` requires Python >= 3.11.")
+    if not isinstance(max_tasks_per_child, int) or max_tasks_per_child < 1:
+        raise ValueError("`max_tasks_per_child` must be a positive integer (or None).")
+    return max_tasks_per_child
+
+
+def _get_kerchunk_executor(kerchunk_engine="processes", n_processes=20, max_tasks_per_child=None):
+    """Return the executor deriving the kerchunk reference JSON files.
+
+    With the 'processes' engine, each worker process is replaced after max_tasks_per_child files,
+    so that the memory used by the workers does not grow.
     """
-    Run _generate_reference_json asynchronously in parallel using multiprocessing.
+    if kerchunk_engine == "threads":
+        return ThreadPoolExecutor(max_workers=n_processes)
+    if max_tasks_per_child is not None:
+        return ProcessPoolExecutor(max_workers=n_processes, max_tasks_per_child=max_tasks_per_child)
+    return ProcessPoolExecutor(max_workers=n_processes)
+
+
+def _get_parallel_ref(
+    bucket_fpaths,
+    fs_args,
+    reference_dir,
+    n_processes=20,
+    progress_bar=True,
+    rate_limiter=None,
+    bucket_sizes=None,
+    bucket_etags=None,
+    incremental=False,
+    check_source=None,
+    kerchunk_engine="processes",
+    max_tasks_per_child=None,
+    use_template=False,
+):
+    """
+    Run _generate_reference_json concurrently using a pool of processes (or threads).
+
+    At most 2 * n_processes files are submitted to the pool at the same time,
+    so that the memory used does not depend on the number of files.
+    If the pool breaks (i.e. a worker process terminates abruptly), the
+    concurrent.futures.BrokenExecutor error is raised.
 
     Parameters
     ----------
@@ -74,46 +547,153 @@ def _get_parallel_ref(bucket_fpaths, fs_args, reference_dir, n_processes=20, pro
     n_processes : int, optional
         Number of files to be analyzed concurrently.
         The default is 20. The max value is set automatically to 50.
+    rate_limiter : RateLimiter, optional
+        Rate limiter of the bandwidth and of the request rate.
+        With the 'processes' engine, the requests are accounted when submitting
+        the files and the bytes read once each reference is derived.
+        The default is None (no limits).
+    bucket_sizes : list, optional
+        List with the size of the bucket files.
+    bucket_etags : list, optional
+        List with the etag of the bucket files.
+    kerchunk_engine : str, optional
+        Either 'processes' (the default) or 'threads'.
+    max_tasks_per_child : int, optional
+        Number of files analyzed by a worker process before being replaced.
+        It requires Python >= 3.11.
+        The default is None (the worker processes are never replaced).
+    use_template : bool, optional
+        Whether to derive the references from the reference templates learned by each worker.
+        The default is False.
 
     Returns
     -------
-    List of cloud bucket filepaths which were not analyzed.
+    (int, dict)
+        The number of reference files created and
+        a dictionary {<bucket_fpath>: <exception>} of the files which were not analyzed.
 
     """
-    # Check n_threads
+    # Check n_processes
     n_processes = max(n_processes, 1)
     n_processes = min(n_processes, 50)
+    n_files = len(bucket_fpaths)
+    bucket_sizes = [None] * n_files if bucket_sizes is None else bucket_sizes
+    bucket_etags = [None] * n_files if bucket_etags is None else bucket_etags
+
+    # The worker processes can not share the rate limiter
+    is_process_pool = kerchunk_engine == "processes"
+    worker_rate_limiter = None if is_process_pool else rate_limiter
 
     ##------------------------------------------------------------------------.
     # Initialize progress bar
     if progress_bar:
-        n_files = len(bucket_fpaths)
         pbar = tqdm(total=n_files)
-    with ThreadPoolExecutor(max_workers=n_processes) as executor:
-        # with ProcessPoolExecutor(max_workers=n_processes) as executor:
-        dict_futures = {
-            executor.submit(
+
+    n_created = 0
+    dict_errors = {}
+    dict_futures = {}
+
+    def _collect(futures):
+        nonlocal n_created
+        for future in futures:
+            bucket_path = dict_futures.pop(future)
+            # Update the progress bar
+            if progress_bar:
+                pbar.update(1)
+            # Collect all files that caused problems
+            # - A broken pool (i.e. a worker process died) is not a problem of the file
+            error = future.exception()
+            if isinstance(error, concurrent.futures.BrokenExecutor):
+                raise error
+            if error is not None:
+                dict_errors[bucket_path] = error
+                continue
+            n_bytes = future.result()
+            if n_bytes is None:
+                continue
+            n_created += 1
+            if is_process_pool and rate_limiter is not None:
+                rate_limiter.acquire(n_bytes=n_bytes)
+
+    executor = _get_kerchunk_executor(
+        kerchunk_engine=kerchunk_engine,
+        n_processes=n_processes,
+        max_tasks_per_child=max_tasks_per_child,
+    )
+    with executor:
+        for bucket_path, size, etag in zip(bucket_fpaths, bucket_sizes, bucket_etags):
+            # Wait for a file to complete if too many files are in flight
+            if len(dict_futures) >= 2 * n_processes:
+                done, _ = concurrent.futures.wait(dict_futures, return_when=concurrent.futures.FIRST_COMPLETED)
+                _collect(done)
+            if is_process_pool and rate_limiter is not None:
+                rate_limiter.acquire(n_requests=1)
+            future = executor.submit(
                 _generate_reference_json,
                 bucket_path,
                 reference_dir,
                 fs_args,
-            ): bucket_path
-            for bucket_path in bucket_fpaths
-        }
-        # List files that didn't work
-        l_file_error = []
-        for future in concurrent.futures.as_completed(dict_futures.keys()):
-            # Update the progress bar
-            if progress_bar:
-                pbar.update(1)
-            # Collect all commands that caused problems
-            if future.exception() is not None:
-                l_file_error.append(dict_futures[future])
+                worker_rate_limiter,
+                size,
+                etag,
+                incremental,
+                check_source,
+                use_template,
+            )
+            dict_futures[future] = bucket_path
+        _collect(list(concurrent.futures.as_completed(dict_futures)))
     if progress_bar:
         pbar.close()
     ##------------------------------------------------------------------------.
-    # Return list of bucket fpaths raising errors
-    return l_file_error
+    # Return number of reference files created and errors
+    return n_created, dict_errors
+
+
+def _get_dask_ref(
+    bucket_fpaths,
+    fs_args,
+    reference_dir,
+    rate_limiter=None,
+    bucket_sizes=None,
+    bucket_etags=None,
+    incremental=False,
+    check_source=None,
+    use_template=False,
+):
+    """Run _generate_reference_json with dask.
+
+    Returns
+    -------
+    (int, dict)
+        The number of reference files created and an empty dictionary
+        (dask raises the first error encountered).
+    """
+    # Test require packages are available
+    try:
+        import dask
+    except ModuleNotFoundError:
+        raise ModuleNotFoundError("Install dask to use kerchunk_engine='dask' !")
+    n_files = len(bucket_fpaths)
+    bucket_sizes = [None] * n_files if bucket_sizes is None else bucket_sizes
+    bucket_etags = [None] * n_files if bucket_etags is None else bucket_etags
+    delayed_gen_fun = dask.delayed(_generate_reference_json)
+    out = [
+        delayed_gen_fun(
+            bucket_path,
+            reference_dir=reference_dir,
+            fs_args=fs_args,
+            rate_limiter=rate_limiter,
+            size=size,
+            etag=etag,
+            incremental=incremental,
+            check_source=check_source,
+            use_template=use_template,
+        )
+        for bucket_path, size, etag in zip(bucket_fpaths, bucket_sizes, bucket_etags)
+    ]
+    (list_n_bytes,) = dask.compute(out)
+    n_created = sum(n_bytes is not None for n_bytes in list_n_bytes)
+    return n_created, {}
 
 
 def generate_kerchunk_files(
@@ -131,19 +711,75 @@ def generate_kerchunk_files(
     fs_args={},
     verbose=False,
     progress_bar=True,
+    max_bytes_per_second=None,
+    max_requests_per_second=None,
+    incremental=False,
+    check_source=None,
+    kerchunk_engine="processes",
+    max_tasks_per_child=None,
+    use_template=False,
 ):
-    # Test require packages are available
-    try:
-        import dask
-    except ModuleNotFoundError:
-        raise ModuleNotFoundError("Install dask to run this function !")
+    """Generate the kerchunk reference JSON files of the files of a time period.
 
-    # Define fs_args for kerchunking
-    kerchunk_fs_arg = fs_args.copy()
-    kerchunk_fs_arg["mode"] = "rb"
-    kerchunk_fs_arg["anon"] = "True"
-    kerchunk_fs_arg["default_fill_cache"] = "False"
-    kerchunk_fs_arg["default_cache_type"] = "none"
+    The reference files are saved at <reference_dir>/<satellite>/.../*.nc.json
+
+    Parameters
+    ----------
+    n_processes : int, optional
+        Number of files to be analyzed concurrently.
+        The default is 20. The max value is set automatically to 50.
+    kerchunk_engine : str, optional
+        The engine used to analyze the files concurrently.
+        With 'processes' (the default), the files are analyzed by a pool of processes.
+        With 'threads', the files are analyzed by a pool of threads.
+        With 'dask', the files of each day are analyzed with `dask.compute`
+        (i.e. on the active dask distributed Client), and the first error raised is propagated.
+    max_tasks_per_child : int, optional
+        Only used if kerchunk_engine='processes'. It requires Python >= 3.11:
+        a ValueError is raised with older Python versions.
+        Number of files analyzed by a worker process before being replaced by a new one,
+        so that the memory used by the workers does not grow over long periods.
+        If not None, the worker processes are started with the 'spawn' method:
+        a script calling this function must be protected by `if __name__ == "__main__":`.
+        If None (the default), the worker processes are never replaced and
+        are started with the default method of the platform.
+    incremental : bool, optional
+        If True, the files with an existing valid reference file are skipped,
+        so that extending a reference archive processes only the new (or changed) files.
+        If False (the default), all reference files are recreated.
+    check_source : str, optional
+        Only used if incremental=True.
+        If "size" or "etag", an existing reference file is recreated if the size (or etag)
+        of the source file differs from the one recorded when the reference file was created.
+        Reference files created by previous versions of goes_api have no recorded
+        size or etag and are therefore recreated.
+        If None (the default), the source files are assumed unchanged.
+    use_template : bool, optional
+        If True, the files of the same product, scene, scan mode and channel are assumed
+        to share the same HDF5 layout (variables, chunking and filters).
+        Each worker translates a first file with kerchunk and learns its reference template.
+        The references of the following files are derived from the template, reading only
+        the HDF5 metadata (object headers and chunk indices) with small range requests.
+        The files whose HDF5 layout differs from the template are translated with kerchunk.
+        The default is False.
+
+    See `goes_api.download_files` for the description of the other arguments.
+
+    Returns
+    -------
+    list
+        List of the bucket filepaths which could not be kerchunked.
+    """
+    # Check inputs
+    check_source = _check_source_check(check_source)
+    kerchunk_engine = _check_kerchunk_engine(kerchunk_engine)
+    max_tasks_per_child = _check_max_tasks_per_child(max_tasks_per_child)
+
+    # Define the rate limiter (shared by all files)
+    rate_limiter = _get_rate_limiter(
+        max_bytes_per_second=max_bytes_per_second,
+        max_requests_per_second=max_requests_per_second,
+    )
 
     # Define list of daily time blocks (start_time, end_time)
     time_blocks = _get_list_daily_time_blocks(start_time, end_time)
@@ -156,10 +792,12 @@ def generate_kerchunk_files(
 
     # Loop over daily time blocks (to search for data)
     n_kerchunked_files = 0
+    n_skipped_files = 0
+    list_failed_fpaths = []
     for start_time, end_time in time_blocks:
 
-        # Retrieve filepaths to derive kerchunk reference JSON file
-        fpaths = find_files(
+        # Retrieve filepaths (and their sizes and etags) to derive kerchunk reference JSON file
+        table = _find_files(
             base_dir=None,
             protocol=protocol,
             fs_args=fs_args,
@@ -171,48 +809,424 @@ def generate_kerchunk_files(
             start_time=start_time,
             end_time=end_time,
             filter_parameters=filter_parameters,
-            connection_type=None,
-            group_by_key=None,
             verbose=verbose,
         )
 
         # Check there are files to process
-        n_files = len(fpaths)
-        n_kerchunked_files += n_files
+        n_files = len(table)
         if n_files == 0:
             continue
 
         if verbose:
             print(f" - Kerchunking {n_files} files from {start_time} to {end_time}")
 
-        # Compute and write JSON files with dask  [OPTION 1]
-        delayed_gen_fun = dask.delayed(_generate_reference_json)
-        out = [delayed_gen_fun(fpath, reference_dir=reference_dir, fs_args=fs_args) for fpath in fpaths]
-        dask.compute(out)
-
         # Compute and write JSON files concurrently
-        # l_file_error = _get_parallel_ref(bucket_fpaths=fpaths,
-        #                                  fs_args=kerchunk_fs_arg,
-        #                                  reference_dir=reference_dir,
-        #                                  n_processes=n_processes,
-        #                                  progress_bar=progress_bar)
+        kwargs = {
+            "bucket_fpaths": table.to_list(),
+            "fs_args": fs_args,
+            "reference_dir": reference_dir,
+            "rate_limiter": rate_limiter,
+            "bucket_sizes": table.get_key("size"),
+            "bucket_etags": table.get_key("etag"),
+            "incremental": incremental,
+            "check_source": check_source,
+            "use_template": use_template,
+        }
+        if kerchunk_engine == "dask":
+            n_created, dict_errors = _get_dask_ref(**kwargs)
+        else:
+            n_created, dict_errors = _get_parallel_ref(
+                n_processes=n_processes,
+                progress_bar=progress_bar,
+                kerchunk_engine=kerchunk_engine,
+                max_tasks_per_child=max_tasks_per_child,
+                **kwargs,
+            )
+        n_kerchunked_files += n_created
+        n_skipped_files += n_files - n_created - len(dict_errors)
+        list_failed_fpaths += list(dict_errors)
 
         # Report errors if occured
-        # if verbose:
-        #     n_errors = len(l_file_error)
-        #     if n_errors > 0:
-        #         print(f" - Unable to kerchunk the following files: {l_file_error}")
+        if verbose and len(dict_errors) > 0:
+            print(f" - Unable to kerchunk the following {len(dict_errors)} files:")
+            for bucket_fpath, error in dict_errors.items():
+                print(f"   {bucket_fpath} ({error!r})")
 
     # Report the total number of file kerchunked
     if verbose:
         t_f = time.time()
         t_elapsed = round(t_f - t_i)
         print(f"--> {n_kerchunked_files} files have been kerchunked in {t_elapsed} seconds !")
+        if n_skipped_files > 0:
+            print(f"--> {n_skipped_files} files had already an up-to-date reference file.")
         print("-------------------------------------------------------------------- ")
 
+    # Return the list of bucket fpaths raising errors
+    return list_failed_fpaths
+
+
+####--------------------------------------------------------------------------.
+#### Combined references
+
+
+def _find_reference_files(reference_dir, satellite, sensor, product_level, product, sector, filter_parameters):
+    """Return the FileTable of the kerchunk reference JSON files of a time period.
+
+    The FileTable is created from the filepaths of the source files (without the .json suffix).
+    """
+    product_dir = _get_product_dir(
+        base_dir=reference_dir,
+        satellite=satellite,
+        sensor=sensor,
+        product_level=product_level,
+        product=product,
+        sector=sector,
+    )
+    list_dir_tree = _get_time_dir_tree(filter_parameters["start_time"], filter_parameters["end_time"])
+    fpaths = []
+    for dir_tree in list_dir_tree:
+        fpaths += sorted(glob.glob(os.path.join(product_dir, dir_tree, "*.nc.json")))
+    table = FileTable([fpath[: -len(".json")] for fpath in fpaths])
+    return _filter_files(table, sensor, product_level, **filter_parameters)
+
+
+def _get_combined_reference_prefix(reference_dir, satellite, product_name, date, scene_abbr=None, channel=None):
+    """Return the filepath prefix of the combined reference JSON files of a day.
+
+    The combined reference files are saved at
+    <reference_dir>/<satellite>/<product_name>/<YYYY>/<DOY>/<product_name>[_<scene_abbr>][_<channel>]_<YYYYDOY>*.json
+    """
+    fname = "_".join(
+        [
+            product_name,
+            *([scene_abbr] if scene_abbr in ["M1", "M2"] else []),
+            *([channel] if channel else []),
+            date.strftime("%Y%j"),
+        ],
+    )
+    year_doy_dir = os.path.join(date.strftime("%Y"), date.strftime("%j"))
+    return os.path.join(reference_dir, satellite.upper(), product_name, year_doy_dir, fname)
+
+
+def _get_scene_position(reference_dict):
+    """Return the (inlined) x_image and y_image values of a reference dictionary.
+
+    The values are None if they are not inlined.
+    """
+    refs = reference_dict.get("refs", {})
+    position = (refs.get("x_image/0"), refs.get("y_image/0"))
+    return tuple(value if isinstance(value, str) else None for value in position)
+
+
+def _get_scene_position_runs(list_reference_dict):
+    """Split the time-sorted reference dictionaries into runs with the same scene position.
+
+    The position of the mesoscale scenes can change during a day: the files of each
+    position must be combined separately because their x and y coordinates differ.
+    """
+    list_runs = []
+    previous_position = None
+    for reference_dict in list_reference_dict:
+        position = _get_scene_position(reference_dict)
+        if len(list_runs) == 0 or position != previous_position:
+            list_runs.append([])
+        list_runs[-1].append(reference_dict)
+        previous_position = position
+    return list_runs
+
+
+def _check_reference_format(reference_format):
+    """Check reference_format validity."""
+    if reference_format not in ["json", "parquet"]:
+        raise ValueError("Valid `reference_format` values are 'json' and 'parquet'.")
+    return reference_format
+
+
+def _get_reference_metadata_fpath(reference_fpath):
+    """Return the JSON file with the metadata of a reference JSON file or of a Parquet reference directory."""
+    if os.path.isdir(reference_fpath):
+        return os.path.join(reference_fpath, ".zmetadata")
+    return reference_fpath
+
+
+def _is_combined_reference_up_to_date(combined_fpath, reference_fpaths):
+    """Check if a combined reference file has been created from the current reference files."""
+    import ujson
+
+    metadata_fpath = _get_reference_metadata_fpath(combined_fpath)
+    if not os.path.isfile(metadata_fpath):
+        return False
+    combined_mtime = os.path.getmtime(metadata_fpath)
+    if any(os.path.getmtime(fpath) > combined_mtime for fpath in reference_fpaths):
+        return False
+    try:
+        with open(metadata_fpath) as f:
+            combined_dict = ujson.load(f)
+    except ValueError:
+        return False
+    return combined_dict.get("goes_api", {}).get("n_files") == len(reference_fpaths)
+
+
+def _remove_reference_file(reference_fpath):
+    """Remove a reference JSON file or a Parquet reference directory."""
+    if os.path.isdir(reference_fpath):
+        shutil.rmtree(reference_fpath)
+    elif os.path.exists(reference_fpath):
+        os.remove(reference_fpath)
+
+
+def _write_reference_parquet(mzz_kwargs, reference_fpath, goes_api_metadata, record_size=10000):
+    """Combine reference dictionaries with MultiZarrToZarr into a Parquet reference directory.
+
+    The references are written by a fsspec LazyReferenceMapper by records of `record_size` references,
+    so that the combined references are never entirely in memory.
+    The directory is first written to a temporary directory and then renamed.
+    The goes_api metadata are recorded in the .zmetadata file.
+    """
+    import ujson
+    from fsspec.implementations.reference import LazyReferenceMapper
+    from kerchunk.combine import MultiZarrToZarr
+
+    tmp_fpath = reference_fpath + ".tmp"
+    _remove_reference_file(tmp_fpath)
+    os.makedirs(tmp_fpath)
+    out = LazyReferenceMapper.create(root=tmp_fpath, fs=fsspec.filesystem("file"), record_size=record_size)
+    MultiZarrToZarr(out=out, **mzz_kwargs).translate()
+    out.flush()
+    metadata_fpath = _get_reference_metadata_fpath(tmp_fpath)
+    with open(metadata_fpath) as f:
+        metadata = ujson.load(f)
+    metadata["goes_api"] = goes_api_metadata
+    with open(metadata_fpath, "w") as f:
+        f.write(ujson.dumps(metadata))
+    _remove_reference_file(reference_fpath)
+    os.replace(tmp_fpath, reference_fpath)
+
+
+def _combine_reference_files(
+    reference_fpaths,
+    combined_prefix,
+    protocol,
+    fs_args,
+    identical_dims,
+    incremental,
+    reference_format="json",
+    record_size=10000,
+):
+    """Combine the time-sorted reference JSON files of a day along the time dimension.
+
+    Returns
+    -------
+    list
+        List of the combined reference filepaths.
+    """
+    import ujson
+    from kerchunk.combine import MultiZarrToZarr
+
+    # Load the reference dictionaries
+    list_reference_dict = []
+    for fpath in reference_fpaths:
+        with open(fpath) as f:
+            list_reference_dict.append(ujson.load(f))
+    list_runs = _get_scene_position_runs(list_reference_dict)
+
+    # Define the combined reference filepaths
+    # - If the scene position changes, a file is created for each position
+    suffix = _REFERENCE_SUFFIX[reference_format]
+    if len(list_runs) == 1:
+        list_combined_fpaths = [combined_prefix + suffix]
+    else:
+        list_combined_fpaths = [f"{combined_prefix}_{i}{suffix}" for i in range(len(list_runs))]
+
+    # Combine the reference dictionaries of each run
+    n_files = 0
+    for run, combined_fpath in zip(list_runs, list_combined_fpaths):
+        run_fpaths = reference_fpaths[n_files : n_files + len(run)]
+        n_files += len(run)
+        if incremental and _is_combined_reference_up_to_date(combined_fpath, run_fpaths):
+            continue
+        mzz_kwargs = {
+            "path": run,
+            "concat_dims": ["t"],
+            "identical_dims": identical_dims,
+            "remote_protocol": protocol,
+            "remote_options": fs_args,
+        }
+        goes_api_metadata = {"n_files": len(run_fpaths)}
+        if reference_format == "parquet":
+            _write_reference_parquet(mzz_kwargs, combined_fpath, goes_api_metadata, record_size=record_size)
+        else:
+            combined_dict = MultiZarrToZarr(**mzz_kwargs).translate()
+            combined_dict["goes_api"] = goes_api_metadata
+            _write_reference_json(combined_dict, combined_fpath)
+
+    # Remove the combined reference files of a previous run which are not valid anymore
+    for suffix in _REFERENCE_SUFFIX.values():
+        for fpath in glob.glob(combined_prefix + suffix) + glob.glob(f"{combined_prefix}_*{suffix}"):
+            if fpath not in list_combined_fpaths:
+                _remove_reference_file(fpath)
+    return list_combined_fpaths
+
+
+def combine_kerchunk_files(
+    satellite,
+    sensor,
+    product_level,
+    product,
+    sector,
+    start_time,
+    end_time,
+    filter_parameters={},
+    reference_dir=None,
+    protocol="s3",
+    fs_args={},
+    identical_dims=["x", "y"],
+    incremental=False,
+    reference_format="json",
+    record_size=10000,
+    verbose=False,
+):
+    """Combine the kerchunk reference JSON files of each day into a single virtual dataset.
+
+    The reference files created by `generate_kerchunk_files` are combined along the
+    time dimension `t` with kerchunk `MultiZarrToZarr`, separately for each day,
+    ABI scene (i.e. the mesoscale scenes M1 and M2) and channel.
+    The combined reference files are saved at
+    <reference_dir>/<satellite>/<product_name>/<YYYY>/<DOY>/<product_name>[_<scene_abbr>][_<channel>]_<YYYYDOY>.json
+    (or .parq if reference_format="parquet").
+    If the position of a mesoscale scene changes during the day, a combined reference file
+    is created for each position (with a _<index> suffix).
+
+    A combined reference file opens as a single lazy dataset with:
+    xr.open_dataset(
+        "reference://",
+        engine="zarr",
+        backend_kwargs={
+            "consolidated": False,
+            "storage_options": {"fo": <combined_fpath>, "remote_protocol": "s3", "remote_options": {"anon": True}},
+        },
+    )
+
+    Parameters
+    ----------
+    reference_dir : str
+        The directory where the kerchunk reference JSON files are stored.
+    protocol : str, optional
+        The cloud bucket protocol of the files referenced by the reference files.
+        The default is "s3".
+    fs_args : dict, optional
+        Dictionary specifying optional settings to access the cloud bucket.
+        The default is an empty dictionary. Anonymous connection is set by default.
+    identical_dims : list, optional
+        Variables which are identical across the files (and are not concatenated along `t`).
+        The default is ["x", "y"].
+    incremental : bool, optional
+        If True, the combined reference files which are more recent than the reference
+        files of the day (and combine the same number of files) are not recreated.
+        The default is False.
+    reference_format : str, optional
+        If "json" (the default), each combined reference file is a JSON file.
+        If "parquet", each combined reference file is a fsspec Parquet reference directory.
+        Parquet references are written and read by records of `record_size` references,
+        so that the memory used does not depend on the number of files combined.
+        Parquet references require pandas and pyarrow (or fastparquet).
+    record_size : int, optional
+        Number of references of each Parquet record.
+        Only used if reference_format="parquet".
+        The default is 10000.
+
+    See `generate_kerchunk_files` for the description of the other arguments.
+
+    Returns
+    -------
+    list
+        List of the combined reference filepaths.
+    """
+    # Test require packages are available
+    try:
+        import ujson  # noqa
+    except ModuleNotFoundError:
+        raise ModuleNotFoundError("Install ujson to exploit kerchunk functionalities !")
+    try:
+        import kerchunk  # noqa
+    except ModuleNotFoundError:
+        raise ModuleNotFoundError("Install kerchunk to exploit goes_api functionalities !")
+
+    # Check inputs
+    satellite = _check_satellite(satellite)
+    sensor = _check_sensor(sensor)
+    if sensor != "ABI":
+        raise ValueError("Only the reference files of ABI products can be combined along time.")
+    product_level = _check_product_level(product_level, product=None)
+    product = _check_product(product, sensor=sensor, product_level=product_level)
+    sector = _check_sector(sector, product=product, sensor=sensor)
+    start_time, end_time = _check_start_end_time(start_time, end_time)
+    filter_parameters = _check_filter_parameters(filter_parameters.copy(), sensor, sector=sector)
+    reference_format = _check_reference_format(reference_format)
+    product_name = _get_product_name(sensor, product_level, product, sector)
+    remote_options = fs_args.copy()
+    if protocol == "s3":
+        _ = remote_options.setdefault("anon", True)
+    if protocol == "gcs":
+        _ = remote_options.setdefault("token", "anon")
+
+    # Loop over daily time blocks
+    list_combined_fpaths = []
+    for block_start_time, block_end_time in _get_list_daily_time_blocks(start_time, end_time):
+        filter_parameters["start_time"] = block_start_time
+        filter_parameters["end_time"] = block_end_time
+        table = _find_reference_files(
+            reference_dir=reference_dir,
+            satellite=satellite,
+            sensor=sensor,
+            product_level=product_level,
+            product=product,
+            sector=sector,
+            filter_parameters=filter_parameters,
+        )
+        if len(table) == 0:
+            continue
+        # Combine the files of each day, scene and channel
+        table = table.subset(np.argsort(table["start_time"], kind="stable"))
+        dates = table["start_time"].astype("M8[D]").tolist()
+        scenes = table._get_column("scene_abbr").tolist()
+        keys = list(zip(dates, scenes, table._get_column("channel").tolist()))
+        for date, scene_abbr, channel in sorted(set(keys), key=lambda key: (key[0], key[1] or "", key[2] or "")):
+            reference_fpaths = [
+                fpath + ".json"
+                for fpath, file_key in zip(table.to_list(), keys)
+                if file_key == (date, scene_abbr, channel)
+            ]
+            combined_prefix = _get_combined_reference_prefix(
+                reference_dir=reference_dir,
+                satellite=satellite,
+                product_name=product_name,
+                date=date,
+                scene_abbr=scene_abbr,
+                channel=channel,
+            )
+            if verbose:
+                print(f" - Combining {len(reference_fpaths)} reference files into {combined_prefix}")
+            list_combined_fpaths += _combine_reference_files(
+                reference_fpaths,
+                combined_prefix=combined_prefix,
+                protocol=protocol,
+                fs_args=remote_options,
+                identical_dims=identical_dims,
+                incremental=incremental,
+                reference_format=reference_format,
+                record_size=record_size,
+            )
+    return list_combined_fpaths
+
 
 def get_reference_mappers(fpaths, protocol="s3"):
-    """Return list of reference mappers objects."""
+    """Return list of reference mappers objects.
+
+    `fpaths` can include reference JSON files and Parquet reference directories.
+    The references of a Parquet reference directory are loaded lazily (by records)
+    when the data are accessed.
+    """
     # Test require packages are available
     try:
         import ujson
@@ -221,6 +1235,17 @@ def get_reference_mappers(fpaths, protocol="s3"):
 
     m_list = []
     for fpath in tqdm(fpaths):
+        # Open lazily the Parquet references
+        if os.path.isdir(fpath):
+            m_list.append(
+                fsspec.get_mapper(
+                    "reference://",
+                    fo=fpath,
+                    remote_protocol=protocol,
+                    remote_options={"anon": True},
+                ),
+            )
+            continue
         # Open reference dict
         with open(fpath) as f:
 
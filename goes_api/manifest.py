@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+
+# Copyright (c) 2022 Ghiggi Gionata
+
+# goes_api is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# goes_api is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# goes_api. If not, see <http://www.gnu.org/licenses/>.
+"""Define the on-disk manifest of the cloud bucket directory listings.
+
+The manifest is a SQLite database stored at <base_dir>/.goes_api/manifest.sqlite.
+It records the name, size and etag of the files of each hourly (YYYY/DOY/HH)
+product directory of a cloud bucket.
+Only the listings of closed hourly directories are stored, so that the contents
+of past hours are retrieved from the manifest while the current hour is listed
+again from the cloud bucket.
+"""
+
+import datetime
+import os
+import sqlite3
+
+from goes_api.io import _get_metadata_dir, _iter_glob_directories
+
+# Time after the end of an hourly directory after which its content is assumed to not change anymore
+CLOSED_DIRECTORY_LATENCY = datetime.timedelta(hours=1)
+
+_MANIFEST_SCHEMA = """
+CREATE TABLE IF NOT EXISTS directories (
+    protocol TEXT NOT NULL,
+    satellite TEXT NOT NULL,
+    product_dir TEXT NOT NULL,
+    dir_tree TEXT NOT NULL,
+    listing_time TEXT NOT NULL,
+    PRIMARY KEY (protocol, satellite, product_dir, dir_tree)
+);
+CREATE TABLE IF NOT EXISTS files (
+    protocol TEXT NOT NULL,
+    satellite TEXT NOT NULL,
+    product_dir TEXT NOT NULL,
+    dir_tree TEXT NOT NULL,
+    fname TEXT NOT NULL,
+    size INTEGER,
+    etag TEXT,
+    PRIMARY KEY (protocol, satellite, product_dir, dir_tree, fname)
+);
+"""
+
+
+def _get_manifest_fpath(base_dir):
+    """Return the filepath of the listing manifest."""
+    return os.path.join(_get_metadata_dir(base_dir), "manifest.sqlite")
+
+
+def _connect_manifest(base_dir):
+    """Open a connection to the listing manifest (creating it if it does not exist)."""
+    conn = sqlite3.connect(_get_manifest_fpath(base_dir), timeout=60)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(_MANIFEST_SCHEMA)
+    return conn
+
+
+def _is_closed_directory(dir_tree, now=None):
+    """Return True if the content of an hourly (YYYY/DOY/HH) directory is not expected to change anymore."""
+    if now is None:
+        now = datetime.datetime.utcnow()
+    hour_start_time = datetime.datetime.strptime(dir_tree, "%Y/%j/%H")
+    return hour_start_time + datetime.timedelta(hours=1) + CLOSED_DIRECTORY_LATENCY <= now
+
+
+def _read_manifest_directories(conn, protocol, satellite, product_dir, list_dir_tree):
+    """Read the listings of the directories available in the manifest.
+
+    It returns a dictionary with structure {<dir_tree>: {<fname>: {"size": <size>, "etag": <etag>}}}.
+    """
+    if len(list_dir_tree) == 0:
+        return {}
+    set_dir_tree = set(list_dir_tree)
+    key = (protocol, satellite, product_dir, min(list_dir_tree), max(list_dir_tree))
+    # Retrieve the directories which have been already listed
+    cursor = conn.execute(
+        "SELECT dir_tree FROM directories "
+        "WHERE protocol=? AND satellite=? AND product_dir=? AND dir_tree BETWEEN ? AND ?",
+        key,
+    )
+    dict_directories = {dir_tree: {} for (dir_tree,) in cursor if dir_tree in set_dir_tree}
+    # Retrieve the files of such directories
+    cursor = conn.execute(
+        "SELECT dir_tree, fname, size, etag FROM files "
+        "WHERE protocol=? AND satellite=? AND product_dir=? AND dir_tree BETWEEN ? AND ? "
+        "ORDER BY dir_tree, fname",
+        key,
+    )
+    for dir_tree, fname, size, etag in cursor:
+        if dir_tree in dict_directories:
+            dict_directories[dir_tree][fname] = {"size": size, "etag": etag}
+    return dict_directories
+
+
+def _write_manifest_directory(conn, protocol, satellite, product_dir, dir_tree, dict_files):
+    """Write the listing of a directory into the manifest.
+
+    `dict_files` must have structure {<fpath>: {"size": <size>, "etag": <etag>}}.
+    """
+    listing_time = datetime.datetime.utcnow().isoformat()
+    with conn:
+        conn.execute(
+            "DELETE FROM files WHERE protocol=? AND satellite=? AND product_dir=? AND dir_tree=?",
+            (protocol, satellite, product_dir, dir_tree),
+        )
+        conn.executemany(
+            "INSERT INTO files VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                (protocol, satellite, product_dir, dir_tree, os.path.basename(fpath), info["size"], info["etag"])
+                for fpath, info in dict_files.items()
+            ],
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO directories VALUES (?, ?, ?, ?, ?)",
+            (protocol, satellite, product_dir, dir_tree, listing_time),
+        )
+
+
+def _iter_manifest_directories(
+    fs,
+    base_dir,
+    protocol,
+    satellite,
+    product_dir,
+    list_dir_tree,
+    bucket_prefix="",
+    max_concurrent_listings=10,
+):
+    """Yield the files of each hourly directory, listing the cloud bucket only when required.
+
+    The closed directories available in the manifest are not listed again.
+    The other directories are listed concurrently and, if closed, added to the manifest.
+    For each directory, a dictionary with structure {<fpath>: {"size": <size>, "etag": <etag>}}
+    is yielded in the same order of `list_dir_tree`.
+    """
+    conn = _connect_manifest(base_dir)
+    try:
+        product_name = os.path.basename(product_dir)
+        dict_manifest = _read_manifest_directories(
+            conn,
+            protocol=protocol,
+            satellite=satellite,
+            product_dir=product_name,
+            list_dir_tree=[dir_tree for dir_tree in list_dir_tree if _is_closed_directory(dir_tree)],
+        )
+        # List the directories not available in the manifest
+        list_dir_tree_to_list = [dir_tree for dir_tree in list_dir_tree if dir_tree not in dict_manifest]
+        iterator = _iter_glob_directories(
+            fs,
+            [os.path.join(product_dir, dir_tree, "*.nc*") for dir_tree in list_dir_tree_to_list],
+            bucket_prefix=bucket_prefix,
+            max_concurrent_listings=max_concurrent_listings,
+        )
+        for dir_tree in list_dir_tree:
+            if dir_tree in dict_manifest:
+                yield {
+                    os.path.join(product_dir, dir_tree, fname): info for fname, info in dict_manifest[dir_tree].items()
+                }
+                continue
+            dict_files = next(iterator)
+            if _is_closed_directory(dir_tree):
+                _write_manifest_directory(
+                    conn,
+                    protocol=protocol,
+                    satellite=satellite,
+                    product_dir=product_name,
+                    dir_tree=dir_tree,
+                    dict_files=dict_files,
+                )
+            yield dict_files
+    finally:
+        conn.close()
@@ -7,12 +7,15 @@ Created on Tue Dec 20 16:45:14 2022
 import numpy as np
 
 from goes_api.info import get_key_from_filepaths, group_files
+from goes_api.table import FileTable
 
 
 def _ensure_fpaths_list(func):
-    """Decorator to ensure that the input to func is a list."""
+    """Decorator to ensure that the input to func is a list (or a FileTable)."""
 
     def inner(fpaths, *args, **kwargs):
+        if isinstance(fpaths, FileTable):
+            return func(fpaths, *args, **kwargs)
         if not isinstance(fpaths, (dict, list, str, np.ndarray)):
             raise ValueError("Expecting a file paths list or dictionary.")
         # If dictionary, convert to list
@@ -41,6 +44,8 @@ def ensure_operational_data(fpaths):
     # If not "OR" environment, raise an error
     unvalid_idx = np.where(list_se != "OR")[0]
     if len(unvalid_idx) != 0:
+        if isinstance(fpaths, FileTable):
+            fpaths = fpaths.to_list()
         unvalid_fpaths = np.array(fpaths)[unvalid_idx]
         raise ValueError(
             f"The required files does not come from the GOES operational system real-time environment. Unvalid files: {unvalid_fpaths}",
@@ -132,11 +137,13 @@ def ensure_time_period_is_covered(fpaths, start_time, end_time, product=""):
         raise ValueError(
             f"Any {product} data available along the entire [{start_time}, {end_time}] period.",
         )
+    # Parse the filenames only once
+    fpaths = FileTable.from_fpaths(fpaths)
     # Retrieve product and sensor infos (assuming single one)
-    product = get_key_from_filepaths(fpaths[0], "product")[0]
-    sensor = get_key_from_filepaths(fpaths[0], "sensor")[0]
+    product = get_key_from_filepaths(fpaths, "product")[0]
+    sensor = get_key_from_filepaths(fpaths, "sensor")[0]
     if sensor == "ABI":
-        sector = get_key_from_filepaths(fpaths[0], "sector")[0]
+        sector = get_key_from_filepaths(fpaths, "sector")[0]
     # Retrieve available file start_time and end_time
     # - ABI: minutes resolution required, GLM: seconds resolutions required (TODO !)
     file_start_times = np.unique(get_key_from_filepaths(fpaths, "start_time"))
@@ -182,21 +189,198 @@ def ensure_all_files(fpaths, product=""):
         raise ValueError(f"Missing {product} files across some timesteps.")
 
 
+def ensure_complete_timesteps(fpaths, product=None, channels=None):
+    """Ensure that each timestep has all the expected (product, channel) files.
+
+    Differently from `ensure_all_files`, it catches also the files (i.e. ABI bands)
+    missing at every timestep. See `goes_api.assembler.assemble_timesteps`.
+    """
+    from goes_api.assembler import assemble_timesteps
+
+    _, list_partial = assemble_timesteps(fpaths, product=product, channels=channels)
+    if len(list_partial) > 0:
+        msg = "\n".join(f"- {timestep.start_time}: {timestep.missing}" for timestep in list_partial)
+        raise ValueError(f"Missing files at {len(list_partial)} timesteps:\n{msg}")
+
+
+####--------------------------------------------------------------------------.
+#### Single-pass validation
+
+
+class ValidationReport:
+    """Report of the operational checks of a list of files (see `validate_fpaths`).
+
+    Attributes
+    ----------
+    n_files : int
+        Number of files.
+    n_timesteps : int
+        Number of timesteps (unique file start_time).
+    invalid_environment_fpaths : list
+        Filepaths not coming from the GOES Operational system Real-time (OR) environment.
+    scan_modes : list
+        Unique scan modes.
+    data_start_time, data_end_time : datetime.datetime
+        Start time of the first file and end time of the last file.
+    missing_intervals : list
+        List of (end_time, start_time) of the missing acquisitions between consecutive timesteps.
+    irregular_timesteps : list
+        Timesteps with a number of files different from the most frequent one.
+    errors : list
+        Error messages of the failed checks (in the order of `ensure_fpaths_validity`).
+    """
+
+    def __init__(self, n_files=0):
+        self.n_files = n_files
+        self.n_timesteps = 0
+        self.invalid_environment_fpaths = []
+        self.scan_modes = []
+        self.data_start_time = None
+        self.data_end_time = None
+        self.missing_intervals = []
+        self.irregular_timesteps = []
+        self.errors = []
+
+    @property
+    def is_valid(self):
+        """Return True if all checks passed."""
+        return len(self.errors) == 0
+
+    def __repr__(self):
+        return f"<ValidationReport of {self.n_files} files: {len(self.errors)} errors>"
+
+    def raise_if_invalid(self):
+        """Raise a ValueError with the message of the first failed check."""
+        if not self.is_valid:
+            raise ValueError(self.errors[0])
+
+
+def _get_missing_data_message(missing_intervals, product):
+    error_message = f"Missing {product} data between:\n"
+    for start_tt, end_tt in missing_intervals:
+        error_message += f"[{start_tt} - {end_tt}]\n"
+    return error_message
+
+
+def _get_expected_intervals(timestep_scan_modes, sensor, sector, timesteps):
+    """Return the expected interval (as timedelta64) after each timestep.
+
+    For ABI, the interval is defined by the scan mode (see `listing.ABI_INTERVAL`).
+    For the other sensors (and unknown scan modes), the smallest observed interval is used.
+    """
+    from goes_api.listing import ABI_INTERVAL
+
+    intervals = np.diff(timesteps)
+    min_interval = intervals.min() if len(intervals) > 0 else np.timedelta64(0, "us")
+    expected_intervals = np.full(len(timesteps), min_interval, dtype="timedelta64[us]")
+    if sensor == "ABI":
+        for scan_mode, minutes in ABI_INTERVAL.get(sector, {}).items():
+            expected_intervals[timestep_scan_modes == scan_mode] = np.timedelta64(minutes, "m")
+    return expected_intervals
+
+
+@_ensure_fpaths_list
+def validate_fpaths(fpaths, sensor=None, start_time=None, end_time=None, product=None):
+    """Run the operational checks of `ensure_fpaths_validity` and return a ValidationReport.
+
+    The filenames are parsed once (or not at all if a FileTable is provided) and
+    all checks are computed with vectorized NumPy operations:
+    - the system environment is OR,
+    - the scan mode is unique,
+    - the [start_time, end_time] period is covered,
+    - there are no missing acquisitions (gaps between consecutive timesteps larger
+      than the ABI scan mode interval, or than the smallest interval for other sensors),
+    - all timesteps have the same number of files.
+    Differently from `ensure_fpaths_validity`, all checks are performed and no error is raised.
+    """
+    table = FileTable.from_fpaths(fpaths)
+    report = ValidationReport(n_files=len(table))
+
+    # Check environment
+    invalid_idx = np.where(table._get_column("system_environment") != "OR")[0]
+    if len(invalid_idx) != 0:
+        report.invalid_environment_fpaths = table.fpaths[invalid_idx].tolist()
+        report.errors.append(
+            "The required files does not come from the GOES operational system real-time environment. "
+            f"Unvalid files: {np.array(report.invalid_environment_fpaths)}",
+        )
+
+    # Check data availability
+    if len(table) == 0:
+        if sensor is None or product is None or start_time is None or end_time is None:
+            report.errors.append("No data available.")
+        else:
+            report.errors.append(f"The {product} data between {start_time} and {end_time} are not available.")
+        return report
+
+    # Retrieve timesteps
+    timesteps, first_idx, inverse, counts = np.unique(
+        table["start_time"],
+        return_index=True,
+        return_inverse=True,
+        return_counts=True,
+    )
+    timestep_end_times = np.full(len(timesteps), np.iinfo(np.int64).min, dtype=np.int64)
+    np.maximum.at(timestep_end_times, inverse.ravel(), table["end_time"].astype(np.int64))
+    timestep_end_times = timestep_end_times.astype(table["end_time"].dtype)
+    report.n_timesteps = len(timesteps)
+    report.data_start_time = timesteps[0].tolist()
+    report.data_end_time = timestep_end_times.max().tolist()
+
+    # Check fixed scan mode
+    scan_modes = table._get_column("scan_mode")
+    report.scan_modes = np.unique(scan_modes.astype(str)).tolist()
+    if len(report.scan_modes) != 1:
+        report.errors.append(
+            f"Multiple scan modes ({np.array(report.scan_modes)}) occur between "
+            f"{report.data_start_time} and {report.data_end_time} !",
+        )
+
+    # Check time period extremities are covered
+    file_product = table._get_column("product")[0]
+    if start_time is not None and report.data_start_time > start_time:
+        report.errors.append(
+            f"The {file_product} data between {start_time} and {report.data_start_time} are not available.",
+        )
+    if end_time is not None and report.data_end_time < end_time:
+        report.errors.append(
+            f"The {file_product} data between {report.data_end_time} and {end_time} are not available.",
+        )
+
+    # Check missing acquisitions
+    if len(timesteps) > 1:
+        expected_intervals = _get_expected_intervals(
+            scan_modes[first_idx],
+            sensor=table._get_column("sensor")[0],
+            sector=table._get_column("sector")[0],
+            timesteps=timesteps,
+        )
+        gap_idx = np.where(np.diff(timesteps) > expected_intervals[:-1])[0]
+        report.missing_intervals = list(
+            zip(timestep_end_times[gap_idx].tolist(), timesteps[gap_idx + 1].tolist()),
+        )
+        if len(gap_idx) > 0:
+            report.errors.append(_get_missing_data_message(report.missing_intervals, file_product))
+
+    # Check same number of files per timestep
+    if len(np.unique(counts)) != 1:
+        values, values_counts = np.unique(counts, return_counts=True)
+        most_frequent_count = values[np.argmax(values_counts)]
+        report.irregular_timesteps = timesteps[counts != most_frequent_count].tolist()
+        report.errors.append(f"Missing {product} files across some timesteps.")
+    return report
+
+
 def ensure_fpaths_validity(fpaths, sensor, start_time, end_time, product):
-    # - Ensure that the file comes from the GOES Operational system Real-time (OR) environment
-    ensure_operational_data(fpaths)
-    # - Ensure data availability (there are some data)
-    ensure_data_availability(
+    """Ensure that the files satisfy the operational checks.
+
+    It raises a ValueError with the message of the first failed check.
+    See `validate_fpaths` for the list of checks.
+    """
+    validate_fpaths(
         fpaths,
         sensor=sensor,
         start_time=start_time,
         end_time=end_time,
         product=product,
-    )
-    # - Ensure fixed scan mode (for ABI)
-    ensure_fixed_scan_mode(fpaths)
-    # - Ensure time period covered
-    ensure_time_period_is_covered(fpaths, start_time=start_time, end_time=end_time, product=product)
-    # - Ensure same number of files per timestep (i.e. for Rad)
-    # --> TODO: for ABI L1 and L2 Rad --> check 16 bands (or based on filter_params ... )
-    ensure_all_files(fpaths, product=product)
+    ).raise_if_invalid()
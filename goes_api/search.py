@@ -20,6 +20,7 @@ import os
 
 import numpy as np
 
+from goes_api.cache import has_cache_index, touch_cache_files
 from goes_api.checks import (
     _check_base_dir,
     _check_connection_type,
@@ -34,16 +35,20 @@ from goes_api.checks import (
     _check_start_end_time,
     _check_time,
 )
-from goes_api.configs import get_goes_base_dir
+from goes_api.configs import get_goes_base_dir, get_goes_use_manifest
 from goes_api.filter import _filter_files
 from goes_api.info import group_files
 from goes_api.io import (
+    _CACHED_CONNECTION_TYPES,
     _get_bucket_prefix,
+    _get_connection_filesystem,
     _get_product_dir,
     _get_time_dir_tree,
+    _iter_glob_directories,
     _set_connection_type,
     get_filesystem,
 )
+from goes_api.manifest import _iter_manifest_directories
 from goes_api.operations import (
     ensure_all_files,
     # ensure_operational_data,
@@ -52,6 +57,7 @@ from goes_api.operations import (
     # ensure_time_period_is_covered,
     ensure_fpaths_validity,
 )
+from goes_api.table import FileTable
 
 ####--------------------------------------------------------------------------.
 
@@ -69,42 +75,6 @@ def _get_acquisition_max_timedelta(sector):
     return dt
 
 
-def _enable_multiple_products(func):
-    """Decorator to retrieve filepaths for multiple products."""
-
-    def decorator(*args, **kwargs):
-        # Single product case
-        if isinstance(kwargs["product"], str):
-            fpaths = func(*args, **kwargs)
-            return fpaths
-
-        # Multiproduct case
-        if isinstance(kwargs["product"], list):
-            products = kwargs["product"]
-            group_by_key = kwargs.get("group_by_key", None)
-            operational_checks = kwargs.get("operational_checks", True)
-            list_fpaths = []
-            for product in products:
-                new_kwargs = kwargs.copy()
-                new_kwargs["product"] = product
-                new_kwargs["group_by_key"] = None
-                fpaths = func(*args, **new_kwargs)
-                list_fpaths.append(fpaths)
-            # Flat the list
-            fpaths = [item for sublist in list_fpaths for item in sublist]
-            # Operational checks
-            if operational_checks:
-                ensure_all_files(fpaths)
-            # Group files if asked
-            if group_by_key is not None:
-                fpaths = group_files(fpaths, key=group_by_key)
-            return fpaths
-        raise ValueError("Expecting 'product' to be a string or a list.")
-
-    return decorator
-
-
-@_enable_multiple_products
 def find_files(
     satellite,
     sensor,
@@ -121,6 +91,8 @@ def find_files(
     fs_args={},
     verbose=False,
     operational_checks=True,
+    max_concurrent_listings=10,
+    use_manifest=None,
 ):
     """
     Retrieve files from local or cloud bucket storage.
@@ -133,10 +105,12 @@ def find_files(
     ----------
     base_dir : str, optional
         This argument must be specified only if searching files on the local storage
-        when protocol="file".
+        when protocol="file", or with the "simplecache" and "blockcache" connection types.
         It represents the path to the local directory where to search for GOES data.
         If protocol="file" and base_dir is None, base_dir is retrieved from
         the GOES-API config file.
+        With the "simplecache" and "blockcache" connection types, base_dir is
+        the local directory where the files are cached.
         The default is None.
     protocol : str (optional)
         String specifying the location where to search for the data.
@@ -156,8 +130,8 @@ def find_files(
     product_level : str
         Product level.
         See `goes_api.available_product_levels()` for available product levels.
-    product : str
-        The name of the product to retrieve.
+    product : str or list
+        The name of the product(s) to retrieve.
         See `goes_api.available_products()` for a list of available products.
     start_time : datetime.datetime
         The start (inclusive) time of the interval period for retrieving the filepaths.
@@ -177,8 +151,11 @@ def find_files(
         By default, no key is specified and the function returns a list of filepaths.
     connection_type : str, optional
         The type of connection to a cloud bucket.
-        This argument applies only if working with cloud buckets (base_dir is None).
+        This argument applies only if working with cloud buckets (protocol is not "file").
         See `goes_api.available_connection_types` for implemented solutions.
+        With "simplecache" and "blockcache", fsspec.core.OpenFile objects are returned,
+        which read the files through a local cache rooted in base_dir
+        (see `goes_api.io.get_cached_filesystem`).
     verbose : bool, optional
         If True, it print some information concerning the file search.
         The default is False.
@@ -188,11 +165,232 @@ def find_files(
         2. the scan mode is fixed (for ABI)
         4. the time period between start_time and end_time is fully covered,
             without missing acquisitions.
+    max_concurrent_listings : int, optional
+        Maximum number of hourly (YYYY/DOY/HH) directories to be listed concurrently.
+        The returned filepaths do not depend on this value.
+        The default is 10.
+    use_manifest : bool, optional
+        If True, the cloud bucket listings of past hours are stored into (and retrieved from)
+        a manifest located at <base_dir>/.goes_api/manifest.sqlite, where base_dir
+        is the one specified in the GOES-API config file.
+        Only the directories of the last hours are then listed from the cloud bucket.
+        This argument is ignored when searching files on local storage.
+        If None, it uses the `use_manifest` value specified in the GOES-API config file.
+        The default is None.
+
+    Notes
+    -----
+    If the local archive is managed as a cache (i.e. <base_dir>/.goes_api/cache.sqlite exists),
+    the files found on local storage are marked as recently used
+    (see `goes_api.download.download_files` and `goes_api.rebuild_cache_index`).
+    """
+    # Check inputs
+    if protocol not in ["file", "local"] and base_dir is not None and connection_type not in _CACHED_CONNECTION_TYPES:
+        raise ValueError(
+            "If protocol is not 'file' or 'local', base_dir must be specified only with the "
+            "'simplecache' and 'blockcache' connection types !",
+        )
+    if isinstance(product, str):
+        products = [product]
+    elif isinstance(product, list):
+        products = product
+    else:
+        raise ValueError("Expecting 'product' to be a string or a list.")
+    if protocol in ["file", "local"]:
+        protocol = "file"
+    protocol = _check_protocol(protocol)
+    connection_type = _check_connection_type(connection_type, protocol)
+    group_by_key = _check_group_by_key(group_by_key)
+
+    # Separate the local cache directory of the 'simplecache' and 'blockcache' connection types
+    # - With cloud buckets, base_dir is not the directory where to search for the files
+    connection_base_dir = base_dir
+    if protocol != "file":
+        base_dir = None
+
+    # Retrieve the FileTable of each product
+    list_table = [
+        _find_files(
+            satellite=satellite,
+            sensor=sensor,
+            product_level=product_level,
+            product=product,
+            start_time=start_time,
+            end_time=end_time,
+            sector=sector,
+            filter_parameters=filter_parameters,
+            base_dir=base_dir,
+            protocol=protocol,
+            fs_args=fs_args,
+            verbose=verbose,
+            operational_checks=operational_checks,
+            max_concurrent_listings=max_concurrent_listings,
+            use_manifest=use_manifest,
+        )
+        for product in products
+    ]
+    table = FileTable.concat(list_table)
+
+    # Update the access time of the files of the local archive managed as a cache
+    if protocol == "file" and len(table) > 0:
+        cache_base_dir = get_goes_base_dir(base_dir)
+        if has_cache_index(cache_base_dir):
+            touch_cache_files(cache_base_dir, table.to_list())
+
+    # Check same number of files for each timestep across products
+    if len(products) > 1 and operational_checks:
+        ensure_all_files(table)
+
+    # Group fpaths by key
+    fpaths = group_files(table, key=group_by_key) if group_by_key else table.to_list()
+
+    # Parse fpaths for connection type
+    fpaths = _set_connection_type(
+        fpaths,
+        satellite=_check_satellite(satellite),
+        protocol=protocol,
+        connection_type=connection_type,
+        fs_args=fs_args,
+        base_dir=connection_base_dir,
+    )
+    # Return fpaths
+    return fpaths
+
+
+def iter_files(
+    satellite,
+    sensor,
+    product_level,
+    product,
+    start_time,
+    end_time,
+    sector=None,
+    filter_parameters={},
+    group_by_key=None,
+    connection_type=None,
+    base_dir=None,
+    protocol="file",
+    fs_args={},
+    verbose=False,
+    max_concurrent_listings=10,
+    use_manifest=None,
+):
+    """
+    Iterate over the files of local or cloud bucket storage in chronological order.
+
+    Differently from `find_files`, the files are yielded as soon as each
+    hourly (YYYY/DOY/HH) directory is listed, so that the processing of the
+    first files can start before the listing of the entire time period is completed.
+    No operational checks are performed.
+
+    Parameters
+    ----------
+    product : str
+        The name of the product to retrieve.
+        See `goes_api.available_products()` for a list of available products.
+    group_by_key : str, optional
+        If None (the default), the filepaths are yielded one by one.
+        If "start_time", (<start_time>, <list of filepaths>) tuples are yielded
+        for each timestep.
+        Grouping by other keys is not supported because it would require
+        to list the entire time period.
+
+    See `find_files` for the description of the other arguments.
+
+    Yields
+    ------
+    fpath : str or tuple
+        The filepath or, if group_by_key="start_time", the
+        (<start_time>, <list of filepaths>) tuple of each timestep.
     """
     # Check inputs
-    if protocol not in ["file", "local"] and base_dir is not None:
-        raise ValueError("If protocol is not 'file' or 'local', base_dir must not be specified !")
+    if protocol not in ["file", "local"] and base_dir is not None and connection_type not in _CACHED_CONNECTION_TYPES:
+        raise ValueError(
+            "If protocol is not 'file' or 'local', base_dir must be specified only with the "
+            "'simplecache' and 'blockcache' connection types !",
+        )
+    if not isinstance(product, str):
+        raise ValueError("Expecting 'product' to be a string.")
+    if protocol in ["file", "local"]:
+        protocol = "file"
+    protocol = _check_protocol(protocol)
+    connection_type = _check_connection_type(connection_type, protocol)
+    group_by_key = _check_group_by_key(group_by_key)
+    if group_by_key not in [None, "start_time"]:
+        raise ValueError("iter_files supports only group_by_key=None or group_by_key='start_time'.")
+    satellite = _check_satellite(satellite)
 
+    # Separate the local cache directory of the 'simplecache' and 'blockcache' connection types
+    # - With cloud buckets, base_dir is not the directory where to search for the files
+    connection_base_dir = base_dir
+    if protocol != "file":
+        base_dir = None
+    connection_fs = _get_connection_filesystem(protocol, connection_type, fs_args=fs_args, base_dir=connection_base_dir)
+
+    # Iterate over the files of each directory
+    # - Files of the same timestep are always located in the same hourly directory
+    iterator = _iter_file_tables(
+        satellite=satellite,
+        sensor=sensor,
+        product_level=product_level,
+        product=product,
+        start_time=start_time,
+        end_time=end_time,
+        sector=sector,
+        filter_parameters=filter_parameters,
+        base_dir=base_dir,
+        protocol=protocol,
+        fs_args=fs_args,
+        verbose=verbose,
+        max_concurrent_listings=max_concurrent_listings,
+        use_manifest=use_manifest,
+    )
+    for table in iterator:
+        if len(table) == 0:
+            continue
+        if group_by_key is None:
+            # Sort the files of the directory by start_time (the listing is sorted by channel)
+            table = table.subset(np.argsort(table["start_time"], kind="stable"))
+            yield from _set_connection_type(
+                table.to_list(),
+                satellite=satellite,
+                protocol=protocol,
+                connection_type=connection_type,
+                fs=connection_fs,
+            )
+        else:
+            for timestep, fpaths in group_files(table, key=group_by_key).items():
+                fpaths = _set_connection_type(
+                    fpaths,
+                    satellite=satellite,
+                    protocol=protocol,
+                    connection_type=connection_type,
+                    fs=connection_fs,
+                )
+                yield timestep, fpaths
+
+
+def _iter_file_tables(
+    satellite,
+    sensor,
+    product_level,
+    product,
+    start_time,
+    end_time,
+    sector=None,
+    filter_parameters={},
+    base_dir=None,
+    protocol="file",
+    fs_args={},
+    verbose=False,
+    max_concurrent_listings=10,
+    use_manifest=None,
+):
+    """Yield the FileTable of the (filtered) files of each hourly directory of a single product.
+
+    The FileTable are yielded in chronological order, as soon as each directory is listed.
+    See `find_files` for the description of the arguments.
+    """
     # Check for when searching on local storage
     if protocol in ["file", "local"]:
         # Get default local directory if base_dir = None
@@ -205,7 +403,6 @@ def find_files(
     # Format inputs
     protocol = _check_protocol(protocol)
     base_dir = _check_base_dir(base_dir)
-    connection_type = _check_connection_type(connection_type, protocol)
     satellite = _check_satellite(satellite)
     sensor = _check_sensor(sensor)
     product_level = _check_product_level(product_level, product=None)
@@ -214,7 +411,6 @@ def find_files(
     start_time, end_time = _check_start_end_time(start_time, end_time)
 
     filter_parameters = _check_filter_parameters(filter_parameters, sensor, sector=sector)
-    group_by_key = _check_group_by_key(group_by_key)
 
     # Add start_time and end_time to filter_parameters
     filter_parameters = filter_parameters.copy()
@@ -246,45 +442,89 @@ def find_files(
     if verbose:
         print(f"Searching files across {n_directories} directories.")
 
-    # Loop over each directory:
-    # - TODO in parallel ?
-    list_fpaths = []
-    # glob_pattern = list_glob_pattern[0]
-    for glob_pattern in list_glob_pattern:
-        # Retrieve list of files
-        fpaths = fs.glob(glob_pattern)
-        # Add bucket prefix
-        fpaths = [bucket_prefix + fpath for fpath in fpaths]
+    # Define the iterator listing the directories concurrently (in chronological order)
+    if protocol != "file" and get_goes_use_manifest(use_manifest):
+        iterator = _iter_manifest_directories(
+            fs,
+            base_dir=get_goes_base_dir(),
+            protocol=protocol,
+            satellite=satellite,
+            product_dir=product_dir,
+            list_dir_tree=list_dir_tree,
+            bucket_prefix=bucket_prefix,
+            max_concurrent_listings=max_concurrent_listings,
+        )
+    else:
+        iterator = _iter_glob_directories(
+            fs,
+            list_glob_pattern,
+            bucket_prefix=bucket_prefix,
+            max_concurrent_listings=max_concurrent_listings,
+        )
+
+    # Retrieve the files of each directory
+    # - The filenames are parsed only once, when creating the FileTable of each directory
+    for dict_files in iterator:
+        table = FileTable.from_listing(dict_files)
         # Filter files if necessary
         if len(filter_parameters) >= 1:
-            fpaths = _filter_files(fpaths, sensor, product_level, **filter_parameters)
-        list_fpaths += fpaths
+            table = _filter_files(table, sensor, product_level, **filter_parameters)
+        yield table
+
+
+def _find_files(
+    satellite,
+    sensor,
+    product_level,
+    product,
+    start_time,
+    end_time,
+    sector=None,
+    filter_parameters={},
+    base_dir=None,
+    protocol="file",
+    fs_args={},
+    verbose=False,
+    operational_checks=True,
+    max_concurrent_listings=10,
+    use_manifest=None,
+):
+    """Retrieve the FileTable of the files of a single product.
 
-    fpaths = list_fpaths
+    See `find_files` for the description of the arguments.
+    """
+    iterator = _iter_file_tables(
+        satellite=satellite,
+        sensor=sensor,
+        product_level=product_level,
+        product=product,
+        start_time=start_time,
+        end_time=end_time,
+        sector=sector,
+        filter_parameters=filter_parameters,
+        base_dir=base_dir,
+        protocol=protocol,
+        fs_args=fs_args,
+        verbose=verbose,
+        max_concurrent_listings=max_concurrent_listings,
+        use_manifest=use_manifest,
+    )
+    table = FileTable.concat(iterator)
 
     # Perform checks for operational routines
     if operational_checks:
+        sensor = _check_sensor(sensor)
+        product_level = _check_product_level(product_level, product=None)
+        product = _check_product(product, sensor=sensor, product_level=product_level)
+        start_time, end_time = _check_start_end_time(start_time, end_time)
         ensure_fpaths_validity(
-            fpaths,
+            table,
             sensor=sensor,
             start_time=start_time,
             end_time=end_time,
             product=product,
         )
-
-    # Group fpaths by key
-    if group_by_key:
-        fpaths = group_files(fpaths, key=group_by_key)
-
-    # Parse fpaths for connection type
-    fpaths = _set_connection_type(
-        fpaths,
-        satellite=satellite,
-        protocol=protocol,
-        connection_type=connection_type,
-    )
-    # Return fpaths
-    return fpaths
+    return table
 
 
 def find_closest_start_time(
@@ -524,7 +764,7 @@ def find_closest_files(
         The default is a empty dictionary (no filtering).
     connection_type : str, optional
         The type of connection to a cloud bucket.
-        This argument applies only if working with cloud buckets (base_dir is None).
+        This argument applies only if working with cloud buckets (protocol is not "file").
         See `goes_api.available_connection_types` for implemented solutions.
     """
     # Set time precision to minutes
@@ -632,7 +872,7 @@ def find_latest_files(
         The default is a empty dictionary (no filtering).
     connection_type : str, optional
         The type of connection to a cloud bucket.
-        This argument applies only if working with cloud buckets (base_dir is None).
+        This argument applies only if working with cloud buckets (protocol is not "file").
         See `goes_api.available_connection_types` for implemented solutions.
     operational_checks: bool, optional
         If True, it checks that:
@@ -743,7 +983,7 @@ def find_previous_files(
         The default is a empty dictionary (no filtering).
     connection_type : str, optional
         The type of connection to a cloud bucket.
-        This argument applies only if working with cloud buckets (base_dir is None).
+        This argument applies only if working with cloud buckets (protocol is not "file").
         See `goes_api.available_connection_types` for implemented solutions.
     operational_checks: bool, optional
         If True, it checks that:
@@ -895,7 +1135,7 @@ def find_next_files(
         The default is a empty dictionary (no filtering).
     connection_type : str, optional
         The type of connection to a cloud bucket.
-        This argument applies only if working with cloud buckets (base_dir is None).
+        This argument applies only if working with cloud buckets (protocol is not "file").
         See `goes_api.available_connection_types` for implemented solutions.
     operational_checks: bool, optional
         If True, it checks that:
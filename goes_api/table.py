@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+
+# Copyright (c) 2022 Ghiggi Gionata
+
+# goes_api is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# goes_api is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# goes_api. If not, see <http://www.gnu.org/licenses/>.
+"""Define the FileTable, a columnar table of filepaths and of their filename information."""
+
+import numpy as np
+
+from goes_api.info import get_info_from_filepaths
+
+
+class FileTable:
+    """Columnar table of GOES filepaths and of the information parsed from their filenames.
+
+    The filenames are parsed only once, when the table is created.
+    Each column is a NumPy array:
+    - `start_time`, `end_time` and `creation_time` are datetime64[us] arrays.
+    - the other keys (i.e. `product`, `channel`, `scan_mode`) are object arrays.
+      Keys not defined for a file (i.e. `channel` for GLM) are set to None.
+
+    If created from a directory listing, the `size` and `etag` columns report
+    the file size and etag (None if not available).
+
+    Filtering and grouping a FileTable does not require to parse the filenames again.
+    """
+
+    def __init__(self, fpaths, columns=None):
+        """Create a FileTable from a list of filepaths.
+
+        Parameters
+        ----------
+        fpaths : list or np.ndarray
+            List of filepaths.
+        columns : dict, optional
+            Dictionary with structure {<key>: np.ndarray} with the information of each filepath.
+            If None, the information is parsed from the filenames.
+            The default is None.
+        """
+        fpaths = list(fpaths) if not isinstance(fpaths, np.ndarray) else fpaths.tolist()
+        if columns is None:
+            columns = get_info_from_filepaths(fpaths)
+        self.fpaths = np.empty(len(fpaths), dtype=object)
+        self.fpaths[:] = fpaths
+        self.columns = columns
+
+    @classmethod
+    def from_fpaths(cls, fpaths):
+        """Return a FileTable from a list of filepaths (or the FileTable itself)."""
+        if isinstance(fpaths, FileTable):
+            return fpaths
+        if isinstance(fpaths, str):
+            fpaths = [fpaths]
+        return cls(fpaths)
+
+    @classmethod
+    def from_listing(cls, dict_files):
+        """Return a FileTable from a directory listing.
+
+        `dict_files` must have structure {<fpath>: {"size": <size>, "etag": <etag>}}.
+        The file size and etag are stored in the `size` and `etag` columns.
+        """
+        table = cls(list(dict_files))
+        for key in ["size", "etag"]:
+            arr = np.empty(len(table), dtype=object)
+            arr[:] = [info.get(key) for info in dict_files.values()]
+            table.columns[key] = arr
+        return table
+
+    @classmethod
+    def concat(cls, tables):
+        """Concatenate a list of FileTable."""
+        tables = list(tables)
+        if len(tables) == 0:
+            return cls([])
+        if len(tables) == 1:
+            return tables[0]
+        keys = list(dict.fromkeys(key for table in tables for key in table.columns))
+        columns = {}
+        for key in keys:
+            list_arr = [table._get_column(key) for table in tables]
+            if any(arr.dtype == object for arr in list_arr):
+                list_arr = [arr.astype(object) for arr in list_arr]
+            columns[key] = np.concatenate(list_arr)
+        fpaths = np.concatenate([table.fpaths for table in tables])
+        return cls(fpaths, columns=columns)
+
+    def __len__(self):
+        return len(self.fpaths)
+
+    def __repr__(self):
+        return f"<FileTable with {len(self)} files and keys {list(self.columns)}>"
+
+    def _get_column(self, key):
+        """Return a column (a None-filled object array if the key is not available)."""
+        arr = self.columns.get(key)
+        if arr is None:
+            arr = np.full(len(self), None, dtype=object)
+        return arr
+
+    def __getitem__(self, key):
+        """Return the column array if key is a string, otherwise a subset of the FileTable."""
+        if isinstance(key, str):
+            return self.columns[key]
+        return self.subset(key)
+
+    def subset(self, indices):
+        """Return a FileTable with the files selected by indices (or a boolean mask)."""
+        columns = {key: arr[indices] for key, arr in self.columns.items()}
+        return FileTable(self.fpaths[indices], columns=columns)
+
+    def get_key(self, key):
+        """Return the list of values of a key.
+
+        Times are returned as datetime.datetime objects.
+        """
+        if key not in self.columns:
+            raise KeyError(key)
+        return self.columns[key].tolist()
+
+    def to_list(self):
+        """Return the list of filepaths."""
+        return self.fpaths.tolist()
+
+    def iter_rows(self):
+        """Yield (fpath, info_dict) tuples.
+
+        Keys not defined for a file are not included in the info dictionary.
+        """
+        keys = list(self.columns)
+        lists = [self.get_key(key) for key in keys]
+        for i, fpath in enumerate(self.fpaths):
+            info_dict = {key: values[i] for key, values in zip(keys, lists) if values[i] is not None}
+            yield fpath, info_dict
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+# Copyright (c) 2022 Ghiggi Gionata
+
+# goes_api is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# goes_api is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# goes_api. If not, see <http://www.gnu.org/licenses/>.
+"""Test the reference templates of goes_api.kerchunk."""
+
+import numpy as np
+import pytest
+
+h5py = pytest.importorskip("h5py")
+pytest.importorskip("ujson")
+hdf = pytest.importorskip("kerchunk.hdf")
+
+from goes_api import kerchunk  # noqa: E402
+
+
+def _write_file(fpath, seed):
+    """Write a small HDF5 file with the attributes found in the GOES files."""
+    rng = np.random.default_rng(seed)
+    with h5py.File(fpath, "w") as h5f:
+        h5f.attrs["title"] = "ABI L1b Radiances"
+        h5f.attrs["id"] = f"uuid-{seed}"
+        h5f.attrs["nan_attr"] = np.float32(np.nan)
+        h5f.attrs["inf_attr"] = np.float64(np.inf)
+        h5f.attrs["list_attr"] = np.array([1.5, seed], dtype="f8")
+        h5f.attrs["nested_attr"] = np.arange(6, dtype="f4").reshape(2, 3) + seed
+        dset = h5f.create_dataset(
+            "Rad",
+            data=rng.normal(size=(400, 400)).astype("f4"),
+            chunks=(100, 100),
+            compression="gzip",
+            fillvalue=np.float32(np.nan),
+        )
+        dset.attrs["_FillValue"] = np.float32(np.nan)
+        dset.attrs["valid_range"] = np.array([-np.inf, np.nan], dtype="f4")
+        dset.attrs["scale_factor"] = np.float32(0.5 + seed)
+        h5f.create_dataset("band_id", data=np.array([seed], dtype="i1"))
+
+
+def _translate_with_kerchunk(fpath):
+    with open(fpath, "rb") as input_f:
+        return hdf.SingleHdf5ToZarr(input_f, fpath, inline_threshold=kerchunk._INLINE_THRESHOLD).translate()
+
+
+def test_template_references_match_kerchunk(tmp_path):
+    fpaths = [str(tmp_path / f"file_{i}.nc") for i in range(2)]
+    for i, fpath in enumerate(fpaths):
+        _write_file(fpath, seed=i)
+
+    # Learn the template from the first file
+    with open(fpaths[0], "rb") as input_f:
+        template = kerchunk._learn_reference_template(input_f, fpaths[0], _translate_with_kerchunk(fpaths[0]))
+    assert template is not None
+
+    # Translate the second file with the template
+    with open(fpaths[1], "rb") as input_f:
+        file_metadata = kerchunk._translate_with_template(input_f, fpaths[1], template)
+    assert file_metadata == _translate_with_kerchunk(fpaths[1])
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+
+# Copyright (c) 2022 Ghiggi Gionata
+
+# goes_api is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# goes_api is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# goes_api. If not, see <http://www.gnu.org/licenses/>.
+"""Define token bucket rate limiters for bandwidth and request rate."""
+
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    """Thread-safe token bucket.
+
+    Tokens are added at `rate` tokens per second, up to `capacity` tokens.
+    Consuming more tokens than available puts the bucket in debt: the
+    following consumers wait until the debt is repaid.
+    """
+
+    def __init__(self, rate, capacity=None):
+        if rate <= 0:
+            raise ValueError("The token bucket `rate` must be positive.")
+        self.rate = rate
+        self.capacity = rate if capacity is None else capacity
+        self._tokens = self.capacity
+        self._last_time = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, n_tokens):
+        """Consume n_tokens and return the time (in seconds) to wait before using them."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last_time) * self.rate)
+            self._last_time = now
+            self._tokens -= n_tokens
+            if self._tokens >= 0:
+                return 0
+            return -self._tokens / self.rate
+
+
+class RateLimiter:
+    """Limit the bandwidth (bytes/s) and the request rate (requests/s) of a job.
+
+    A RateLimiter can be shared by the threads (and the asyncio tasks) of a job.
+    To limit the bandwidth of a transfer (and not only its average), the bytes of
+    each chunk must be acquired before reading the chunk.
+    """
+
+    def __init__(self, max_bytes_per_second=None, max_requests_per_second=None):
+        """Define the rate limiter.
+
+        Parameters
+        ----------
+        max_bytes_per_second : float, optional
+            Maximum average bandwidth in bytes per second.
+            The default is None (no limit).
+        max_requests_per_second : float, optional
+            Maximum average number of requests per second.
+            The default is None (no limit).
+        """
+        self.max_bytes_per_second = max_bytes_per_second
+        self.max_requests_per_second = max_requests_per_second
+        self._bytes_bucket = TokenBucket(max_bytes_per_second) if max_bytes_per_second else None
+        self._requests_bucket = TokenBucket(max_requests_per_second) if max_requests_per_second else None
+
+    def __repr__(self):
+        return (
+            f"RateLimiter(max_bytes_per_second={self.max_bytes_per_second}, "
+            f"max_requests_per_second={self.max_requests_per_second})"
+        )
+
+    def _reserve(self, n_requests=0, n_bytes=0):
+        """Return the time (in seconds) to wait before performing the requests."""
+        wait_time = 0
+        if n_requests and self._requests_bucket is not None:
+            wait_time = max(wait_time, self._requests_bucket.reserve(n_requests))
+        if n_bytes and self._bytes_bucket is not None:
+            wait_time = max(wait_time, self._bytes_bucket.reserve(n_bytes))
+        return wait_time
+
+    def acquire(self, n_requests=0, n_bytes=0):
+        """Wait until n_requests requests transferring n_bytes bytes can be performed."""
+        wait_time = self._reserve(n_requests=n_requests, n_bytes=n_bytes)
+        if wait_time > 0:
+            time.sleep(wait_time)
+
+    async def acquire_async(self, n_requests=0, n_bytes=0):
+        """Async version of acquire."""
+        wait_time = self._reserve(n_requests=n_requests, n_bytes=n_bytes)
+        if wait_time > 0:
+            await asyncio.sleep(wait_time)
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+
+# Copyright (c) 2022 Ghiggi Gionata
+
+# goes_api is free software: you can redistribute it and/or modify it under the
+# terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# goes_api is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR
+# A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# goes_api. If not, see <http://www.gnu.org/licenses/>.
+"""Define the retry policy of the tasks submitted to an executor."""
+
+import asyncio
+import concurrent.futures
+import errno
+import random
+import threading
+
+# HTTP status codes of transient errors
+_THROTTLING_STATUS_CODES = [429, 503]
+_SERVER_ERROR_STATUS_CODES = [500, 502, 504]
+
+
+def classify_error(exception):
+    """Return a string describing the reason of a failure.
+
+    The possible reasons are: 'not_found', 'permission', 'throttled',
+    'server_error', 'timeout', 'connection' and 'error'.
+    """
+    status_code = getattr(exception, "code", None)
+    if isinstance(exception, FileNotFoundError):
+        reason = "not_found"
+    elif isinstance(exception, PermissionError):
+        reason = "permission"
+    # - s3fs translates 503 SlowDown into an OSError with errno EBUSY
+    #   gcsfs raises an HttpError with the status code
+    elif status_code in _THROTTLING_STATUS_CODES or getattr(exception, "errno", None) == errno.EBUSY:
+        reason = "throttled"
+    elif status_code in _SERVER_ERROR_STATUS_CODES:
+        reason = "server_error"
+    elif isinstance(exception, (TimeoutError, asyncio.TimeoutError)):
+        reason = "timeout"
+    elif isinstance(exception, ConnectionError) or "connect" in type(exception).__name__.lower():
+        reason = "connection"
+    else:
+        reason = "error"
+    return reason
+
+
+class RetryPolicy:
+    """Define how a failed task is retried.
+
+    The delay before the n-th retry is ``min(backoff * backoff_factor**(n - 1), max_backoff)``.
+    If jitter=True, the delay is drawn uniformly between 0 and such value,
+    to avoid that many failed tasks are retried at the same time.
+    """
+
+    def __init__(
+        self,
+        max_attempts=3,
+        backoff=1.0,
+        backoff_factor=2.0,
+        max_backoff=60.0,
+        jitter=True,
+        retryable_exceptions=(OSError, TimeoutError, ConnectionError),
+        non_retryable_reasons=("not_found", "permission"),
+    ):
+        """Define the retry policy.
+
+        Parameters
+        ----------
+        max_attempts : int, optional
+            Maximum number of attempts of a task (including the first one).
+            Use max_attempts=1 to disable retries.
+            The default is 3.
+        backoff : float, optional
+            Delay in seconds before the first retry.
+            The default is 1.
+        backoff_factor : float, optional
+            Multiplicative factor of the delay between successive retries.
+            The default is 2.
+        max_backoff : float, optional
+            Maximum delay in seconds between two attempts.
+            The default is 60.
+        jitter : bool, optional
+            Whether to randomize the delay between two attempts.
+            The default is True.
+        retryable_exceptions : tuple, optional
+            Exception classes for which the task is retried.
+            The default is (OSError, TimeoutError, ConnectionError).
+        non_retryable_reasons : tuple, optional
+            Failure reasons (see `classify_error`) for which the task is never retried.
+            The default is ("not_found", "permission").
+        """
+        if max_attempts < 1:
+            raise ValueError("`max_attempts` must be at least 1.")
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.retryable_exceptions = tuple(retryable_exceptions)
+        self.non_retryable_reasons = tuple(non_retryable_reasons)
+
+    def __repr__(self):
+        return (
+            f"RetryPolicy(max_attempts={self.max_attempts}, backoff={self.backoff}, "
+            f"backoff_factor={self.backoff_factor}, max_backoff={self.max_backoff}, jitter={self.jitter})"
+        )
+
+    def is_retryable(self, exception):
+        """Return True if a task failed with the given exception must be retried."""
+        if classify_error(exception) in self.non_retryable_reasons:
+            return False
+        return isinstance(exception, self.retryable_exceptions)
+
+    def get_delay(self, n_failed_attempts):
+        """Return the delay in seconds before the next attempt."""
+        delay = min(self.backoff * self.backoff_factor ** (n_failed_attempts - 1), self.max_backoff)
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        return delay
+
+
+def submit_with_retry(executor, retry_policy, func, *args):
+    """Submit func(*args) to an executor, retrying it according to the retry policy.
+
+    The retries are scheduled with a threading.Timer, so that the executor
+    workers are not blocked while waiting for the next attempt.
+    The executor must not be shut down before the returned future is completed.
+
+    Returns
+    -------
+    concurrent.futures.Future
+        The future of the task. Its `n_attempts` attribute reports the number of attempts.
+    """
+    future = concurrent.futures.Future()
+    future.n_attempts = 0
+
+    def _submit():
+        future.n_attempts += 1
+        try:
+            attempt_future = executor.submit(func, *args)
+        except RuntimeError as e:  # executor shut down
+            future.set_exception(e)
+            return
+        attempt_future.add_done_callback(_on_attempt_done)
+
+    def _on_attempt_done(attempt_future):
+        if attempt_future.cancelled():
+            future.set_exception(concurrent.futures.CancelledError())
+            return
+        exception = attempt_future.exception()
+        if exception is None:
+            future.set_result(attempt_future.result())
+            return
+        if future.n_attempts < retry_policy.max_attempts and retry_policy.is_retryable(exception):
+            timer = threading.Timer(retry_policy.get_delay(future.n_attempts), _submit)
+            timer.daemon = True
+            timer.start()
+            return
+        future.set_exception(exception)
+
+    _submit()
+    return future
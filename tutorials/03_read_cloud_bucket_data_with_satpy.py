@@ -168,3 +168,33 @@ scn.show("C01")
 del satpy_files  # GOOD PRACTICE TO CLOSE CONNECTIONS !!!
 
 ###---------------------------------------------------------------------------.
+#### Use the goes_api read-through cache
+# - With connection_type="simplecache", find_files returns fsspec OpenFile objects
+#   which copy the files on first access into <base_dir>/<SATELLITE>/...,
+#   the same location used by goes_api.download_files.
+#   --> Subsequent reads (also from other processes) are done locally
+# - With connection_type="blockcache", only the accessed blocks are cached
+#   into <base_dir>/.goes_api/blockcache
+files = find_latest_files(
+    protocol=protocol,
+    fs_args=fs_args,
+    satellite=satellite,
+    sensor=sensor,
+    product_level=product_level,
+    product=product,
+    sector=sector,
+    filter_parameters=filter_parameters,
+    connection_type="simplecache",
+)
+files = list(files.values())[0]
+
+# - Define satpy FSFile
+satpy_files = [FSFile(file) for file in files]
+scn = Scene(filenames=satpy_files, reader="abi_l1b")
+# - Display a channel
+scn.load(scn.available_dataset_names())
+scn.show("C01")
+
+del files, satpy_files  # GOOD PRACTICE TO CLOSE CONNECTIONS !!!
+
+###---------------------------------------------------------------------------.
@@ -19,13 +19,9 @@ import datetime
 import fsspec
 import ujson
 import xarray as xr
-from dask.distributed import Client
 
 from goes_api import find_files, generate_kerchunk_files
 
-client = Client(n_workers=20)
-client
-
 ###---------------------------------------------------------------------------.
 #### Define protocol and local directory
 reference_dir = "/ltenas3/0_Data/kerchunk_json/"
@@ -65,9 +61,18 @@ fs_args = {
     "default_cache_type": "none",
 }
 
+# - The files are analyzed by a pool of 20 processes
+# - Use max_tasks_per_child to replace each worker process after a number of files:
+#   the workers are then started with 'spawn', so the script must be protected by
+#   `if __name__ == "__main__":`
+# - Use kerchunk_engine="dask" to analyze the files on a dask distributed Client
+# - With use_template=True, only the HDF5 metadata of the files sharing the layout
+#   of a previously kerchunked file are read
 generate_kerchunk_files(
     reference_dir=reference_dir,
     n_processes=20,
+    kerchunk_engine="processes",
+    use_template=True,
     protocol=protocol,
     fs_args=fs_args,
     satellite=satellite,
@@ -170,3 +175,38 @@ print(fs.cat("Rad/0.16"))
 fs.references["Rad/0.16"]
 
 ####--------------------------------------------------------------------------.
+#### - Combine the reference files of each day and channel along time
+# - Use reference_format="parquet" to store the combined references as Parquet
+#   reference directories, which are loaded lazily by fsspec
+from goes_api import combine_kerchunk_files
+
+combined_fpaths = combine_kerchunk_files(
+    reference_dir=reference_dir,
+    protocol=protocol,
+    satellite=satellite,
+    sensor=sensor,
+    product_level=product_level,
+    product=product,
+    sector=sector,
+    start_time=start_time,
+    end_time=end_time,
+    filter_parameters=filter_parameters,
+    verbose=True,
+)
+
+# Open all timesteps of a day and channel as a single lazy dataset
+ds = xr.open_dataset(
+    "reference://",
+    engine="zarr",
+    backend_kwargs={
+        "consolidated": False,
+        "storage_options": {
+            "fo": combined_fpaths[0],
+            "remote_protocol": protocol,
+            "remote_options": {"anon": True},
+        },
+    },
+)
+ds
+
+####--------------------------------------------------------------------------.